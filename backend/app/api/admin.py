@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
-from app.schemas import ProductResponse, OrderResponse, UserResponse
+from datetime import datetime
+from app.database import get_db, get_read_db
+from app.schemas import (
+    ProductResponse, OrderResponse, UserResponse, AdminOrderSummary, ReviewResponse, StockUpdate, LowStockVariant,
+    OrderTransition, OrderTransitionResult
+)
 from app.services.admin_service import AdminService
+from app.services.inventory_service import InventoryService
+from app.services.review_service import ReviewService
 from app.services.auth_service import get_current_admin_user
 
 router = APIRouter()
 
 @router.get("/dashboard/stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: Session = Depends(get_read_db)):
     """Get dashboard statistics"""
     await get_current_admin_user(db)
     admin_service = AdminService(db)
@@ -21,44 +27,114 @@ async def get_users(
     limit: int = Query(50, ge=1, le=100),
     search: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all users (admin only)"""
     await get_current_admin_user(db)
     admin_service = AdminService(db)
     return await admin_service.get_users(skip, limit, search, is_active)
 
-@router.get("/orders", response_model=List[OrderResponse])
+@router.get("/orders", response_model=List[AdminOrderSummary])
 async def get_all_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     status: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    payment_status: Optional[str] = Query(None),
+    customer_email: Optional[str] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all orders (admin only)"""
+    """Get order summaries (admin only)"""
+    await get_current_admin_user(db)
+    admin_service = AdminService(db)
+    return await admin_service.get_order_summaries(
+        skip, limit, status, payment_status, customer_email, created_from, created_to
+    )
+
+@router.get("/orders/{order_id}", response_model=OrderResponse)
+async def get_order(order_id: str, db: Session = Depends(get_read_db)):
+    """Get full order details (admin only)"""
+    await get_current_admin_user(db)
+    admin_service = AdminService(db)
+    order = await admin_service.get_order(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order
+
+@router.put("/orders/status", response_model=OrderTransitionResult)
+async def transition_orders(transitions: List[OrderTransition], db: Session = Depends(get_db)):
+    """Change the status of many orders at once; orders that cannot change are reported in `rejected` (admin only)"""
     await get_current_admin_user(db)
+    if not 1 <= len(transitions) <= 1000:
+        raise HTTPException(status_code=400, detail="Send between 1 and 1000 transitions")
     admin_service = AdminService(db)
-    return await admin_service.get_orders(skip, limit, status)
+    return await admin_service.transition_orders(transitions)
 
 @router.put("/orders/{order_id}/status")
 async def update_order_status(
     order_id: str,
     status: str,
     tracking_number: Optional[str] = None,
+    version: Optional[int] = Query(None, ge=1),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db)
 ):
-    """Update order status (admin only)"""
-    await get_current_admin_user(db)
+    """Update order status (admin only); pass `version` to fail with 409 if the order changed since it was read"""
+    admin = await get_current_admin_user(db)
     admin_service = AdminService(db)
-    order = await admin_service.update_order_status(order_id, status, tracking_number)
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    return {"message": "Order status updated successfully"}
+    return await admin_service.update_order_status(
+        order_id, status, tracking_number, version, admin_id=admin.id, idempotency_key=idempotency_key
+    )
+
+@router.get("/inventory/low-stock", response_model=List[LowStockVariant])
+async def get_low_stock(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    days: Optional[int] = Query(None, ge=1, le=90),
+    db: Session = Depends(get_read_db)
+):
+    """Get SKUs at or below their low-stock threshold with sales velocity and days of cover (admin only)"""
+    await get_current_admin_user(db)
+    inventory_service = InventoryService(db)
+    return await inventory_service.get_low_stock(skip, limit, days)
+
+@router.put("/inventory")
+async def update_stock(updates: List[StockUpdate], db: Session = Depends(get_db)):
+    """Set stock levels and low-stock thresholds by SKU (admin only)"""
+    await get_current_admin_user(db)
+    if not 1 <= len(updates) <= 1000:
+        raise HTTPException(status_code=400, detail="Send between 1 and 1000 updates")
+    inventory_service = InventoryService(db)
+    variants = await inventory_service.set_stock(updates)
+    return {"message": "Stock updated successfully", "updated": len(variants)}
+
+@router.get("/reviews", response_model=List[ReviewResponse])
+async def get_reviews(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    is_approved: Optional[bool] = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    """Get reviews, e.g. is_approved=false for the moderation queue (admin only)"""
+    await get_current_admin_user(db)
+    review_service = ReviewService(db)
+    return await review_service.get_reviews(skip, limit, is_approved)
+
+@router.put("/reviews/{review_id}/moderation", response_model=ReviewResponse)
+async def moderate_review(review_id: str, is_approved: bool, db: Session = Depends(get_db)):
+    """Approve or reject a review (admin only)"""
+    await get_current_admin_user(db)
+    review_service = ReviewService(db)
+    review = await review_service.moderate_review(review_id, is_approved)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    return review
 
 @router.get("/analytics")
 async def get_analytics(
     days: int = Query(30, ge=1, le=365),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get analytics data (admin only)"""
     await get_current_admin_user(db)
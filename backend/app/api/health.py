@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.health import health_monitor
+
+router = APIRouter()
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: dependencies are reachable and the DB pool has headroom"""
+    results = await health_monitor.run_checks()
+    database_ok = results["database"].healthy
+    redis_ok = results["redis"].healthy
+
+    if not database_ok:
+        status = "unavailable"
+    elif not redis_ok:
+        # Redis only backs the cache; degraded but still able to serve traffic
+        status = "degraded"
+    else:
+        status = "ok"
+
+    return JSONResponse(
+        status_code=200 if database_ok else 503,
+        content={
+            "status": status,
+            "checks": {name: result.to_dict() for name, result in results.items()},
+        },
+    )
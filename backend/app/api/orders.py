@@ -1,27 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
-from app.schemas import OrderCreate, OrderResponse
+from app.database import get_db, get_read_db, stick_to_primary
+from app.schemas import OrderCreate, OrderResponse, OrderSummary, QuoteRequest, QuoteResponse, UserOrderStatsResponse
 from app.services.order_service import OrderService
+from app.services.order_stats_service import OrderStatsService
+from app.services.pricing_service import PricingService
 from app.services.auth_service import get_current_user
 
 router = APIRouter()
 
-@router.get("/", response_model=List[OrderResponse])
+@router.get("/", response_model=List[OrderSummary])
 async def get_user_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     status: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get current user's orders"""
+    """Get a page of the current user's order history"""
     current_user = await get_current_user(db)
     order_service = OrderService(db)
     return await order_service.get_user_orders(current_user.id, skip, limit, status)
 
+@router.get("/stats", response_model=UserOrderStatsResponse)
+async def get_order_stats(db: Session = Depends(get_read_db)):
+    """Get the current user's order count, lifetime spend and last order date"""
+    current_user = await get_current_user(db)
+    return await OrderStatsService(db).get_stats(current_user.id)
+
 @router.get("/{order_id}", response_model=OrderResponse)
-async def get_order(order_id: str, db: Session = Depends(get_db)):
+async def get_order(order_id: str, db: Session = Depends(get_read_db)):
     """Get specific order details"""
     current_user = await get_current_user(db)
     order_service = OrderService(db)
@@ -30,19 +38,38 @@ async def get_order(order_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
+@router.post("/quote", response_model=QuoteResponse)
+async def quote_order(quote_request: QuoteRequest, db: Session = Depends(get_read_db)):
+    """Price cart items with tax and shipping, as checkout would"""
+    address = quote_request.shipping_address.dict() if quote_request.shipping_address else None
+    return await PricingService(db).quote_items(quote_request.items, address)
+
 @router.post("/", response_model=OrderResponse)
-async def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
-    """Create new order"""
+async def create_order(
+    order_data: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db)
+):
+    """Create new order; retries with the same Idempotency-Key return the original order"""
     current_user = await get_current_user(db)
     order_service = OrderService(db)
-    return await order_service.create_order(order_data, current_user.id)
+    order = await order_service.create_order(order_data, current_user.id, idempotency_key)
+    stick_to_primary(response)
+    return order
 
 @router.post("/{order_id}/cancel")
-async def cancel_order(order_id: str, db: Session = Depends(get_db)):
+async def cancel_order(
+    order_id: str,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db)
+):
     """Cancel order"""
     current_user = await get_current_user(db)
     order_service = OrderService(db)
-    success = await order_service.cancel_order(order_id, current_user.id)
+    success = await order_service.cancel_order(order_id, current_user.id, idempotency_key)
     if not success:
         raise HTTPException(status_code=400, detail="Order cannot be cancelled")
+    stick_to_primary(response)
     return {"message": "Order cancelled successfully"}
\ No newline at end of file
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
-from app.schemas import ProductCreate, ProductUpdate, ProductResponse
+from app.database import get_db, get_read_db
+from app.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductVariantResponse
+from app.services.auth_service import get_current_admin_user
+from app.services.image_service import ImageService, read_image_upload
 from app.services.product_service import ProductService
 
 router = APIRouter()
@@ -16,7 +18,7 @@ async def get_products(
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     sort_by: Optional[str] = Query("created_at"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get products with optional filtering and pagination"""
     product_service = ProductService(db)
@@ -31,29 +33,35 @@ async def get_products(
     )
 
 @router.get("/featured", response_model=List[ProductResponse])
-async def get_featured_products(limit: int = Query(8, ge=1, le=20), db: Session = Depends(get_db)):
+async def get_featured_products(limit: int = Query(8, ge=1, le=20), db: Session = Depends(get_read_db)):
     """Get featured products"""
     product_service = ProductService(db)
     return await product_service.get_featured_products(limit)
 
 @router.get("/new-arrivals", response_model=List[ProductResponse])
-async def get_new_arrivals(limit: int = Query(8, ge=1, le=20), db: Session = Depends(get_db)):
+async def get_new_arrivals(limit: int = Query(8, ge=1, le=20), db: Session = Depends(get_read_db)):
     """Get new arrivals"""
     product_service = ProductService(db)
     return await product_service.get_new_arrivals(limit)
 
+@router.get("/trending", response_model=List[ProductResponse])
+async def get_trending_products(limit: int = Query(8, ge=1, le=50), db: Session = Depends(get_read_db)):
+    """Get products selling and viewed the most right now"""
+    product_service = ProductService(db)
+    return await product_service.get_trending_products(limit)
+
 @router.get("/search", response_model=List[ProductResponse])
 async def search_products(
     q: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Search products"""
     product_service = ProductService(db)
     return await product_service.search_products(q, limit)
 
 @router.get("/{slug}", response_model=ProductResponse)
-async def get_product(slug: str, db: Session = Depends(get_db)):
+async def get_product(slug: str, db: Session = Depends(get_read_db)):
     """Get single product by slug"""
     product_service = ProductService(db)
     product = await product_service.get_product_by_slug(slug)
@@ -61,6 +69,19 @@ async def get_product(slug: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
+@router.get("/{slug}/related", response_model=List[ProductResponse])
+async def get_related_products(
+    slug: str,
+    limit: int = Query(8, ge=1, le=20),
+    db: Session = Depends(get_read_db)
+):
+    """Get products frequently bought together with this one"""
+    product_service = ProductService(db)
+    products = await product_service.get_related_products(slug, limit)
+    if products is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return products
+
 @router.post("/", response_model=ProductResponse)
 async def create_product(product_data: ProductCreate, db: Session = Depends(get_db)):
     """Create new product (admin only)"""
@@ -89,14 +110,47 @@ async def delete_product(product_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Product not found")
     return {"message": "Product deleted successfully"}
 
+@router.post(
+    "/{product_id}/variants/{variant_id}/images",
+    response_model=ProductVariantResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+async def upload_variant_image(
+    product_id: str,
+    variant_id: str,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Upload a variant image; stored resized as WebP (admin only)"""
+    await get_current_admin_user(db)
+    upload = await read_image_upload(request)
+    image_service = ImageService(db)
+    variant = await image_service.add_variant_image(product_id, variant_id, upload)
+    if not variant:
+        raise HTTPException(status_code=404, detail="Product variant not found")
+    return variant
+
 @router.get("/categories/list", response_model=List[str])
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: Session = Depends(get_read_db)):
     """Get available sports categories"""
     product_service = ProductService(db)
     return await product_service.get_categories()
 
 @router.get("/teams/list", response_model=List[str])
-async def get_teams(sport: Optional[str] = Query(None), db: Session = Depends(get_db)):
+async def get_teams(sport: Optional[str] = Query(None), db: Session = Depends(get_read_db)):
     """Get available teams by sport"""
     product_service = ProductService(db)
     return await product_service.get_teams(sport)
\ No newline at end of file
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db, get_read_db, stick_to_primary
+from app.schemas import ReviewCreate, ReviewUpdate, ReviewResponse
+from app.services.review_service import ReviewService
+from app.services.auth_service import get_current_user
+
+router = APIRouter()
+
+@router.get("/product/{product_id}", response_model=List[ReviewResponse])
+async def get_product_reviews(
+    product_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Get approved reviews for a product, newest first"""
+    review_service = ReviewService(db)
+    return await review_service.get_product_reviews(product_id, skip, limit)
+
+@router.post("/", response_model=ReviewResponse)
+async def create_review(review_data: ReviewCreate, response: Response, db: Session = Depends(get_db)):
+    """Review a product; one review per customer and product"""
+    current_user = await get_current_user(db)
+    review_service = ReviewService(db)
+    review = await review_service.create_review(review_data, current_user.id)
+    stick_to_primary(response)
+    return review
+
+@router.put("/{review_id}", response_model=ReviewResponse)
+async def update_review(
+    review_id: str,
+    review_data: ReviewUpdate,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """Update own review"""
+    current_user = await get_current_user(db)
+    review_service = ReviewService(db)
+    review = await review_service.update_review(review_id, review_data, current_user.id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    stick_to_primary(response)
+    return review
+
+@router.delete("/{review_id}")
+async def delete_review(review_id: str, response: Response, db: Session = Depends(get_db)):
+    """Delete own review (admins may delete any)"""
+    current_user = await get_current_user(db)
+    review_service = ReviewService(db)
+    success = await review_service.delete_review(review_id, current_user.id, is_admin=current_user.is_admin)
+    if not success:
+        raise HTTPException(status_code=404, detail="Review not found")
+    stick_to_primary(response)
+    return {"message": "Review deleted successfully"}
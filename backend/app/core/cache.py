@@ -0,0 +1,218 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Optional, Tuple, Type
+import redis
+from redis.lock import Lock
+from app.config import settings
+from app.core.metrics import registry
+from app.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOADS = registry.counter(
+    "cache_loads_total",
+    "Cache misses by how they were answered: loaded, or shared from another request's load",
+    ["cache", "source"],
+)
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
+
+
+def close_redis():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+class CacheEntry:
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+
+class JSONCache:
+    """Redis-backed JSON cache that keeps entries past their freshness TTL.
+
+    Stale entries are not served on the normal path, but remain available as a
+    fallback while the database is unavailable. Redis errors are logged and
+    treated as cache misses so the cache never takes a request down.
+
+    A miss is loaded once, not once per request: concurrent misses for a key
+    within a worker share one load (SingleFlight), and across workers a Redis
+    lock lets one of them load while the others serve the stale entry or, when
+    there is none, wait for the lock holder's result. get_or_load() makes its
+    Redis calls in threads, so a slow Redis never blocks the event loop.
+    """
+
+    def __init__(self, prefix: str, ttl: int, stale_ttl: int):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._flights = SingleFlight()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        if not settings.CACHE_ENABLED:
+            return None
+        try:
+            raw = get_redis().get(self._key(key))
+        except redis.RedisError as exc:
+            logger.warning("Cache read failed for %s: %s", key, exc)
+            return None
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        return CacheEntry(payload["value"], payload["stored_at"])
+
+    def set(self, key: str, value: Any):
+        if not settings.CACHE_ENABLED:
+            return
+        payload = json.dumps({"value": value, "stored_at": time.time()}, default=str)
+        try:
+            get_redis().set(self._key(key), payload, ex=self.stale_ttl)
+        except redis.RedisError as exc:
+            logger.warning("Cache write failed for %s: %s", key, exc)
+
+    def delete(self, key: str):
+        if not settings.CACHE_ENABLED:
+            return
+        try:
+            get_redis().delete(self._key(key))
+        except redis.RedisError as exc:
+            logger.warning("Cache delete failed for %s: %s", key, exc)
+
+    def invalidate(self):
+        """Drop every entry under this cache's prefix"""
+        if not settings.CACHE_ENABLED:
+            return
+        try:
+            client = get_redis()
+            # Load locks share the prefix; deleting them would let a second worker start the same load
+            lock_prefix = self._key("lock:").encode()
+            keys = [
+                key for key in client.scan_iter(match=f"{self.prefix}:*", count=500)
+                if not key.startswith(lock_prefix)
+            ]
+            if keys:
+                client.delete(*keys)
+        except redis.RedisError as exc:
+            logger.warning("Cache invalidation failed for %s: %s", self.prefix, exc)
+
+    def _lock(self, key: str) -> Optional[Lock]:
+        """Take the cross-worker load lock for key; None if another worker holds it"""
+        lock = get_redis().lock(
+            self._key(f"lock:{key}"), timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS, blocking=False
+        )
+        return lock if lock.acquire() else None
+
+    async def _wait_for(self, key: str) -> Optional[CacheEntry]:
+        """Poll for the fresh entry another worker is loading"""
+        deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await asyncio.to_thread(self.get_entry, key)
+            if entry is not None and entry.is_fresh(self.ttl):
+                return entry
+        return None
+
+    async def _load(
+        self,
+        key: str,
+        entry: Optional[CacheEntry],
+        loader: Callable[[], Any],
+        stale_on: Tuple[Type[BaseException], ...],
+    ) -> Any:
+        lock = None
+        if settings.CACHE_ENABLED:
+            try:
+                lock = await asyncio.to_thread(self._lock, key)
+                if lock is None:
+                    if entry is not None:
+                        # Stale-while-revalidate: the lock holder is refreshing it
+                        CACHE_LOADS.inc(self.prefix, "stale")
+                        return entry.value
+                    loaded = await self._wait_for(key)
+                    if loaded is not None:
+                        CACHE_LOADS.inc(self.prefix, "other_worker")
+                        return loaded.value
+                    # The holder is slow or gone; load it here as well
+            except redis.RedisError as exc:
+                logger.warning("Cache lock failed for %s: %s", key, exc)
+
+        try:
+            # The loader queries synchronously; run it off the event loop so
+            # requests arriving meanwhile can join this load
+            value = await asyncio.to_thread(loader)
+        except stale_on:
+            if entry is None:
+                raise
+            logger.warning("Serving stale cache entry for %s", key)
+            return entry.value
+        else:
+            CACHE_LOADS.inc(self.prefix, "loaded")
+            await asyncio.to_thread(self.set, key, value)
+            return value
+        finally:
+            if lock is not None:
+                try:
+                    await asyncio.to_thread(lock.release)
+                except redis.RedisError:
+                    # Expired mid-load; another worker may already hold it
+                    pass
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        serve_stale: Callable[[], bool] = lambda: False,
+        stale_on: Tuple[Type[BaseException], ...] = (),
+    ) -> Any:
+        """Return a fresh cached value, or call loader and cache its result.
+
+        A stale entry is served instead of calling loader when serve_stale()
+        is true, when loader raises one of the stale_on exceptions, or while
+        another worker is loading the same key.
+
+        loader runs in a thread and its result is shared with concurrent
+        callers, so it must open its own session (app.database.read_session)
+        rather than use the caller's request-scoped one.
+        """
+        entry = await asyncio.to_thread(self.get_entry, key)
+        if entry is not None and (entry.is_fresh(self.ttl) or serve_stale()):
+            return entry.value
+
+        if key in self._flights:
+            CACHE_LOADS.inc(self.prefix, "same_worker")
+        return await self._flights.do(key, lambda: self._load(key, entry, loader, stale_on))
+
+
+catalog_cache = JSONCache(
+    "catalog",
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    stale_ttl=settings.CATALOG_CACHE_STALE_TTL_SECONDS,
+)
+
+analytics_cache = JSONCache(
+    "analytics",
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS,
+    stale_ttl=60 * 60,
+)
@@ -0,0 +1,57 @@
+"""In-process domain events, delivered once the transaction that raised them commits.
+
+Services emit events while they write; the events wait on the session and are
+handed to subscribers after a successful commit, or dropped on rollback, so a
+subscriber never sees a change that did not happen. Subscribers run in the
+request's worker and must not use the emitting session (it has just
+committed); failures are logged and never reach the caller. Work that has to
+be atomic with the change belongs in the transaction itself, not here.
+
+    @bus.subscribe(OrderStatusChanged)
+    def notify_customer(event: OrderStatusChanged):
+        ...
+"""
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Type
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PENDING_EVENTS = "pending_events"
+
+
+class EventBus:
+    def __init__(self):
+        self._handlers: Dict[Type, List[Callable[[Any], None]]] = defaultdict(list)
+
+    def subscribe(self, event_type: Type):
+        def register(handler: Callable[[Any], None]):
+            self._handlers[event_type].append(handler)
+            return handler
+        return register
+
+    def emit(self, db: Session, domain_event: Any):
+        """Queue an event for delivery when db commits"""
+        db.info.setdefault(PENDING_EVENTS, []).append(domain_event)
+
+    def _deliver(self, session: Session):
+        for domain_event in session.info.pop(PENDING_EVENTS, []):
+            for handler in self._handlers.get(type(domain_event), []):
+                try:
+                    handler(domain_event)
+                except Exception:
+                    logger.exception("Event handler %s failed for %r", handler.__name__, domain_event)
+
+    def _discard(self, session: Session):
+        session.info.pop(PENDING_EVENTS, None)
+
+    def install(self, session_factory):
+        event.listen(session_factory, "after_commit", self._deliver)
+        event.listen(session_factory, "after_rollback", self._discard)
+
+
+bus = EventBus()
+bus.install(SessionLocal)
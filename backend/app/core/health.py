@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.core.cache import get_redis
+from app.database import engine
+
+
+class CheckResult:
+    def __init__(self, healthy: bool, latency_ms: Optional[float] = None, detail: Optional[str] = None):
+        self.healthy = healthy
+        self.latency_ms = latency_ms
+        self.detail = detail
+        self.checked_at = time.monotonic()
+
+    def to_dict(self) -> dict:
+        result = {"status": "ok" if self.healthy else "fail"}
+        if self.latency_ms is not None:
+            result["latency_ms"] = round(self.latency_ms, 2)
+        if self.detail:
+            result["detail"] = self.detail
+        return result
+
+
+def pool_saturation(engine: Engine) -> Optional[float]:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return None
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return pool.checkedout() / capacity if capacity else None
+
+
+def _ping_database(engine: Engine):
+    with engine.connect() as connection:
+        if engine.dialect.name == "postgresql":
+            timeout_ms = int(settings.HEALTH_CHECK_TIMEOUT_SECONDS * 1000)
+            connection.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+        connection.execute(text("SELECT 1"))
+
+
+class HealthMonitor:
+    """Runs dependency checks under strict timeouts and caches their results.
+
+    Probes from the load balancer hit the cached results, so at most one check
+    per dependency runs per HEALTH_CHECK_CACHE_SECONDS in each worker.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._results: Dict[str, CheckResult] = {}
+        self._lock = asyncio.Lock()
+
+    def _cached(self, name: str) -> Optional[CheckResult]:
+        result = self._results.get(name)
+        if result and time.monotonic() - result.checked_at < settings.HEALTH_CHECK_CACHE_SECONDS:
+            return result
+        return None
+
+    async def _timed(self, check) -> CheckResult:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(check), settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            return CheckResult(False, detail="timeout")
+        except Exception as exc:
+            return CheckResult(False, detail=type(exc).__name__)
+        return CheckResult(True, latency_ms=(time.perf_counter() - start) * 1000)
+
+    async def check_database(self) -> CheckResult:
+        saturation = pool_saturation(self.engine)
+        if saturation is not None and saturation >= settings.DB_POOL_SATURATION_THRESHOLD:
+            # Don't queue behind request traffic for a connection; a saturated pool is not ready
+            return CheckResult(False, detail=f"pool saturated ({saturation:.0%})")
+        return await self._timed(lambda: _ping_database(self.engine))
+
+    async def check_redis(self) -> CheckResult:
+        return await self._timed(lambda: get_redis().ping())
+
+    async def run_checks(self) -> Dict[str, CheckResult]:
+        async with self._lock:
+            checks = {"database": self.check_database, "redis": self.check_redis}
+            for name, check in checks.items():
+                if self._cached(name) is None:
+                    self._results[name] = await check()
+            return dict(self._results)
+
+    def database_available(self) -> bool:
+        """Last known database status, without running a check"""
+        result = self._results.get("database")
+        if result is None or result.healthy:
+            return True
+        # An old failure no longer counts, so traffic itself retries the database
+        return time.monotonic() - result.checked_at >= settings.HEALTH_CHECK_CACHE_SECONDS
+
+    def mark_database_unhealthy(self, detail: str = "query failed"):
+        self._results["database"] = CheckResult(False, detail=detail)
+
+
+health_monitor = HealthMonitor(engine)
@@ -0,0 +1,49 @@
+"""Primary key generation.
+
+Random (v4) UUIDs spread inserts over the whole primary-key B-tree, so every
+insert into a large table touches a cold leaf page. UUIDv7 (RFC 9562) puts a
+millisecond timestamp in the leading bits, so new keys land on the right edge
+of the index like a sequence would, while staying globally unique and
+unguessable enough for public URLs.
+
+Models use ``default=new_id``; USE_TIME_ORDERED_IDS switches it from v4 to v7.
+Both kinds share the uuid column type, so a table can hold a mix of them.
+"""
+import secrets
+import threading
+import time
+import uuid
+from app.config import settings
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """UUIDv7 whose 12-bit rand_a field is a counter, so ids are monotonic per process"""
+    global _last_ms, _counter
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            # Random start leaves room to count up within the millisecond
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                _last_ms += 1
+                _counter = 0
+        ms, counter = _last_ms, _counter
+
+    value = (ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= secrets.randbits(62)
+    return uuid.UUID(int=value)
+
+
+def new_id() -> uuid.UUID:
+    return uuid7() if settings.USE_TIME_ORDERED_IDS else uuid.uuid4()
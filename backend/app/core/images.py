@@ -0,0 +1,96 @@
+"""Product image processing.
+
+Every upload is resized once per view in IMAGE_SIZES (longest edge, never
+upscaled) and encoded as WebP. Resizing is CPU-bound and holds the GIL, so it
+runs in a process pool rather than on the event loop or its thread pool.
+
+Stored files are named after the SHA-256 of the original upload:
+
+    media/3f/3f9a...c1-thumbnail.webp
+    media/3f/3f9a...c1-grid.webp
+    media/3f/3f9a...c1-detail.webp
+
+A name therefore always refers to the same bytes and can be cached forever,
+and uploading the same photo twice stores it once. ``ProductVariant.image_urls``
+keeps the detail URL; the other sizes are derived from it (see image_set).
+"""
+import asyncio
+import io
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+from app.config import settings
+
+FORMAT = "webp"
+_NAME = re.compile(r"^(?P<prefix>.*/[0-9a-f]{2}/[0-9a-f]{64})-(?P<size>[a-z]+)\.webp$")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def image_name(digest: str, size: str) -> str:
+    return f"{digest[:2]}/{digest}-{size}.{FORMAT}"
+
+
+def image_set(url: str) -> Dict[str, str]:
+    """URL of every size for a stored image URL.
+
+    URLs that were not produced by this pipeline (external or legacy images)
+    map to themselves for every size.
+    """
+    match = _NAME.match(url)
+    if not match or match.group("size") not in settings.IMAGE_SIZES:
+        return {size: url for size in settings.IMAGE_SIZES}
+    return {size: f"{match.group('prefix')}-{size}.{FORMAT}" for size in settings.IMAGE_SIZES}
+
+
+def process_image(data: bytes, sizes: Dict[str, int], quality: int) -> Dict[str, bytes]:
+    """Resize data to each size and encode as WebP; runs in a worker process"""
+    # Imported here so web workers that never process an upload don't load Pillow
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(io.BytesIO(data)) as probe:
+            probe.verify()
+        # verify() leaves the image unusable, so decode again
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as exc:
+        raise InvalidImage("File is not a valid image") from exc
+
+    # Phone photos are often stored sideways with an EXIF rotation flag
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    encoded = {}
+    for size, edge in sizes.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, "WEBP", quality=quality, method=4)
+        encoded[size] = buffer.getvalue()
+    return encoded
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS)
+    return _executor
+
+
+async def resize_image(data: bytes) -> Dict[str, bytes]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), process_image, data, dict(settings.IMAGE_SIZES), settings.IMAGE_WEBP_QUALITY
+    )
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,143 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.metrics import registry
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+)
+REQUEST_COUNT = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+DB_QUERIES = registry.counter(
+    "db_queries_total",
+    "Database statements executed, by route",
+    ["method", "route"],
+)
+DB_QUERY_TIME = registry.counter(
+    "db_query_seconds_total",
+    "Time spent executing database statements, by route",
+    ["method", "route"],
+)
+QUERIES_PER_REQUEST = registry.histogram(
+    "db_queries_per_request",
+    "Number of database statements executed per request",
+    ["route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+)
+
+
+@dataclass
+class RequestStats:
+    """Per-request counters shared by the middleware and the SQLAlchemy hooks"""
+    started_at: float = field(default_factory=time.perf_counter)
+    query_count: int = 0
+    query_time: float = 0.0
+    # Filled in by the query log when this request is sampled
+    query_log_sampled: Optional[bool] = None
+    statement_counts: Dict[str, int] = field(default_factory=dict)
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def get_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.query_time += elapsed
+
+
+def install_query_hooks(engine: Engine):
+    """Count statements and DB time per request on the given engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def register_pool_metrics(engine: Engine, name: str = "primary"):
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    registry.gauge(f"db_pool_{name}_size", f"Configured size of the {name} connection pool", pool.size)
+    registry.gauge(f"db_pool_{name}_checked_out", f"Connections currently checked out of the {name} pool", pool.checkedout)
+    registry.gauge(f"db_pool_{name}_overflow", f"Overflow connections open in the {name} pool", pool.overflow)
+
+
+def _route_template(app, scope: Scope) -> str:
+    # Use the route template rather than the raw path to keep label cardinality bounded
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Record latency, status codes and DB usage for every HTTP request"""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False, excluded_paths=("/metrics",)):
+        self.app = app
+        self.server_timing = server_timing
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    total_ms = (time.perf_counter() - stats.started_at) * 1000
+                    header = (
+                        f'db;dur={stats.query_time * 1000:.2f};desc="{stats.query_count} queries", '
+                        f"app;dur={total_ms:.2f}"
+                    )
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", header.encode("latin-1")))
+                    message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - stats.started_at
+            method = scope["method"]
+            route = _route_template(scope.get("app"), scope)
+
+            REQUEST_LATENCY.observe(elapsed, method, route)
+            REQUEST_COUNT.inc(method, route, str(status_code))
+            DB_QUERIES.inc(method, route, amount=stats.query_count)
+            DB_QUERY_TIME.inc(method, route, amount=stats.query_time)
+            QUERIES_PER_REQUEST.observe(stats.query_count, route)
@@ -0,0 +1,89 @@
+"""Per-worker startup and shutdown.
+
+Under gunicorn (gunicorn.conf.py) the app is imported once in the master and
+forked into each worker, so nothing here runs at import time: every worker
+opens its own connections when it starts and closes them when it stops.
+
+A worker only accepts traffic once start_worker() returns, so everything a
+first request would otherwise pay for - ORM mapper configuration, opening
+connections, filling the catalog cache - is done here instead.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import configure_mappers
+from app.config import settings
+from app.core.cache import close_redis, get_redis
+from app.core.images import shutdown_executor
+from app.core.trending import trending
+from app.database import dispose_engines, engine, replica_engines
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_pool(pooled_engine: Engine, connections: int):
+    # Hold every connection at once, otherwise the pool hands back the same one
+    with contextlib.ExitStack() as stack:
+        for _ in range(connections):
+            connection = stack.enter_context(pooled_engine.connect())
+            connection.execute(text("SELECT 1"))
+
+
+def warm_pools():
+    """Open DB_POOL_WARM_CONNECTIONS per engine and one Redis connection.
+
+    Failures are logged, not raised: a worker still starts while a dependency
+    is down, and /health/ready reports it until it recovers.
+    """
+    for pooled_engine in [engine, *replica_engines]:
+        connections = min(settings.DB_POOL_WARM_CONNECTIONS, pooled_engine.pool.size())
+        try:
+            _warm_pool(pooled_engine, connections)
+        except Exception as exc:
+            logger.warning("Could not warm the pool of %s: %s", pooled_engine.url.host, exc)
+    try:
+        get_redis().ping()
+    except Exception as exc:
+        logger.warning("Could not connect to Redis: %s", exc)
+
+
+def prepare_app():
+    """Work that can be shared by forked workers; cheap to repeat once done"""
+    # Resolves every relationship and backref, otherwise done by the first query
+    configure_mappers()
+
+
+async def start_worker(*warmers):
+    """Prepare the app and warm connection pools, then run each warmer (an async callable) in turn"""
+    started = time.perf_counter()
+    prepare_app()
+    prepared = time.perf_counter()
+    await asyncio.to_thread(warm_pools)
+    trending.start()
+    connected = time.perf_counter()
+    for warmer in warmers:
+        try:
+            await warmer()
+        except Exception as exc:
+            logger.warning("Warm-up step %s failed: %r", getattr(warmer, "__name__", warmer), exc)
+    finished = time.perf_counter()
+    logger.info(
+        "Worker %d ready in %.0f ms (mappers %.0f ms, connections %.0f ms, warm-up %.0f ms)",
+        os.getpid(),
+        (finished - started) * 1000,
+        (prepared - started) * 1000,
+        (connected - prepared) * 1000,
+        (finished - connected) * 1000,
+    )
+
+
+def stop_worker():
+    """Flush buffered counters and release pooled resources"""
+    trending.stop()
+    shutdown_executor()
+    close_redis()
+    dispose_engines()
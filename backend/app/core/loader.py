@@ -0,0 +1,149 @@
+"""Request-scoped batch loading of ORM relationships.
+
+Lazy relationship loads issue one query per parent row, so serializing a page
+of orders with their items costs a query per order. A RelationshipLoader
+collects every load of one relationship requested during the same event-loop
+tick and resolves them with a single ``WHERE key IN (...)`` query, then sets
+the result on each parent as if it had been loaded normally. Results are kept
+in a per-session identity cache, so the same parent is never loaded twice in
+one request.
+
+    orders = query.all()
+    await load_relationship(db, Order.items, orders)
+
+Loaders live in ``Session.info``; sessions are request-scoped (see
+app.database.get_db), so the cache is too.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+from sqlalchemy import event, inspect, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import InstrumentedAttribute, set_committed_value
+from sqlalchemy.orm.interfaces import MANYTOONE
+
+_LOADERS_KEY = "relationship_loaders"
+
+
+class RelationshipLoader:
+    def __init__(self, db: Session, attribute: InstrumentedAttribute):
+        prop = attribute.property
+        self.db = db
+        self.key = prop.key
+        self.target = prop.mapper
+        self.many_to_one = prop.direction is MANYTOONE
+        self.uselist = prop.uselist
+        # Column pairs joining parent to target, e.g. orders.id -> order_items.order_id
+        parent = prop.parent
+        self._parent_attrs = [parent.get_property_by_column(local).key for local, _ in prop.local_remote_pairs]
+        self._target_attrs = [self.target.get_property_by_column(remote).key for _, remote in prop.local_remote_pairs]
+        self._target_columns = [remote for _, remote in prop.local_remote_pairs]
+
+        self._cache: Dict[Hashable, Any] = {}
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = defaultdict(list)
+        self._scheduled = False
+
+    def _parent_key(self, parent) -> Hashable:
+        return tuple(getattr(parent, attr) for attr in self._parent_attrs)
+
+    def _is_loaded(self, parent) -> bool:
+        return self.key in inspect(parent).dict
+
+    def _assign(self, parent, key: Hashable):
+        if not self._is_loaded(parent):
+            set_committed_value(parent, self.key, self._cache[key])
+
+    def _fetch(self, keys: List[Hashable]):
+        """Load all keys with one query and fill the identity cache"""
+        if len(self._target_columns) == 1:
+            condition = self._target_columns[0].in_([key[0] for key in keys])
+        else:
+            condition = tuple_(*self._target_columns).in_(keys)
+        rows = self.db.query(self.target.class_).filter(condition).all()
+
+        grouped: Dict[Hashable, list] = defaultdict(list)
+        for row in rows:
+            grouped[tuple(getattr(row, attr) for attr in self._target_attrs)].append(row)
+        for key in keys:
+            found = grouped.get(key, [])
+            self._cache[key] = found if self.uselist else (found[0] if found else None)
+
+    def prime(self, parents: Iterable[Any]):
+        """Load the relationship for every parent now, in at most one query"""
+        parents = [parent for parent in parents if parent is not None]
+        missing = []
+        for parent in parents:
+            key = self._parent_key(parent)
+            if key not in self._cache and not self._is_loaded(parent):
+                missing.append(key)
+        if missing:
+            self._fetch(list(dict.fromkeys(missing)))
+        for parent in parents:
+            key = self._parent_key(parent)
+            if key in self._cache:
+                self._assign(parent, key)
+
+    def load(self, parent) -> "asyncio.Future":
+        """Resolve the relationship for parent, batched with other loads this tick"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = self._parent_key(parent)
+
+        if self._is_loaded(parent):
+            future.set_result(getattr(parent, self.key))
+        elif key in self._cache:
+            self._assign(parent, key)
+            future.set_result(self._cache[key])
+        elif self.many_to_one and all(value is None for value in key):
+            future.set_result(None)
+        else:
+            self._pending[key].append((parent, future))
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self):
+        pending, self._pending = self._pending, defaultdict(list)
+        self._scheduled = False
+        try:
+            self._fetch(list(pending))
+        except Exception as exc:
+            for waiters in pending.values():
+                for _, future in waiters:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+        for key, waiters in pending.items():
+            for parent, future in waiters:
+                self._assign(parent, key)
+                if not future.done():
+                    future.set_result(self._cache[key])
+
+    async def load_many(self, parents: Iterable[Any]) -> list:
+        return list(await asyncio.gather(*(self.load(parent) for parent in parents)))
+
+
+def get_loader(db: Session, attribute: InstrumentedAttribute) -> RelationshipLoader:
+    loaders = db.info.setdefault(_LOADERS_KEY, {})
+    name = (attribute.class_, attribute.key)
+    if name not in loaders:
+        loaders[name] = RelationshipLoader(db, attribute)
+    return loaders[name]
+
+
+async def load_relationship(db: Session, attribute: InstrumentedAttribute, parents: Iterable[Any]) -> list:
+    """Batch-load attribute (e.g. Order.items) for all parents; returns the related values"""
+    return await get_loader(db, attribute).load_many(parents)
+
+
+def prime_relationship(db: Session, attribute: InstrumentedAttribute, parents: Iterable[Any]):
+    """Synchronous load_relationship for code that cannot await, such as cache loaders"""
+    get_loader(db, attribute).prime(parents)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_loaders(session: Session):
+    # Committed or rolled-back instances are expired; cached results would be stale
+    session.info.pop(_LOADERS_KEY, None)
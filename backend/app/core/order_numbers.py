@@ -0,0 +1,86 @@
+"""Collision-free order numbers from a Postgres sequence, allocated in blocks.
+
+The ``order_number_seq`` sequence increments by the block size (migration
+0009), so each nextval() reserves a whole block of numbers for one process.
+Numbers are then handed out from memory; a worker touches the database once
+per block, on its own autocommitted connection, never inside a checkout
+transaction. Sequence values are never reused, so numbers cannot collide
+across workers, restarts or days.
+
+    ORD-20261019-0000RS0
+        date    base-36 sequence value
+
+Each worker fills its own block, so concurrent inserts land on separate
+ranges of the order_number index rather than all on its right-most page.
+"""
+import os
+import string
+import threading
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.database import engine
+
+SEQUENCE = "order_number_seq"
+DIGITS = string.digits + string.ascii_uppercase
+WIDTH = 7  # "ORD-YYYYMMDD-" leaves 7 of the column's 20 characters: 36**7 ~ 78 billion
+
+
+def to_base36(value: int, width: int = WIDTH) -> str:
+    encoded = ""
+    while value:
+        value, remainder = divmod(value, 36)
+        encoded = DIGITS[remainder] + encoded
+    if len(encoded) > width:
+        raise OverflowError(f"{SEQUENCE} exceeded {width} base-36 digits")
+    return encoded.rjust(width, "0")
+
+
+class SequenceBlockAllocator:
+    """Hands out integers from blocks reserved with one nextval() each"""
+
+    def __init__(self, engine: Engine, sequence: str = SEQUENCE):
+        self.engine = engine
+        self.sequence = sequence
+        self.blocks_fetched = 0
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._next = 0
+        self._end = 0
+
+    def _fetch_block(self):
+        # The block size is the sequence's own increment, so it cannot drift from the schema
+        with self.engine.connect() as connection:
+            start, size = connection.execute(
+                text(
+                    "SELECT nextval(CAST(:sequence AS regclass)), increment "
+                    "FROM pg_sequences WHERE schemaname = current_schema() AND sequencename = :sequence"
+                ),
+                {"sequence": self.sequence},
+            ).one()
+            connection.commit()
+        self._next, self._end = start, start + size
+        self.blocks_fetched += 1
+
+    def next(self) -> int:
+        with self._lock:
+            # A forked worker must not hand out its parent's remaining block
+            if self._pid != os.getpid() or self._next >= self._end:
+                self._pid = os.getpid()
+                self._fetch_block()
+            value = self._next
+            self._next += 1
+            return value
+
+
+class OrderNumberGenerator:
+    def __init__(self, allocator: SequenceBlockAllocator):
+        self.allocator = allocator
+
+    def next(self, now: Optional[datetime] = None) -> str:
+        now = now or datetime.now()
+        return f"ORD-{now:%Y%m%d}-{to_base36(self.allocator.next())}"
+
+
+order_numbers = OrderNumberGenerator(SequenceBlockAllocator(engine))
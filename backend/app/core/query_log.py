@@ -0,0 +1,130 @@
+import logging
+import random
+import re
+import sys
+import time
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.core.instrumentation import get_request_stats
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_MAX_PARAMS_LENGTH = 500
+
+
+def _statement_shape(statement: str) -> str:
+    # Statements are already parameterized, so collapsing whitespace is enough to group them
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _format_parameters(parameters) -> str:
+    text = repr(parameters)
+    if len(text) > _MAX_PARAMS_LENGTH:
+        text = text[:_MAX_PARAMS_LENGTH] + "..."
+    return text
+
+
+def find_origin() -> str:
+    """Name the service method (or, failing that, the API handler) that issued the current statement"""
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename.replace("\\", "/")
+        if "/app/services/" in filename:
+            owner = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            return f"{type(owner).__name__}.{name}" if owner is not None else name
+        if fallback is None and "/app/api/" in filename:
+            fallback = f"api.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "<unknown>"
+
+
+def _is_sampled() -> bool:
+    stats = get_request_stats()
+    if stats is None:
+        return random.random() < settings.QUERY_LOG_SAMPLE_RATE
+    if stats.query_log_sampled is None:
+        stats.query_log_sampled = random.random() < settings.QUERY_LOG_SAMPLE_RATE
+    return stats.query_log_sampled
+
+
+def _explain(conn, cursor, statement: str, parameters) -> Optional[str]:
+    if conn.dialect.name != "postgresql" or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+
+    # On the statement's own connection: queries are slow when the pool is
+    # exhausted, and checking out a second connection would then block. A raw
+    # DBAPI cursor bypasses the statement hooks, so the plan query is neither
+    # logged nor counted, and a savepoint keeps a failed EXPLAIN from aborting
+    # the caller's transaction.
+    dbapi_connection = cursor.connection
+    in_transaction = not getattr(dbapi_connection, "autocommit", False)
+    explain_cursor = dbapi_connection.cursor()
+    try:
+        if in_transaction:
+            explain_cursor.execute("SAVEPOINT query_log_explain")
+        try:
+            explain_cursor.execute(f"EXPLAIN {statement}", parameters)
+            rows = explain_cursor.fetchall()
+        except Exception as exc:
+            if in_transaction:
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT query_log_explain")
+            return f"<explain failed: {exc}>"
+        if in_transaction:
+            explain_cursor.execute("RELEASE SAVEPOINT query_log_explain")
+        return "\n".join(row[0] for row in rows)
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_log_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_log_start_time")
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+
+    if not _is_sampled():
+        return
+
+    if elapsed_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+        explain = settings.SLOW_QUERY_EXPLAIN and not executemany
+        plan = _explain(conn, cursor, statement, parameters) if explain else None
+        logger.warning(
+            "Slow query (%.1f ms) from %s: %s | params=%s%s",
+            elapsed_ms,
+            find_origin(),
+            _statement_shape(statement),
+            _format_parameters(parameters),
+            f"\n{plan}" if plan else "",
+        )
+
+    stats = get_request_stats()
+    if stats is None or executemany:
+        return
+
+    shape = _statement_shape(statement)
+    count = stats.statement_counts.get(shape, 0) + 1
+    stats.statement_counts[shape] = count
+    # Warn once per shape per request, when it crosses the threshold
+    if count == settings.N_PLUS_ONE_THRESHOLD:
+        logger.warning(
+            "Possible N+1: statement executed %d times in one request from %s: %s",
+            count,
+            find_origin(),
+            shape,
+        )
+
+
+def install_query_log(engine: Engine):
+    """Log slow statements and repeated statement shapes on the given engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,25 @@
+"""Coalesce concurrent identical work within a process.
+
+When many requests miss the cache for the same key at once, only the first
+runs the load; the others await its result. The load runs as its own task, so
+a caller that goes away (client disconnect) does not cancel it for the rest.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Run work() for key unless a call for key is already in flight, then await the shared result"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._calls.pop(key) if self._calls.get(key) is done else None)
+        return await asyncio.shield(task)
@@ -0,0 +1,45 @@
+"""Storage backends for uploaded media.
+
+Names are content-addressed by the caller, so a stored file never changes and
+saving the same name twice is a no-op. That is what lets the media route
+serve everything with an immutable Cache-Control header.
+"""
+import os
+import tempfile
+from app.config import settings
+
+
+class LocalStorage:
+    """Files under a local directory, served by the app at base_url"""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split("/"))
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/{name}"
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    def save(self, name: str, data: bytes) -> str:
+        path = self.path(name)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so readers never see a partial file
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+        return self.url(name)
+
+
+media_storage = LocalStorage(settings.MEDIA_ROOT, settings.MEDIA_URL)
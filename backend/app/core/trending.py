@@ -0,0 +1,168 @@
+"""Exponentially decayed sales and view counters for trending products.
+
+Each counter is a Redis sorted set of product id -> score. Instead of
+decaying every score as time passes, each event is recorded with a weight
+that grows by 2x every half-life:
+
+    weight(t) = 2 ** ((t - epoch) / half_life)
+
+so recent events count for more and ordering by score equals ordering by the
+decayed count. Dividing a score by weight(now) gives its decayed value. The
+weights would eventually overflow, so app.jobs.trending periodically rebases:
+it scales every score down by weight(now) and moves the epoch to now, in one
+Lua script so no increment mixes old and new epochs.
+
+Sales are recorded per order, off the event loop. Views are much more
+frequent, so they are counted in process memory and a background task of each
+worker (start()) flushes them to Redis every TRENDING_FLUSH_SECONDS; a page
+view never waits on Redis. Redis errors are logged and dropped: trending is a
+ranking signal, never worth failing a request for.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import redis
+from app.config import settings
+from app.core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+SALES_KEY = "trending:sales"
+VIEWS_KEY = "trending:views"
+SCORE_KEY = "trending:score"
+EPOCH_KEY = "trending:epoch"
+
+# KEYS: counter, epoch. ARGV: now, half-life seconds, then member/amount pairs
+_INCREMENT = """
+local epoch = tonumber(redis.call('GET', KEYS[2]))
+if not epoch then
+    epoch = tonumber(ARGV[1])
+    redis.call('SET', KEYS[2], ARGV[1])
+end
+local weight = 2 ^ ((tonumber(ARGV[1]) - epoch) / tonumber(ARGV[2]))
+for i = 3, #ARGV, 2 do
+    redis.call('ZINCRBY', KEYS[1], tonumber(ARGV[i + 1]) * weight, ARGV[i])
+end
+return #ARGV / 2 - 1
+"""
+
+# KEYS: epoch, counters... ARGV: now, half-life seconds, minimum decayed score
+_REBASE = """
+local epoch = tonumber(redis.call('GET', KEYS[1]))
+if not epoch then
+    return 0
+end
+local factor = 2 ^ (-(tonumber(ARGV[1]) - epoch) / tonumber(ARGV[2]))
+for i = 2, #KEYS do
+    redis.call('ZUNIONSTORE', KEYS[i], 1, KEYS[i], 'WEIGHTS', factor)
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', '(' .. ARGV[3])
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class TrendingCounters:
+    def __init__(self, half_life_hours: float, view_weight: float, flush_seconds: float):
+        self.half_life = half_life_hours * 3600
+        self.view_weight = view_weight
+        self.flush_seconds = flush_seconds
+        self._views: Counter = Counter()
+        self._lock = threading.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _increment(self, key: str, amounts: Dict[str, float]):
+        if not amounts:
+            return
+        args: List = [time.time(), self.half_life]
+        for member, amount in amounts.items():
+            args.extend((member, amount))
+        get_redis().eval(_INCREMENT, 2, key, EPOCH_KEY, *args)
+
+    def record_sale(self, quantities: Dict[str, int]):
+        """Count units sold per product id"""
+        if not settings.TRENDING_ENABLED:
+            return
+        try:
+            self._increment(SALES_KEY, {str(product_id): quantity for product_id, quantity in quantities.items()})
+        except redis.RedisError as exc:
+            logger.warning("Trending sales update failed: %s", exc)
+
+    def record_view(self, product_id):
+        """Count a view in memory; the background flusher sends it to Redis"""
+        if not settings.TRENDING_ENABLED:
+            return
+        with self._lock:
+            self._views[str(product_id)] += 1
+
+    def flush(self):
+        """Send buffered views to Redis; blocks, so call it off the event loop"""
+        with self._lock:
+            views, self._views = self._views, Counter()
+        try:
+            self._increment(VIEWS_KEY, views)
+        except redis.RedisError as exc:
+            logger.warning("Trending views update failed: %s", exc)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                logger.exception("Trending views flush failed")
+
+    def start(self):
+        """Start flushing buffered views from a task on the running event loop"""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    def stop(self):
+        """Stop the flusher and send what is left; called when the worker shuts down"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        self.flush()
+
+    def epoch_age(self) -> float:
+        """Seconds since the last rebase"""
+        epoch = get_redis().get(EPOCH_KEY)
+        return time.time() - float(epoch) if epoch is not None else 0.0
+
+    def decay_factor(self) -> float:
+        """Divide raw scores by this to get decayed counts as of now"""
+        return 2 ** (self.epoch_age() / self.half_life)
+
+    def rebase(self, min_score: float = 0.01) -> bool:
+        """Rescale scores to the current time and drop products that have gone quiet"""
+        return bool(
+            get_redis().eval(
+                _REBASE, 4, EPOCH_KEY, SALES_KEY, VIEWS_KEY, SCORE_KEY, time.time(), self.half_life, min_score
+            )
+        )
+
+    def rank(self) -> int:
+        """Store the combined score of every product; returns the number of products ranked"""
+        return get_redis().zunionstore(SCORE_KEY, {SALES_KEY: 1.0, VIEWS_KEY: self.view_weight})
+
+    def top(self, limit: int) -> List[str]:
+        """Product ids of the current top ranked products, best first"""
+        return [member.decode() for member in get_redis().zrevrange(SCORE_KEY, 0, limit - 1)]
+
+    def scores(self, limit: int) -> List[Tuple[str, float]]:
+        """(product id, decayed score) of the top ranked products"""
+        factor = self.decay_factor()
+        return [
+            (member.decode(), score / factor)
+            for member, score in get_redis().zrevrange(SCORE_KEY, 0, limit - 1, withscores=True)
+        ]
+
+
+trending = TrendingCounters(
+    half_life_hours=settings.TRENDING_HALF_LIFE_HOURS,
+    view_weight=settings.TRENDING_VIEW_WEIGHT,
+    flush_seconds=settings.TRENDING_FLUSH_SECONDS,
+)
@@ -1,21 +1,185 @@
-from sqlalchemy import create_engine
+import functools
+import itertools
+from contextlib import contextmanager
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
+from app.core.instrumentation import install_query_hooks, register_pool_metrics
+from app.core.query_log import install_query_log
+
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+
+
+def _instrument(engine: Engine, name: str):
+    install_query_hooks(engine)
+    register_pool_metrics(engine, name)
+    if settings.QUERY_LOG_ENABLED:
+        install_query_log(engine)
 
 # Create database engine
 engine = create_engine(settings.DATABASE_URL)
+_instrument(engine, "primary")
+
+# Read replicas, used only by sessions from get_read_db
+replica_engines = [create_engine(url, pool_pre_ping=True) for url in settings.REPLICA_DATABASE_URLS]
+for index, replica_engine in enumerate(replica_engines):
+    _instrument(replica_engine, f"replica_{index}")
+
+
+class ReplicaPool:
+    """Round-robin replica selection that skips replicas which recently failed"""
+
+    def __init__(self, engines: List[Engine]):
+        self.engines = engines
+        self._cycle = itertools.cycle(engines) if engines else None
+        self._failed_until: Dict[Engine, float] = {}
+        self._lock = threading.Lock()
+
+    def choose(self) -> Optional[Engine]:
+        if not self.engines:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                candidate = next(self._cycle)
+                if self._failed_until.get(candidate, 0) <= now:
+                    return candidate
+        return None
+
+    def mark_failed(self, engine: Engine):
+        with self._lock:
+            self._failed_until[engine] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+replica_pool = ReplicaPool(replica_engines)
+
+
+def _on_replica_error(context):
+    if context.is_disconnect or context.connection is None:
+        replica_pool.mark_failed(context.engine)
+
+for replica_engine in replica_engines:
+    event.listen(replica_engine, "handle_error", _on_replica_error)
+
+
+class RoutingSession(Session):
+    """Session that sends reads declared with @reads to a replica.
+
+    A replica is only used when the session was created by get_read_db, and
+    never after the session has performed a write.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if (
+            replica is not None
+            and self.info.get("reading", 0) > 0
+            and not self.info.get("wrote")
+            and not self._flushing
+        ):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def reads(method):
+    """Mark a service method as read-only so it may be served by a replica"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        info = self.db.info
+        info["reading"] = info.get("reading", 0) + 1
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            info["reading"] -= 1
+    return wrapper
+
+
+def writes(method):
+    """Mark a service method as writing; the session stays on the primary from then on"""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        self.db.info["wrote"] = True
+        return await method(self, *args, **kwargs)
+    return wrapper
+
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
 
 # Create Base class for models
 Base = declarative_base()
 
+@contextmanager
+def read_session(db: Session) -> Iterator[Session]:
+    """A new short-lived session that reads where db's @reads methods would.
+
+    For reads that may outlive the request owning db, such as a cache load
+    shared by concurrent requests: closing db must not close the connection
+    such a load is still using.
+    """
+    session = SessionLocal()
+    replica = db.info.get("replica")
+    if replica is not None and not db.info.get("wrote"):
+        session.info["replica"] = replica
+    session.info["reading"] = 1
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def stick_to_primary(response: Response):
+    """Route this client's reads to the primary for a while after it writes"""
+    until = int(time.time()) + settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        PRIMARY_STICKY_COOKIE,
+        str(until),
+        max_age=settings.READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def _is_sticky(request: Request) -> bool:
+    try:
+        return int(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+# Dependency to get a session whose @reads methods may use a replica
+def get_read_db(request: Request):
+    db = SessionLocal()
+    if not _is_sticky(request):
+        replica = replica_pool.choose()
+        if replica is not None:
+            db.info["replica"] = replica
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def dispose_engines(close: bool = True):
+    """Discard the pooled connections of the primary and every replica.
+
+    In a newly forked worker pass close=False: the connections were opened by
+    the parent and are still its own, so they are dropped without being closed.
+    """
+    for pooled_engine in [engine, *replica_engines]:
+        pooled_engine.dispose(close=close)
@@ -0,0 +1,26 @@
+"""Delete idempotency keys past their TTL.
+
+Expired keys are also replaced lazily when a client reuses them, so this
+only keeps the table small. Run hourly from cron or a scheduler:
+
+    python -m app.jobs.idempotency
+"""
+import logging
+from app.database import SessionLocal
+from app.services.idempotency_service import IdempotencyService
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        deleted = IdempotencyService(db).purge_expired()
+    finally:
+        db.close()
+    logger.info("Deleted %d expired idempotency keys", deleted)
+
+
+if __name__ == "__main__":
+    main()
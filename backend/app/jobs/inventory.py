@@ -0,0 +1,49 @@
+"""Daily inventory snapshot and rollup retention.
+
+Records every variant's closing stock level, threshold and units sold for
+the day in inventory_snapshots, then deletes sales rollups and snapshots
+older than SALES_ROLLUP_RETENTION_DAYS. Re-running for the same day
+overwrites that day's snapshot. Run shortly before midnight UTC:
+
+    python -m app.jobs.inventory
+"""
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_inventory() -> int:
+    today = datetime.utcnow().date()
+    cutoff = today - timedelta(days=settings.SALES_ROLLUP_RETENTION_DAYS)
+    with engine.begin() as connection:
+        result = connection.execute(
+            text(
+                """
+                INSERT INTO inventory_snapshots (day, variant_id, stock_quantity, low_stock_threshold, units_sold)
+                SELECT :day, v.id, coalesce(v.stock_quantity, 0), v.low_stock_threshold, coalesce(s.units_sold, 0)
+                  FROM product_variants v
+                  LEFT JOIN variant_daily_sales s ON s.variant_id = v.id AND s.day = :day
+                ON CONFLICT (day, variant_id) DO UPDATE
+                   SET stock_quantity = excluded.stock_quantity,
+                       low_stock_threshold = excluded.low_stock_threshold,
+                       units_sold = excluded.units_sold
+                """
+            ),
+            {"day": today},
+        )
+        connection.execute(text("DELETE FROM variant_daily_sales WHERE day < :cutoff"), {"cutoff": cutoff})
+        connection.execute(text("DELETE FROM inventory_snapshots WHERE day < :cutoff"), {"cutoff": cutoff})
+    return result.rowcount
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Snapshotted %d variants", snapshot_inventory())
+
+
+if __name__ == "__main__":
+    main()
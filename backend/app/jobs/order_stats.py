@@ -0,0 +1,78 @@
+"""Recompute per-user order totals from the orders table.
+
+OrderStatsService keeps user_order_stats current as orders are placed and
+cancelled; this job repairs any drift, for example orders edited directly in
+the database. Run nightly:
+
+    python -m app.jobs.order_stats
+    python -m app.jobs.order_stats --batch-size 2000
+
+Users are processed in primary-key order, a batch per transaction. Each batch
+first takes its users' advisory locks (lock_users, shared with order placement
+and cancellation), so an order placed meanwhile, including a user's first, is
+either counted here or applied on top of the result.
+"""
+import argparse
+import logging
+import uuid
+from typing import Optional
+from sqlalchemy import text
+from app.database import engine
+from app.services.order_stats_service import lock_users
+
+logger = logging.getLogger(__name__)
+
+
+def recompute_order_stats(batch_size: int = 5_000) -> int:
+    after: Optional[uuid.UUID] = None
+    changed = 0
+    while True:
+        with engine.begin() as connection:
+            ids = connection.execute(
+                text(
+                    "SELECT id FROM users WHERE (CAST(:after AS uuid) IS NULL OR id > :after) "
+                    "ORDER BY id LIMIT :limit"
+                ),
+                {"after": after, "limit": batch_size},
+            ).scalars().all()
+            if not ids:
+                return changed
+            lock_users(connection, ids)
+            result = connection.execute(
+                text(
+                    """
+                    INSERT INTO user_order_stats (user_id, order_count, lifetime_spend, last_order_at, updated_at)
+                    SELECT user_id,
+                           count(*) FILTER (WHERE status <> 'CANCELLED'),
+                           coalesce(sum(total_amount) FILTER (WHERE status <> 'CANCELLED'), 0),
+                           max(created_at),
+                           now() AT TIME ZONE 'utc'
+                      FROM orders
+                     WHERE user_id = ANY(:ids)
+                     GROUP BY user_id
+                    ON CONFLICT (user_id) DO UPDATE
+                       SET order_count = excluded.order_count,
+                           lifetime_spend = excluded.lifetime_spend,
+                           last_order_at = excluded.last_order_at,
+                           updated_at = excluded.updated_at
+                     WHERE (user_order_stats.order_count, user_order_stats.lifetime_spend, user_order_stats.last_order_at)
+                           IS DISTINCT FROM (excluded.order_count, excluded.lifetime_spend, excluded.last_order_at)
+                    """
+                ),
+                {"ids": ids},
+            )
+        changed += result.rowcount
+        after = ids[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute per-user order totals from orders")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Updated order totals of %d users", recompute_order_stats(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Maintenance for the monthly orders/order_items partitions.
+
+Run daily from cron or a scheduler:
+
+    python -m app.jobs.partitions             # create upcoming partitions
+    python -m app.jobs.partitions --archive   # also detach expired months
+"""
+import argparse
+import logging
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# order_items references orders, so it is always detached first
+PARTITIONED_TABLES = ("order_items", "orders")
+
+_PARTITION_SUFFIX = re.compile(r"_(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def list_monthly_partitions(connection: Connection, parent: str) -> List[Tuple[str, date]]:
+    rows = connection.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            WHERE parent.relname = :parent
+            """
+        ),
+        {"parent": parent},
+    ).scalars()
+
+    partitions = []
+    for name in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def ensure_future_partitions(months_ahead: Optional[int] = None) -> List[str]:
+    """Create partitions for the current month and the next months_ahead months"""
+    if months_ahead is None:
+        months_ahead = settings.ORDER_PARTITION_MONTHS_AHEAD
+    current_month = date.today().replace(day=1)
+
+    created = []
+    with engine.begin() as connection:
+        for offset in range(months_ahead + 1):
+            month = add_months(current_month, offset)
+            for parent in PARTITIONED_TABLES:
+                name = connection.execute(
+                    text("SELECT ensure_monthly_partition(:parent, :month)"),
+                    {"parent": parent, "month": month},
+                ).scalar()
+                created.append(name)
+    return created
+
+
+def archive_old_partitions(retain_months: Optional[int] = None) -> List[str]:
+    """Detach partitions older than the retention window into the archive schema.
+
+    Detached tables keep their data and can be dumped or dropped separately;
+    queries against orders no longer scan them.
+    """
+    if retain_months is None:
+        retain_months = settings.ORDER_RETENTION_MONTHS
+    cutoff = add_months(date.today().replace(day=1), -retain_months)
+    schema = settings.ORDER_ARCHIVE_SCHEMA
+
+    archived = []
+    with engine.begin() as connection:
+        connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+        for parent in PARTITIONED_TABLES:
+            for name, month in list_monthly_partitions(connection, parent):
+                if month >= cutoff:
+                    continue
+                connection.execute(text(f'ALTER TABLE "{parent}" DETACH PARTITION "{name}"'))
+                # A detached order_items partition keeps its FK to orders, which
+                # would block detaching the matching orders partition
+                foreign_keys = connection.execute(
+                    text(
+                        """
+                        SELECT conname FROM pg_constraint
+                        WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+                        """
+                    ),
+                    {"table": name},
+                ).scalars().all()
+                for constraint in foreign_keys:
+                    connection.execute(text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"'))
+                connection.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"'))
+                archived.append(name)
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain monthly order partitions")
+    parser.add_argument("--archive", action="store_true", help="detach partitions past the retention window")
+    parser.add_argument("--months-ahead", type=int, default=None)
+    parser.add_argument("--retain-months", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    created = ensure_future_partitions(args.months_ahead)
+    logger.info("Ensured partitions: %s", ", ".join(created))
+    if args.archive:
+        archived = archive_old_partitions(args.retain_months)
+        logger.info("Archived partitions: %s", ", ".join(archived) or "none")
+
+
+if __name__ == "__main__":
+    main()
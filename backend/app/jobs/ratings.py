@@ -0,0 +1,96 @@
+"""Recompute product rating aggregates from the reviews table.
+
+ReviewService keeps the aggregates current as reviews change; this job
+repairs any drift (for example reviews edited directly in the database) and
+re-scores every product after RATING_PRIOR_MEAN or RATING_PRIOR_WEIGHT
+changes. Run nightly:
+
+    python -m app.jobs.ratings
+    python -m app.jobs.ratings --batch-size 2000
+
+Products are processed in primary-key order, a batch per transaction. Each
+batch locks its product rows before counting, so reviews written meanwhile
+are either counted here or applied on top of the result, never lost.
+"""
+import argparse
+import logging
+import uuid
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+def recompute_batch(connection, after: Optional[uuid.UUID], batch_size: int) -> Tuple[List[uuid.UUID], int]:
+    """Lock the next batch of products after `after` and recompute them; returns (product ids, rows changed)"""
+    ids = connection.execute(
+        text(
+            "SELECT id FROM products WHERE (CAST(:after AS uuid) IS NULL OR id > :after) "
+            "ORDER BY id LIMIT :limit FOR UPDATE"
+        ),
+        {"after": after, "limit": batch_size},
+    ).scalars().all()
+    if not ids:
+        return ids, 0
+    result = connection.execute(
+        text(
+            """
+            UPDATE products p
+               SET rating_sum = totals.rating_sum,
+                   review_count = totals.review_count,
+                   average_rating = CASE WHEN totals.review_count > 0
+                                         THEN totals.rating_sum::float / totals.review_count ELSE 0 END,
+                   bayesian_rating = (:prior_mean * :prior_weight + totals.rating_sum)::float
+                                     / (:prior_weight + totals.review_count)
+              FROM (
+                    SELECT p2.id,
+                           coalesce(sum(r.rating), 0)::integer AS rating_sum,
+                           count(r.id)::integer AS review_count
+                      FROM products p2
+                      LEFT JOIN reviews r ON r.product_id = p2.id AND r.is_approved
+                     WHERE p2.id = ANY(:ids)
+                     GROUP BY p2.id
+                   ) totals
+             WHERE p.id = totals.id
+               AND (p.rating_sum, p.review_count, p.bayesian_rating) IS DISTINCT FROM (
+                    totals.rating_sum,
+                    totals.review_count,
+                    (:prior_mean * :prior_weight + totals.rating_sum)::float
+                        / (:prior_weight + totals.review_count)
+                   )
+            """
+        ),
+        {
+            "ids": ids,
+            "prior_mean": settings.RATING_PRIOR_MEAN,
+            "prior_weight": settings.RATING_PRIOR_WEIGHT,
+        },
+    )
+    return ids, result.rowcount
+
+
+def recompute_ratings(batch_size: int = 5_000) -> int:
+    after: Optional[uuid.UUID] = None
+    changed = 0
+    while True:
+        with engine.begin() as connection:
+            ids, batch_changed = recompute_batch(connection, after, batch_size)
+        if not ids:
+            return changed
+        changed += batch_changed
+        after = ids[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute product rating aggregates from reviews")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Updated ratings of %d products", recompute_ratings(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Build "frequently bought together" recommendations from order history.
+
+Each run reads the order items of orders placed since the last run, counts
+product pairs that share an order and adds them to product_co_purchases.
+Products whose counts changed get their neighbours re-ranked into
+product_recommendations:
+
+    score(a, b) = orders(a and b) / sqrt(orders(a) * orders(b))
+
+(cosine similarity of the products' order vectors, which keeps bestsellers
+from being everyone's top neighbour). Orders are read in windows of
+--window-days, each committed with the watermark, so an interrupted run
+resumes where it stopped. Schedule hourly; use --rebuild to recount all
+orders after changing the scoring or to drop cancelled orders counted earlier.
+
+    python -m app.jobs.recommendations
+    python -m app.jobs.recommendations --rebuild
+"""
+import argparse
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import JobWatermark
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.recommendation import ProductCoPurchase
+
+logger = logging.getLogger(__name__)
+
+JOB = "recommendations"
+# Orders placed this recently may still be committing; leave them for the next run
+SETTLE_DELAY = timedelta(minutes=5)
+# Bulk orders pair every product with every other and say little about taste
+MAX_BASKET = 50
+UPSERT_BATCH = 5_000
+
+
+def count_pairs(order_codes: np.ndarray, product_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count the orders shared by each pair of products.
+
+    Takes one (order, product) code pair per order line and returns parallel
+    arrays (product, related product, orders), including each product paired
+    with itself, which is its order count.
+    """
+    # One row per distinct (order, product), sorted by order
+    lines = np.unique(np.stack([order_codes, product_codes], axis=1), axis=0)
+    orders, products = lines[:, 0], lines[:, 1]
+    starts = np.flatnonzero(np.r_[True, orders[1:] != orders[:-1]])
+    sizes = np.diff(np.r_[starts, len(orders)])
+
+    keep = np.repeat(sizes <= MAX_BASKET, sizes)
+    orders, products = orders[keep], products[keep]
+    sizes = sizes[sizes <= MAX_BASKET]
+    starts = np.cumsum(sizes) - sizes
+
+    # Pair every line with every line of its own order, without a Python loop
+    basket = np.repeat(sizes, sizes)
+    left = np.repeat(np.arange(len(products)), basket)
+    first = np.repeat(np.repeat(starts, sizes), basket)
+    offset = np.arange(len(left)) - np.repeat(np.cumsum(basket) - basket, basket)
+    right = first + offset
+
+    width = np.int64(products.max() + 1) if len(products) else np.int64(1)
+    keys, counts = np.unique(products[left].astype(np.int64) * width + products[right], return_counts=True)
+    return keys // width, keys % width, counts
+
+
+class RecommendationBuilder:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _watermark(self) -> JobWatermark:
+        # Row lock: a second concurrent run waits instead of double counting
+        watermark = self.db.query(JobWatermark).filter(JobWatermark.job == JOB).with_for_update().first()
+        if not watermark:
+            self.db.execute(insert(JobWatermark).values(job=JOB).on_conflict_do_nothing())
+            watermark = self.db.query(JobWatermark).filter(JobWatermark.job == JOB).with_for_update().one()
+        return watermark
+
+    def _order_lines(self, start: datetime, end: datetime) -> List[tuple]:
+        # Bounded on the partition key, so only the window's partitions are read
+        return (
+            self.db.query(OrderItem.order_id, OrderItem.product_id)
+            .join(Order, (Order.id == OrderItem.order_id) & (Order.created_at == OrderItem.order_created_at))
+            .filter(
+                OrderItem.order_created_at >= start,
+                OrderItem.order_created_at < end,
+                Order.status != OrderStatus.CANCELLED
+            )
+            .all()
+        )
+
+    def _add_counts(self, lines: List[tuple]) -> List:
+        """Add the window's pair counts; returns the products whose counts changed"""
+        order_index: Dict = {}
+        product_index: Dict = {}
+        order_codes = np.fromiter(
+            (order_index.setdefault(order_id, len(order_index)) for order_id, _ in lines), np.int64, len(lines)
+        )
+        product_codes = np.fromiter(
+            (product_index.setdefault(product_id, len(product_index)) for _, product_id in lines), np.int64, len(lines)
+        )
+        products = list(product_index)
+
+        left, right, counts = count_pairs(order_codes, product_codes)
+        table = ProductCoPurchase.__table__
+        for start in range(0, len(counts), UPSERT_BATCH):
+            rows = [
+                {"product_id": products[a], "related_product_id": products[b], "order_count": int(count)}
+                for a, b, count in zip(
+                    left[start:start + UPSERT_BATCH], right[start:start + UPSERT_BATCH], counts[start:start + UPSERT_BATCH]
+                )
+            ]
+            statement = insert(table).values(rows)
+            self.db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[table.c.product_id, table.c.related_product_id],
+                    set_={"order_count": table.c.order_count + statement.excluded.order_count},
+                )
+            )
+        return [products[code] for code in np.unique(left)]
+
+    def _rank(self, product_ids: List):
+        """Rewrite the top-K neighbours of product_ids from the current counts"""
+        for start in range(0, len(product_ids), UPSERT_BATCH):
+            self.db.execute(
+                text(
+                    """
+                    INSERT INTO product_recommendations (product_id, related_product_ids, scores, updated_at)
+                    SELECT product_id,
+                           array_agg(related_product_id ORDER BY score DESC, related_product_id),
+                           array_agg(score ORDER BY score DESC, related_product_id),
+                           now() AT TIME ZONE 'utc'
+                      FROM (
+                            SELECT c.product_id, c.related_product_id,
+                                   (c.order_count / sqrt(a.order_count::float * b.order_count))::real AS score,
+                                   row_number() OVER (
+                                       PARTITION BY c.product_id
+                                       ORDER BY c.order_count / sqrt(a.order_count::float * b.order_count) DESC,
+                                                c.related_product_id
+                                   ) AS rank
+                              FROM product_co_purchases c
+                              JOIN product_co_purchases a
+                                ON a.product_id = c.product_id AND a.related_product_id = c.product_id
+                              JOIN product_co_purchases b
+                                ON b.product_id = c.related_product_id AND b.related_product_id = c.related_product_id
+                             WHERE c.product_id = ANY(:ids)
+                               AND c.related_product_id <> c.product_id
+                               AND c.order_count >= :min_support
+                           ) ranked
+                     WHERE rank <= :top_k
+                     GROUP BY product_id
+                    ON CONFLICT (product_id) DO UPDATE
+                       SET related_product_ids = excluded.related_product_ids,
+                           scores = excluded.scores,
+                           updated_at = excluded.updated_at
+                    """
+                ),
+                {
+                    "ids": product_ids[start:start + UPSERT_BATCH],
+                    "min_support": settings.RECOMMENDATIONS_MIN_SUPPORT,
+                    "top_k": settings.RECOMMENDATIONS_TOP_K,
+                },
+            )
+
+    def rebuild(self):
+        self._watermark()
+        self.db.execute(text("TRUNCATE product_co_purchases, product_recommendations"))
+        self.db.query(JobWatermark).filter(JobWatermark.job == JOB).update({JobWatermark.processed_until: None})
+        self.db.commit()
+
+    def run(self, window: timedelta = timedelta(days=7)) -> int:
+        """Count orders placed since the last run; returns the number of re-ranked products"""
+        until = datetime.utcnow() - SETTLE_DELAY
+        ranked = 0
+        while True:
+            start = self._watermark().processed_until
+            if start is None:
+                # First run: start from the oldest order
+                start = self.db.query(Order.created_at).order_by(Order.created_at).limit(1).scalar()
+            if start is None or start >= until:
+                self.db.rollback()
+                return ranked
+
+            end = min(start + window, until)
+            lines = self._order_lines(start, end)
+            if lines:
+                touched = self._add_counts(lines)
+                self._rank(touched)
+                ranked += len(touched)
+            self.db.query(JobWatermark).filter(JobWatermark.job == JOB).update({JobWatermark.processed_until: end})
+            self.db.commit()
+            logger.info("Counted %d order lines up to %s", len(lines), end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Update product co-purchase recommendations")
+    parser.add_argument("--rebuild", action="store_true", help="recount every order from scratch")
+    parser.add_argument("--window-days", type=int, default=7, help="order history read per transaction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        builder = RecommendationBuilder(db)
+        if args.rebuild:
+            builder.rebuild()
+        ranked = builder.run(timedelta(days=args.window_days))
+    finally:
+        db.close()
+    logger.info("Re-ranked recommendations for %d products", ranked)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Rewrite existing random (v4) primary keys as time-ordered UUIDv7.
+
+Optional: v4 and v7 keys coexist, and USE_TIME_ORDERED_IDS alone makes new
+rows time-ordered. Running this also orders old rows by their creation time,
+which compacts the primary-key indexes once they are rebuilt (REINDEX).
+
+Each id becomes uuid7_at(created_at, id) (migration 0010), and ON UPDATE
+CASCADE foreign keys carry the change to every referencing row. Tables are
+walked in primary-key order in short transactions, so the job can be stopped
+and resumed, and rows that already have v7 keys are left alone.
+
+Product ids are also stored in product_recommendations.related_product_ids,
+an array no foreign key can follow: after re-keying products, rebuild the
+recommendations with `python -m app.jobs.recommendations --rebuild`.
+
+    python -m app.jobs.rekey_ids                  # all tables
+    python -m app.jobs.rekey_ids --table orders --batch-size 5000
+"""
+import argparse
+import logging
+import uuid
+from typing import Dict, Optional
+from sqlalchemy import text
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Timestamp each table's keys are ordered by
+TIMESTAMPS: Dict[str, str] = {
+    "users": "t.created_at",
+    "products": "t.created_at",
+    "product_variants": "(SELECT p.created_at FROM products p WHERE p.id = t.product_id)",
+    "carts": "t.created_at",
+    "cart_items": "t.added_at",
+    "orders": "t.created_at",
+    "order_items": "t.order_created_at",
+}
+
+# The version nibble of the canonical text form
+_IS_V4 = "substr(t.id::text, 15, 1) <> '7'"
+
+
+def rekey_table(table: str, batch_size: int = 10_000) -> int:
+    after: Optional[uuid.UUID] = None
+    rekeyed = 0
+    while True:
+        with engine.begin() as connection:
+            ids = connection.execute(
+                text(
+                    f"SELECT id FROM {table} t WHERE (CAST(:after AS uuid) IS NULL OR t.id > :after) "
+                    f"ORDER BY t.id LIMIT :limit"
+                ),
+                {"after": after, "limit": batch_size},
+            ).scalars().all()
+            if not ids:
+                return rekeyed
+            result = connection.execute(
+                text(
+                    f"UPDATE {table} t SET id = uuid7_at(COALESCE({TIMESTAMPS[table]}, now()::timestamp), t.id) "
+                    f"WHERE t.id = ANY(:ids) AND {_IS_V4}"
+                ),
+                {"ids": ids},
+            )
+        rekeyed += result.rowcount
+        after = ids[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite v4 primary keys as UUIDv7")
+    parser.add_argument("--table", action="append", choices=sorted(TIMESTAMPS), help="defaults to all")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for table in args.table or list(TIMESTAMPS):
+        rekeyed = rekey_table(table, args.batch_size)
+        logger.info("Rekeyed %d %s rows", rekeyed, table)
+        if table == "products" and rekeyed:
+            logger.warning("Product ids changed: run python -m app.jobs.recommendations --rebuild")
+
+
+if __name__ == "__main__":
+    main()
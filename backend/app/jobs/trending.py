@@ -0,0 +1,58 @@
+"""Refresh the trending ranking from the Redis counters (app.core.trending).
+
+Combines decayed sales and views into the ranking served by
+/api/products/trending, and copies the scores of the top
+TRENDING_TRACKED_PRODUCTS products to products.trending_score for
+sort_by=trending; every other product scores 0. Once a day it also rebases
+the counters so their weights stay small. Run every minute:
+
+    python -m app.jobs.trending
+"""
+import logging
+from sqlalchemy import text
+from app.config import settings
+from app.core.trending import trending
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+REBASE_AFTER_SECONDS = 24 * 60 * 60
+
+
+def refresh_trending() -> int:
+    if trending.epoch_age() > REBASE_AFTER_SECONDS:
+        trending.rebase()
+    trending.rank()
+    scores = trending.scores(settings.TRENDING_TRACKED_PRODUCTS)
+
+    with engine.begin() as connection:
+        # Plain SQL: a score refresh is not a product edit, so updated_at stays
+        connection.execute(
+            text(
+                "UPDATE products SET trending_score = 0 "
+                "WHERE trending_score <> 0 AND NOT (id = ANY(CAST(:ids AS uuid[])))"
+            ),
+            {"ids": [product_id for product_id, _ in scores]},
+        )
+        if scores:
+            connection.execute(
+                text(
+                    """
+                    UPDATE products p
+                       SET trending_score = s.score
+                      FROM unnest(CAST(:ids AS uuid[]), CAST(:scores AS float8[])) AS s(id, score)
+                     WHERE p.id = s.id AND p.trending_score IS DISTINCT FROM s.score
+                    """
+                ),
+                {"ids": [product_id for product_id, _ in scores], "scores": [score for _, score in scores]},
+            )
+    return len(scores)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Ranked %d trending products", refresh_trending())
+
+
+if __name__ == "__main__":
+    main()
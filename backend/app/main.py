@@ -1,7 +1,14 @@
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, products, orders, users, admin
+from fastapi.staticfiles import StaticFiles
+from app.api import auth, products, orders, users, admin, health, reviews
 from app.config import settings
+from app.core.instrumentation import MetricsMiddleware
+from app.core.lifecycle import start_worker, stop_worker
+from app.core.metrics import registry
+from app.database import SessionLocal
+from app.services.product_service import ProductService
 
 app = FastAPI(
     title="JerseyShop API",
@@ -18,12 +25,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, status and DB usage metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, server_timing=settings.DEBUG)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(products.router, prefix="/api/products", tags=["products"])
 app.include_router(orders.router, prefix="/api/orders", tags=["orders"])
+app.include_router(reviews.router, prefix="/api/reviews", tags=["reviews"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
+app.include_router(health.router, prefix="/health", tags=["health"])
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Media names are content hashes, so a cached copy never goes stale"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+app.mount(settings.MEDIA_URL, ImmutableStaticFiles(directory=settings.MEDIA_ROOT), name="media")
+
+async def warm_catalog_cache():
+    db = SessionLocal()
+    try:
+        await ProductService(db).warm_cache(settings.CACHE_WARMUP)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+async def startup():
+    await start_worker(warm_catalog_cache)
+
+@app.on_event("shutdown")
+def shutdown():
+    stop_worker()
 
 @app.get("/")
 async def root():
@@ -33,6 +74,12 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
+    # Single process for local runs; production uses gunicorn with gunicorn.conf.py
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,6 +1,12 @@
 from .user import User
 from .product import Product, ProductVariant
-from .order import Order, OrderItem
+from .order import Order, OrderItem, UserOrderStats
 from .cart import Cart, CartItem
+from .idempotency import IdempotencyKey
+from .pricing import TaxRule, ShippingRule
+from .review import Review
+from .recommendation import ProductCoPurchase, ProductRecommendation
+from .job import JobWatermark
+from .inventory import VariantDailySales, InventorySnapshot
 
-__all__ = ["User", "Product", "ProductVariant", "Order", "OrderItem", "Cart", "CartItem"]
\ No newline at end of file
+__all__ = ["User", "Product", "ProductVariant", "Order", "OrderItem", "UserOrderStats", "Cart", "CartItem", "IdempotencyKey", "TaxRule", "ShippingRule", "Review", "ProductCoPurchase", "ProductRecommendation", "JobWatermark", "VariantDailySales", "InventorySnapshot"]
\ No newline at end of file
@@ -1,14 +1,14 @@
 from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, UUID
 from sqlalchemy.orm import relationship
+from app.core.ids import new_id
 from app.database import Base
-import uuid
 from datetime import datetime
 
 class Cart(Base):
     __tablename__ = "carts"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", onupdate="CASCADE"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -19,11 +19,11 @@ class Cart(Base):
 class CartItem(Base):
     __tablename__ = "cart_items"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    cart_id = Column(UUID(as_uuid=True), ForeignKey("carts.id"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
-    product_variant_id = Column(UUID(as_uuid=True), ForeignKey("product_variants.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
+    cart_id = Column(UUID(as_uuid=True), ForeignKey("carts.id", onupdate="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", onupdate="CASCADE"), nullable=False)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", onupdate="CASCADE"), nullable=False, index=True)
+    product_variant_id = Column(UUID(as_uuid=True), ForeignKey("product_variants.id", onupdate="CASCADE"), nullable=False, index=True)
     quantity = Column(Integer, nullable=False, default=1)
     added_at = Column(DateTime, default=datetime.utcnow)
 
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, Integer, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+from datetime import datetime
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # Keys are chosen by clients, so they are only unique per user
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    scope = Column(String(100), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer)
+    response_body = Column(JSON)
+    response_hash = Column(String(64))
+    order_id = Column(UUID(as_uuid=True))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class VariantDailySales(Base):
+    """Units sold per variant and day (UTC), net of cancellations.
+
+    Written in the same transaction as the order or cancellation, so sales
+    velocity never needs to scan order_items.
+    """
+    __tablename__ = "variant_daily_sales"
+
+    variant_id = Column(
+        UUID(as_uuid=True), ForeignKey("product_variants.id", onupdate="CASCADE", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    units_sold = Column(Integer, nullable=False, default=0)
+
+class InventorySnapshot(Base):
+    """End-of-day stock level of every variant, written by app.jobs.inventory"""
+    __tablename__ = "inventory_snapshots"
+
+    day = Column(Date, primary_key=True)
+    variant_id = Column(
+        UUID(as_uuid=True), ForeignKey("product_variants.id", onupdate="CASCADE", ondelete="CASCADE"), primary_key=True
+    )
+    stock_quantity = Column(Integer, nullable=False)
+    low_stock_threshold = Column(Integer, nullable=False)
+    units_sold = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+from datetime import datetime
+
+class JobWatermark(Base):
+    """How far an incremental batch job has processed its source rows"""
+    __tablename__ = "job_watermarks"
+
+    job = Column(String(100), primary_key=True)
+    processed_until = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
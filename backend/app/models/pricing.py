@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Boolean, Numeric, Integer
+from app.database import Base
+
+class TaxRule(Base):
+    """Tax rate for a destination; NULL country/state rows are the fallback"""
+    __tablename__ = "tax_rules"
+
+    id = Column(Integer, primary_key=True)
+    country = Column(String(100))
+    state = Column(String(100))
+    rate = Column(Numeric(6, 4), nullable=False)
+    is_active = Column(Boolean, default=True)
+
+class ShippingRule(Base):
+    """Flat shipping charge for subtotals in [min_subtotal, max_subtotal)"""
+    __tablename__ = "shipping_rules"
+
+    id = Column(Integer, primary_key=True)
+    country = Column(String(100))
+    min_subtotal = Column(Numeric(10, 2), nullable=False, default=0)
+    max_subtotal = Column(Numeric(10, 2))
+    amount = Column(Numeric(10, 2), nullable=False)
+    is_active = Column(Boolean, default=True)
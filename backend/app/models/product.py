@@ -1,14 +1,37 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Numeric, Integer, ForeignKey, JSON, Float
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Numeric, Integer, ForeignKey, Index, JSON, Float, FetchedValue, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from app.config import settings
+from app.core.ids import new_id
 from app.database import Base
-import uuid
 from datetime import datetime
 
+TRIGRAM_SEARCH_COLUMNS = ("name", "team", "player", "sport", "brand")
+
 class Product(Base):
     __tablename__ = "products"
+    # Partial indexes serve the is_active listings; trigram indexes serve ILIKE '%term%'
+    __table_args__ = (
+        Index("ix_products_active_created_at", "created_at", postgresql_where=text("is_active")),
+        # Price-range browsing: is_active = true AND effective_price BETWEEN ... is one range scan
+        Index("ix_products_is_active_effective_price", "is_active", "effective_price"),
+        # Featured products and the rating sort rank by the Bayesian score
+        Index("ix_products_active_bayesian_rating", "bayesian_rating", postgresql_where=text("is_active")),
+        Index("ix_products_active_trending_score", "trending_score", postgresql_where=text("is_active")),
+        Index("ix_products_active_sport_team", "sport", "team", postgresql_where=text("is_active")),
+        *(
+            Index(
+                f"ix_products_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_where=text("is_active"),
+            )
+            for column in TRIGRAM_SEARCH_COLUMNS
+        ),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
     name = Column(String(200), nullable=False, index=True)
     slug = Column(String(200), unique=True, nullable=False, index=True)
     description = Column(Text)
@@ -18,10 +41,21 @@ class Product(Base):
     brand = Column(String(50))
     base_price = Column(Numeric(10, 2), nullable=False)
     sale_price = Column(Numeric(10, 2))
+    # Lowest effective price over the product's variants ("from" price), or
+    # the sale/base price when it has none. Maintained by triggers (migration 0006).
+    effective_price = Column(Numeric(10, 2), nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue())
     material = Column(String(100))
     care_instructions = Column(Text)
+    # Rating aggregates over approved reviews, updated with each review change
+    # (ReviewService) and reconciled by app.jobs.ratings. bayesian_rating pulls
+    # products with few reviews towards RATING_PRIOR_MEAN, so one 5-star review
+    # does not outrank hundreds of 4.8s.
+    rating_sum = Column(Integer, nullable=False, default=0)
     average_rating = Column(Float, default=0.0)
     review_count = Column(Integer, default=0)
+    bayesian_rating = Column(Float, nullable=False, default=lambda: settings.RATING_PRIOR_MEAN)
+    # Decayed sales and views, copied from Redis by app.jobs.trending (see app.core.trending)
+    trending_score = Column(Float, nullable=False, default=0.0)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -33,17 +67,30 @@ class Product(Base):
 
 class ProductVariant(Base):
     __tablename__ = "product_variants"
+    # Only variants at or below their threshold are indexed, so the low-stock
+    # list and count read a handful of index entries however large the catalog
+    __table_args__ = (
+        Index("ix_product_variants_low_stock", "product_id", postgresql_where=text("stock_quantity <= low_stock_threshold")),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", onupdate="CASCADE"), nullable=False, index=True)
     size = Column(String(10), nullable=False)
     color = Column(String(50))
     sku = Column(String(50), unique=True, nullable=False, index=True)
     stock_quantity = Column(Integer, default=0)
+    low_stock_threshold = Column(Integer, nullable=False, default=lambda: settings.LOW_STOCK_THRESHOLD)
     price = Column(Numeric(10, 2))
+    # Price actually charged: the product's sale price, else this variant's
+    # price, else the product's base price. Maintained by database triggers
+    # (migration 0005) on both product_variants and products.
+    effective_price = Column(Numeric(10, 2), nullable=False, server_default=FetchedValue(), server_onupdate=FetchedValue())
     image_urls = Column(JSON, default=list)
 
     # Relationships
     product = relationship("Product", back_populates="variants")
     order_items = relationship("OrderItem", back_populates="variant")
-    cart_items = relationship("CartItem", back_populates="variant")
\ No newline at end of file
+    cart_items = relationship("CartItem", back_populates="variant")
+
+# Matches the ix_product_variants_low_stock predicate, so filters on it use the index
+variant_is_low_stock = ProductVariant.stock_quantity <= ProductVariant.low_stock_threshold
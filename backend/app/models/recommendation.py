@@ -0,0 +1,32 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, REAL
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from app.database import Base
+from datetime import datetime
+
+class ProductCoPurchase(Base):
+    """Number of orders containing both products.
+
+    Stored in both directions for each pair; the product_id = related_product_id
+    row counts the orders containing that product. Maintained by
+    app.jobs.recommendations.
+    """
+    __tablename__ = "product_co_purchases"
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", onupdate="CASCADE", ondelete="CASCADE"), primary_key=True)
+    related_product_id = Column(
+        UUID(as_uuid=True), ForeignKey("products.id", onupdate="CASCADE", ondelete="CASCADE"), primary_key=True
+    )
+    order_count = Column(Integer, nullable=False)
+
+class ProductRecommendation(Base):
+    """Top-K products bought together with product_id, best first.
+
+    related_product_ids is not covered by a foreign key: after re-keying
+    products (app.jobs.rekey_ids) rebuild with app.jobs.recommendations --rebuild.
+    """
+    __tablename__ = "product_recommendations"
+
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", onupdate="CASCADE", ondelete="CASCADE"), primary_key=True)
+    related_product_ids = Column(ARRAY(UUID(as_uuid=True)), nullable=False)
+    scores = Column(ARRAY(REAL), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
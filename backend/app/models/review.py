@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Boolean, DateTime, Text, SmallInteger, ForeignKey, Index, CheckConstraint, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.core.ids import new_id
+from app.database import Base
+from datetime import datetime
+
+class Review(Base):
+    """A customer's rating of a product; only approved reviews count towards its rating"""
+    __tablename__ = "reviews"
+    __table_args__ = (
+        UniqueConstraint("product_id", "user_id", name="uq_reviews_product_user"),
+        CheckConstraint("rating BETWEEN 1 AND 5", name="ck_reviews_rating"),
+        # Product pages list approved reviews newest first
+        Index("ix_reviews_product_approved_created_at", "product_id", "created_at", postgresql_where=text("is_approved")),
+        Index("ix_reviews_pending_created_at", "created_at", postgresql_where=text("NOT is_approved")),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", onupdate="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", onupdate="CASCADE"), nullable=False, index=True)
+    rating = Column(SmallInteger, nullable=False)
+    title = Column(String(200))
+    body = Column(Text)
+    is_approved = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    user = relationship("User")
+
+    @property
+    def author_name(self) -> str:
+        return f"{self.user.first_name} {self.user.last_name[:1]}." if self.user else "Anonymous"
@@ -1,14 +1,14 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Text, Index, func, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from app.core.ids import new_id
 from app.database import Base
-import uuid
 from datetime import datetime
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=new_id)
     email = Column(String(255), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     first_name = Column(String(50), nullable=False)
@@ -22,4 +22,24 @@ class User(Base):
 
     # Relationships
     orders = relationship("Order", back_populates="user")
-    cart_items = relationship("CartItem", back_populates="user")
\ No newline at end of file
+    cart = relationship("Cart", back_populates="user", uselist=False)
+    cart_items = relationship("CartItem", back_populates="user")
+
+# Admin user search (migration 0008). Queries must use these exact
+# expressions for Postgres to match them to the expression indexes.
+user_search_text = func.lower(
+    User.first_name + literal_column("' '") + User.last_name + literal_column("' '") + User.email
+)
+# "C" collation (migration 0017): byte order, so one b-tree serves equality,
+# LIKE 'prefix%' and ORDER BY, which a text_pattern_ops index cannot sort for
+user_email_normalized = func.lower(User.email).collate("C")
+user_phone_digits = func.regexp_replace(User.phone, literal_column("'[^0-9]'"), literal_column("''"), literal_column("'g'"))
+
+Index(
+    "ix_users_search_text_trgm",
+    user_search_text.label("search_text"),
+    postgresql_using="gin",
+    postgresql_ops={"search_text": "gin_trgm_ops"},
+)
+Index("ix_users_email_lower", user_email_normalized)
+Index("ix_users_phone_digits", user_phone_digits)
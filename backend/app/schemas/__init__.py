@@ -1,11 +1,16 @@
 from .user import UserCreate, UserResponse, UserLogin, Token
 from .product import ProductCreate, ProductUpdate, ProductResponse, ProductVariantCreate, ProductVariantResponse
-from .order import OrderCreate, OrderResponse, OrderItemResponse
+from .order import OrderCreate, OrderResponse, OrderItemResponse, AddressSchema, QuoteRequest, QuoteResponse, AdminOrderSummary, OrderItemSummary, OrderSummary, UserOrderStatsResponse, OrderTransition, OrderTransitionResult
 from .cart import CartItemCreate, CartItemResponse, CartResponse
+from .review import ReviewCreate, ReviewUpdate, ReviewResponse
+from .inventory import StockUpdate, LowStockVariant
 
 __all__ = [
     "UserCreate", "UserResponse", "UserLogin", "Token",
     "ProductCreate", "ProductUpdate", "ProductResponse", "ProductVariantCreate", "ProductVariantResponse",
-    "OrderCreate", "OrderResponse", "OrderItemResponse",
-    "CartItemCreate", "CartItemResponse", "CartResponse"
+    "OrderCreate", "OrderResponse", "OrderItemResponse", "AddressSchema", "QuoteRequest", "QuoteResponse", "AdminOrderSummary",
+    "OrderItemSummary", "OrderSummary", "UserOrderStatsResponse", "OrderTransition", "OrderTransitionResult",
+    "CartItemCreate", "CartItemResponse", "CartResponse",
+    "ReviewCreate", "ReviewUpdate", "ReviewResponse",
+    "StockUpdate", "LowStockVariant"
 ]
\ No newline at end of file
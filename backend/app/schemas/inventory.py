@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from uuid import UUID
+
+class StockUpdate(BaseModel):
+    sku: str = Field(..., min_length=1, max_length=50)
+    stock_quantity: Optional[int] = Field(None, ge=0)
+    low_stock_threshold: Optional[int] = Field(None, ge=0)
+
+class LowStockVariant(BaseModel):
+    variant_id: UUID
+    product_id: UUID
+    product_name: str
+    sku: str
+    size: str
+    color: Optional[str] = None
+    stock_quantity: int
+    low_stock_threshold: int
+    units_sold: int
+    daily_velocity: float
+    days_of_cover: Optional[float] = None
@@ -50,6 +50,27 @@ class OrderCreate(BaseModel):
     payment_method: str = Field(..., min_length=1, max_length=50)
     notes: Optional[str] = None
 
+class QuoteRequest(BaseModel):
+    items: List[OrderItemCreate]
+    shipping_address: Optional[AddressSchema] = None
+
+class QuoteLineResponse(OrderItemBase):
+    unit_price: Decimal
+    total_price: Decimal
+
+    class Config:
+        from_attributes = True
+
+class QuoteResponse(BaseModel):
+    lines: List[QuoteLineResponse]
+    subtotal: Decimal
+    tax_amount: Decimal
+    shipping_amount: Decimal
+    total_amount: Decimal
+
+    class Config:
+        from_attributes = True
+
 class OrderResponse(BaseModel):
     id: UUID
     order_number: str
@@ -66,7 +87,84 @@ class OrderResponse(BaseModel):
     notes: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    version: int
     items: List[OrderItemResponse]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AdminOrderSummary(BaseModel):
+    id: UUID
+    order_number: str
+    status: OrderStatusEnum
+    payment_status: Optional[str] = None
+    customer_name: Optional[str] = None
+    customer_email: Optional[str] = None
+    item_count: int
+    total_amount: Decimal
+    created_at: datetime
+    version: int
+
+    class Config:
+        from_attributes = True
+
+class OrderItemSummary(BaseModel):
+    product_id: UUID
+    product_variant_id: UUID
+    product_name: str
+    product_image: Optional[str] = None
+    size: str
+    color: Optional[str] = None
+    quantity: int
+    total_price: Decimal
+
+    class Config:
+        from_attributes = True
+
+class OrderSummary(BaseModel):
+    """An order in the customer's order history; full details are at GET /api/orders/{id}"""
+    id: UUID
+    order_number: str
+    status: OrderStatusEnum
+    payment_status: Optional[str] = None
+    tracking_number: Optional[str] = None
+    item_count: int
+    total_amount: Decimal
+    created_at: datetime
+    items: List[OrderItemSummary]
+
+    class Config:
+        from_attributes = True
+
+class UserOrderStatsResponse(BaseModel):
+    order_count: int = 0
+    lifetime_spend: Decimal = Decimal("0")
+    last_order_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class OrderTransition(BaseModel):
+    order_id: UUID
+    status: OrderStatusEnum
+    tracking_number: Optional[str] = Field(None, min_length=1, max_length=100)
+    # Version the change was based on; if the order has changed since, it is rejected
+    version: Optional[int] = None
+
+class OrderTransitionApplied(BaseModel):
+    order_id: UUID
+    status: OrderStatusEnum
+    version: int
+
+class OrderTransitionRejected(BaseModel):
+    order_id: UUID
+    # not_found, duplicate, version_conflict or invalid_transition
+    reason: str
+    status: Optional[OrderStatusEnum] = None
+    version: Optional[int] = None
+
+class OrderTransitionResult(BaseModel):
+    updated: List[OrderTransitionApplied]
+    # Already in the requested status with nothing to change; version not bumped
+    unchanged: List[OrderTransitionApplied]
+    rejected: List[OrderTransitionRejected]
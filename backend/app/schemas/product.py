@@ -1,8 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, computed_field
+from typing import Dict, Optional, List
 from decimal import Decimal
 from datetime import datetime
 from uuid import UUID
+from app.core.images import image_set
 
 class ProductBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
@@ -38,6 +39,7 @@ class ProductResponse(ProductBase):
     slug: str
     average_rating: Optional[float] = 0.0
     review_count: int = 0
+    effective_price: Optional[Decimal] = None
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -56,10 +58,19 @@ class ProductVariantBase(BaseModel):
 
 class ProductVariantCreate(ProductVariantBase):
     product_id: UUID
+    # Defaults to LOW_STOCK_THRESHOLD
+    low_stock_threshold: Optional[int] = Field(None, ge=0)
 
 class ProductVariantResponse(ProductVariantBase):
     id: UUID
     product_id: UUID
+    effective_price: Optional[Decimal] = None
+
+    @computed_field
+    @property
+    def images(self) -> List[Dict[str, str]]:
+        """Each image as {view: url}, e.g. "thumbnail" for carts, "grid" for listings"""
+        return [image_set(url) for url in self.image_urls]
 
     class Config:
         from_attributes = True
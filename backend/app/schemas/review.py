@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+class ReviewBase(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    title: Optional[str] = Field(None, max_length=200)
+    body: Optional[str] = Field(None, max_length=5000)
+
+class ReviewCreate(ReviewBase):
+    product_id: UUID
+
+class ReviewUpdate(BaseModel):
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    title: Optional[str] = Field(None, max_length=200)
+    body: Optional[str] = Field(None, max_length=5000)
+
+    @field_validator("rating")
+    @classmethod
+    def rating_not_null(cls, rating: Optional[int]) -> int:
+        # Omit rating to keep it; title and body may be cleared with null
+        if rating is None:
+            raise ValueError("rating cannot be null")
+        return rating
+
+class ReviewResponse(ReviewBase):
+    id: UUID
+    product_id: UUID
+    author_name: str
+    is_approved: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,17 +1,32 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, desc
+from sqlalchemy.exc import OperationalError
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from typing import List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
-from app.models.user import User
-from app.models.order import Order
-from app.models.product import Product
+import re
+from app.core.cache import analytics_cache
+from app.core.loader import load_relationship
+from app.database import read_session, reads, writes
+from app.models.user import User, user_email_normalized, user_phone_digits, user_search_text
+from app.models.order import Order, OrderItem
+from app.models.product import Product, ProductVariant, variant_is_low_stock
+from app.schemas import OrderTransition
+from app.services.idempotency_service import IdempotencyService
+from app.services.order_state import OrderStateMachine
+
+PHONE_PATTERN = re.compile(r"^\+?[\d\s().-]+$")
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 class AdminService:
     def __init__(self, db: Session):
         self.db = db
 
+    @reads
     async def get_dashboard_stats(self) -> dict:
         # Get basic stats
         total_users = self.db.query(User).filter(User.is_active == True).count()
@@ -33,13 +48,11 @@ class AdminService:
             .count()
         )
 
-        # Get low stock products
+        # Products with a variant at or below its threshold (partial index)
         low_stock_products = (
-            self.db.query(Product)
-            .join(Product.variants)
-            .filter(ProductVariant.stock_quantity < 5)
-            .distinct()
-            .count()
+            self.db.query(func.count(func.distinct(ProductVariant.product_id)))
+            .filter(variant_is_low_stock)
+            .scalar()
         )
 
         return {
@@ -51,6 +64,7 @@ class AdminService:
             "low_stock_products": low_stock_products,
         }
 
+    @reads
     async def get_users(
         self,
         skip: int = 0,
@@ -59,28 +73,68 @@ class AdminService:
         is_active: Optional[bool] = None
     ) -> List[User]:
         query = self.db.query(User)
-
-        if search:
-            query = query.filter(
-                or_(
-                    User.first_name.ilike(f"%{search}%"),
-                    User.last_name.ilike(f"%{search}%"),
-                    User.email.ilike(f"%{search}%")
-                )
-            )
-
         if is_active is not None:
             query = query.filter(User.is_active == is_active)
 
-        return query.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
+        term = search.strip().lower() if search else ""
+        if not term:
+            return query.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
+
+        # Exact email or phone: a single index lookup, no fuzzy matching
+        digits = re.sub(r"\D", "", term)
+        if "@" in term:
+            exact = query.filter(user_email_normalized == term)
+        elif PHONE_PATTERN.match(term) and len(digits) >= 7:
+            exact = query.filter(user_phone_digits == digits)
+        else:
+            exact = None
+        if exact is not None:
+            users = exact.order_by(desc(User.created_at)).offset(skip).limit(limit).all()
+            if users or skip:
+                return users
+
+        if len(term) < 3:
+            # Too short for trigrams; fall back to an email prefix range scan, read in index order
+            return (
+                query.filter(user_email_normalized.like(f"{escape_like(term)}%"))
+                .order_by(user_email_normalized)
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
+
+        return (
+            query.filter(user_search_text.like(f"%{escape_like(term)}%"))
+            .order_by(desc(func.similarity(user_search_text, term)), desc(User.created_at))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
 
-    async def get_orders(
+    @reads
+    async def get_order_summaries(
         self,
         skip: int = 0,
         limit: int = 50,
-        status_filter: Optional[str] = None
-    ) -> List[Order]:
-        query = self.db.query(Order)
+        status_filter: Optional[str] = None,
+        payment_status: Optional[str] = None,
+        customer_email: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> list:
+        # Only the denormalized summary columns: no items, users or address JSON
+        query = self.db.query(
+            Order.id,
+            Order.order_number,
+            Order.status,
+            Order.payment_status,
+            Order.customer_name,
+            Order.customer_email,
+            Order.item_count,
+            Order.total_amount,
+            Order.created_at,
+            Order.version,
+        )
 
         if status_filter:
             try:
@@ -89,36 +143,84 @@ class AdminService:
                 query = query.filter(Order.status == status_enum)
             except ValueError:
                 pass
+        if payment_status:
+            query = query.filter(Order.payment_status == payment_status)
+        if customer_email:
+            query = query.filter(Order.customer_email == customer_email.strip().lower())
+        # A bounded created_at range also prunes monthly partitions
+        if created_from:
+            query = query.filter(Order.created_at >= created_from)
+        if created_to:
+            query = query.filter(Order.created_at < created_to)
 
         return query.order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
 
+    @reads
+    async def get_order(self, order_id: str) -> Optional[Order]:
+        order = self.db.query(Order).filter(Order.id == order_id).first()
+        if order:
+            await load_relationship(self.db, Order.items, [order])
+        return order
+
+    @writes
     async def update_order_status(
         self,
         order_id: str,
         status: str,
-        tracking_number: Optional[str] = None
-    ) -> Optional[Order]:
-        order = self.db.query(Order).filter(Order.id == order_id).first()
-        if not order:
-            return None
+        tracking_number: Optional[str] = None,
+        version: Optional[int] = None,
+        admin_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> dict:
+        idempotency = IdempotencyService(self.db)
+        if idempotency_key:
+            replay = idempotency.reserve(
+                admin_id, idempotency_key, "admin.orders.status",
+                {"order_id": str(order_id), "status": status, "tracking_number": tracking_number, "version": version}
+            )
+            if replay:
+                return replay.response_body
 
         try:
-            from app.models.order import OrderStatus
-            order.status = OrderStatus(status)
-        except ValueError:
+            transition = OrderTransition(
+                order_id=order_id, status=status, tracking_number=tracking_number, version=version
+            )
+        except ValidationError:
+            # `status` is the argument here, not fastapi.status
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
+                status_code=400,
                 detail="Invalid order status"
             )
+        try:
+            updated = OrderStateMachine(self.db).transition(transition)
+        except HTTPException:
+            self.db.rollback()
+            raise
 
-        if tracking_number:
-            order.tracking_number = tracking_number
+        result = {"message": "Order status updated successfully", "version": updated["version"]}
+        if idempotency_key:
+            idempotency.complete(admin_id, idempotency_key, result, order_id=order_id)
+        self.db.commit()
+        return result
 
+    @writes
+    async def transition_orders(self, transitions: List[OrderTransition]) -> dict:
+        """Apply a batch of status changes; orders that cannot change are reported, not fatal"""
+        result = OrderStateMachine(self.db).apply(transitions)
         self.db.commit()
-        self.db.refresh(order)
-        return order
+        return result
 
+    @reads
     async def get_analytics(self, days: int = 30) -> dict:
+        """Sales analytics for the last days, cached for ANALYTICS_CACHE_TTL_SECONDS"""
+        def load():
+            # Own session: the load is shared with concurrent requests and may outlive this one
+            with read_session(self.db) as db:
+                return AdminService(db)._load_analytics(days)
+
+        return await analytics_cache.get_or_load(f"days:{days}", load, stale_on=(OperationalError,))
+
+    def _load_analytics(self, days: int) -> dict:
         start_date = datetime.utcnow() - timedelta(days=days)
 
         # Revenue over time
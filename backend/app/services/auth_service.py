@@ -1,26 +1,32 @@
+import functools
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
 from app.models.user import User
 from app.schemas import UserCreate, UserResponse, Token
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and jose (which pulls in cryptography) are imported on first use:
+# most requests never hash a password or sign a token, and workers start faster
+
+@functools.lru_cache(maxsize=None)
+def password_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        return password_context().verify(plain_password, hashed_password)
 
     def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+        return password_context().hash(password)
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
+        from jose import jwt
         to_encode = data.copy()
         if expires_delta:
             expire = datetime.utcnow() + expires_delta
@@ -31,6 +37,7 @@ class AuthService:
         return encoded_jwt
 
     def create_refresh_token(self, data: dict):
+        from jose import jwt
         to_encode = data.copy()
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         to_encode.update({"exp": expire})
@@ -92,6 +99,7 @@ class AuthService:
         )
 
     async def refresh_token(self, refresh_token: str) -> Token:
+        from jose import JWTError, jwt
         try:
             payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
             email: str = payload.get("sub")
@@ -141,6 +149,7 @@ class AuthService:
         return {"message": "Password reset email sent"}
 
     async def reset_password(self, token: str, new_password: str):
+        from jose import JWTError, jwt
         try:
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
             email: str = payload.get("sub")
@@ -174,7 +183,7 @@ async def get_current_user(db: Session):
     user = db.query(User).filter(User.email == "admin@example.com").first()
     if not user:
         # Create a dummy admin user for testing
-        hashed_password = pwd_context.hash("admin123")
+        hashed_password = password_context().hash("admin123")
         user = User(
             email="admin@example.com",
             password_hash=hashed_password,
@@ -0,0 +1,106 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert
+from fastapi import HTTPException, status
+from typing import Any, Optional
+from datetime import datetime, timedelta
+import hashlib
+import json
+from app.config import settings
+from app.models.idempotency import IdempotencyKey
+
+def fingerprint(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class IdempotencyService:
+    """Deduplicates retried requests carrying an Idempotency-Key header.
+
+    reserve() inserts the key inside the caller's transaction, before any other
+    write. A concurrent duplicate blocks on that uncommitted row until the first
+    request commits (and then replays its stored response) or rolls back (and
+    then proceeds itself). The stored response is written by complete() and
+    committed together with the order, so the key and its effect are atomic.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _find(self, user_id, key: str) -> Optional[IdempotencyKey]:
+        return (
+            self.db.query(IdempotencyKey)
+            .filter(and_(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key))
+            .populate_existing()
+            .first()
+        )
+
+    def _insert(self, user_id, key: str, scope: str, request_hash: str) -> bool:
+        now = datetime.utcnow()
+        stmt = (
+            insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                key=key,
+                scope=scope,
+                request_hash=request_hash,
+                created_at=now,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+            .on_conflict_do_nothing(index_elements=[IdempotencyKey.user_id, IdempotencyKey.key])
+        )
+        return self.db.execute(stmt).rowcount == 1
+
+    def reserve(self, user_id, key: str, scope: str, payload: Any) -> Optional[IdempotencyKey]:
+        """Claim key for this request.
+
+        Returns None when the caller should process the request, or the stored
+        record whose response should be replayed.
+        """
+        request_hash = fingerprint({"scope": scope, "payload": payload})
+        if self._insert(user_id, key, scope, request_hash):
+            return None
+
+        record = self._find(user_id, key)
+        if record is None or record.expires_at <= datetime.utcnow():
+            # Expired (or purged between the two statements): start over with a fresh key row
+            if record is not None:
+                self.db.delete(record)
+                self.db.flush()
+            if self._insert(user_id, key, scope, request_hash):
+                return None
+            record = self._find(user_id, key)
+
+        if record.scope != scope or record.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        if record.status_code is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+        return record
+
+    def complete(self, user_id, key: str, response_body: Any, status_code: int = 200, order_id=None):
+        """Store the response in the current transaction; the caller commits"""
+        self.db.query(IdempotencyKey).filter(
+            and_(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).update(
+            {
+                "status_code": status_code,
+                "response_body": response_body,
+                "response_hash": fingerprint(response_body),
+                "order_id": order_id,
+            },
+            synchronize_session=False,
+        )
+
+    def purge_expired(self) -> int:
+        deleted = (
+            self.db.query(IdempotencyKey)
+            .filter(IdempotencyKey.expires_at <= datetime.utcnow())
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
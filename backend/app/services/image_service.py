@@ -0,0 +1,120 @@
+import hashlib
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException, Request, status
+from sqlalchemy.orm import Session
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+from app.config import settings
+from app.core.cache import catalog_cache
+from app.core.images import InvalidImage, image_name, resize_image
+from app.core.storage import media_storage
+from app.database import writes
+from app.models.product import ProductVariant
+
+CHUNK_SIZE = 64 * 1024
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Image exceeds {settings.MAX_FILE_SIZE // (1024 * 1024)}MB limit"
+    )
+
+
+async def _limited_stream(request: Request, limit: int) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise _too_large()
+        yield chunk
+
+
+async def read_image_upload(request: Request, field: str = "file") -> UploadFile:
+    """Parse a multipart upload, rejecting oversized bodies while they stream in.
+
+    request.form() would spool the whole body before the route can look at
+    it; here the byte count is checked as each chunk arrives.
+    """
+    limit = settings.MAX_FILE_SIZE + MULTIPART_OVERHEAD
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise _too_large()
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected multipart/form-data"
+        )
+
+    parser = MultiPartParser(request.headers, _limited_stream(request, limit), max_files=1, max_fields=0)
+    try:
+        form = await parser.parse()
+    except MultiPartException as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=exc.message)
+    upload = form.get(field)
+    if not isinstance(upload, UploadFile):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Missing '{field}' file")
+    return upload
+
+
+class ImageService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def _read(self, upload: UploadFile) -> bytes:
+        if upload.content_type not in settings.ALLOWED_FILE_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Allowed image types: {', '.join(settings.ALLOWED_FILE_TYPES)}"
+            )
+        chunks = []
+        size = 0
+        while chunk := await upload.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.MAX_FILE_SIZE:
+                raise _too_large()
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _find_variant(self, product_id: str, variant_id: str, lock: bool = False) -> Optional[ProductVariant]:
+        query = self.db.query(ProductVariant).filter(
+            ProductVariant.id == variant_id,
+            ProductVariant.product_id == product_id
+        )
+        if lock:
+            query = query.with_for_update().populate_existing()
+        return query.first()
+
+    @writes
+    async def add_variant_image(self, product_id: str, variant_id: str, upload: UploadFile) -> Optional[ProductVariant]:
+        if not self._find_variant(product_id, variant_id):
+            return None
+        # Hand the connection back to the pool for the CPU-bound resize
+        self.db.rollback()
+
+        data = await self._read(upload)
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            encoded = await resize_image(data)
+        except InvalidImage as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+        urls = {size: media_storage.save(image_name(digest, size), content) for size, content in encoded.items()}
+        detail_url = urls[max(settings.IMAGE_SIZES, key=settings.IMAGE_SIZES.get)]
+
+        # Re-read under a row lock: concurrent uploads to this variant append in turn
+        variant = self._find_variant(product_id, variant_id, lock=True)
+        if not variant:
+            self.db.rollback()
+            return None
+        if detail_url not in (variant.image_urls or []):
+            # Assign a new list: in-place changes to a JSON column are not tracked
+            variant.image_urls = [*(variant.image_urls or []), detail_url]
+            self.db.commit()
+            self.db.refresh(variant)
+            catalog_cache.invalidate()
+        else:
+            self.db.rollback()
+        return variant
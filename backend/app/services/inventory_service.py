@@ -0,0 +1,205 @@
+import logging
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, asc, case, cast, func, select, tuple_, Date, Float
+from sqlalchemy.dialects.postgresql import insert
+from fastapi import HTTPException, status
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from app.config import settings
+from app.core.cache import catalog_cache
+from app.core.metrics import registry
+from app.database import reads, writes
+from app.models.inventory import VariantDailySales
+from app.models.order import OrderItem
+from app.models.product import Product, ProductVariant, variant_is_low_stock
+from app.schemas import StockUpdate
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_ALERTS = registry.counter(
+    "inventory_low_stock_alerts_total",
+    "Variants whose stock fell to or below their low-stock threshold",
+)
+
+
+class InventoryService:
+    """Stock changes, sales rollups and the low-stock report.
+
+    Every stock change goes through adjust() or set_stock(), which report a
+    variant the moment it drops to its threshold. Which variants are low is
+    answered by the ix_product_variants_low_stock partial index, which
+    Postgres keeps current with each stock write.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _check_threshold(self, variant: ProductVariant, before: int):
+        threshold = variant.low_stock_threshold
+        if before is not None and before > threshold >= variant.stock_quantity:
+            LOW_STOCK_ALERTS.inc()
+            logger.warning(
+                "Low stock: %s has %d left (threshold %d)", variant.sku, variant.stock_quantity, threshold
+            )
+
+    def lock(self, variant_ids) -> List[ProductVariant]:
+        """Lock variants for a stock change and reload their current stock.
+
+        Locked in id order like set_stock, so concurrent orders sharing
+        variants queue instead of deadlocking; rows already in the session are
+        refreshed, so checks and adjust() see the committed stock.
+        """
+        return (
+            self.db.query(ProductVariant)
+            .filter(ProductVariant.id.in_(list(variant_ids)))
+            .order_by(ProductVariant.id)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+
+    def adjust(self, variant: ProductVariant, delta: int):
+        """Change the stock of a variant locked with lock(), within the caller's transaction"""
+        before = variant.stock_quantity
+        variant.stock_quantity = (before or 0) + delta
+        self._check_threshold(variant, before)
+
+    def record_sales(self, units: Dict, day: date):
+        """Add units sold per variant id to the day's rollup (negative for cancellations)"""
+        rows = [
+            {"variant_id": variant_id, "day": day, "units_sold": quantity}
+            for variant_id, quantity in units.items()
+            if quantity
+        ]
+        if not rows:
+            return
+        statement = insert(VariantDailySales).values(rows)
+        self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[VariantDailySales.variant_id, VariantDailySales.day],
+                set_={"units_sold": VariantDailySales.units_sold + statement.excluded.units_sold},
+            )
+        )
+
+    def restock_orders(self, orders: List[Tuple]):
+        """Return the stock of cancelled orders, given as (id, created_at) pairs, and reverse their sales"""
+        if not orders:
+            return
+        # (order_id, order_created_at) matches the partition key, so only the orders' partitions are read
+        lines = (
+            select(OrderItem.product_variant_id, OrderItem.order_created_at, OrderItem.quantity)
+            .where(tuple_(OrderItem.order_id, OrderItem.order_created_at).in_(orders))
+            .subquery()
+        )
+        returned = (
+            select(lines.c.product_variant_id, func.sum(lines.c.quantity).label("quantity"))
+            .group_by(lines.c.product_variant_id)
+            .subquery()
+        )
+        # Lock in id order like set_stock, so concurrent bulk updates cannot deadlock
+        self.db.execute(
+            select(ProductVariant.id)
+            .where(ProductVariant.id.in_(select(returned.c.product_variant_id)))
+            .order_by(ProductVariant.id)
+            .with_for_update()
+        )
+        variants = ProductVariant.__table__
+        self.db.execute(
+            variants.update()
+            .where(variants.c.id == returned.c.product_variant_id)
+            .values(stock_quantity=variants.c.stock_quantity + returned.c.quantity)
+        )
+
+        sales = insert(VariantDailySales).from_select(
+            ["variant_id", "day", "units_sold"],
+            select(
+                lines.c.product_variant_id,
+                cast(lines.c.order_created_at, Date),
+                -func.sum(lines.c.quantity),
+            ).group_by(lines.c.product_variant_id, cast(lines.c.order_created_at, Date)),
+        )
+        self.db.execute(
+            sales.on_conflict_do_update(
+                index_elements=[VariantDailySales.variant_id, VariantDailySales.day],
+                set_={"units_sold": VariantDailySales.units_sold + sales.excluded.units_sold},
+            )
+        )
+
+    @writes
+    async def set_stock(self, updates: List[StockUpdate]) -> List[ProductVariant]:
+        """Apply stock counts and thresholds by SKU, all or nothing"""
+        by_sku = {update.sku: update for update in updates}
+        variants = (
+            self.db.query(ProductVariant)
+            .filter(ProductVariant.sku.in_(list(by_sku)))
+            .order_by(ProductVariant.id)  # Consistent lock order between concurrent bulk updates
+            .with_for_update()
+            .all()
+        )
+        missing = set(by_sku) - {variant.sku for variant in variants}
+        if missing:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown SKUs: {', '.join(sorted(missing))}"
+            )
+
+        for variant in variants:
+            update = by_sku[variant.sku]
+            before = variant.stock_quantity
+            if update.low_stock_threshold is not None:
+                variant.low_stock_threshold = update.low_stock_threshold
+            if update.stock_quantity is not None:
+                variant.stock_quantity = update.stock_quantity
+            self._check_threshold(variant, before)
+        self.db.commit()
+        catalog_cache.invalidate()
+        return variants
+
+    @reads
+    async def get_low_stock(self, skip: int = 0, limit: int = 50, days: Optional[int] = None) -> List[dict]:
+        """Low-stock variants with sales velocity, fewest days of cover first"""
+        days = days or settings.SALES_VELOCITY_DAYS
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        # Per-variant primary-key range over the rollup, evaluated only for low-stock rows
+        units_sold = (
+            select(func.coalesce(func.sum(VariantDailySales.units_sold), 0))
+            .where(and_(VariantDailySales.variant_id == ProductVariant.id, VariantDailySales.day >= since))
+            .correlate(ProductVariant)
+            .scalar_subquery()
+            .label("units_sold")
+        )
+        low_stock = (
+            self.db.query(
+                ProductVariant.id.label("variant_id"),
+                ProductVariant.product_id,
+                Product.name.label("product_name"),
+                ProductVariant.sku,
+                ProductVariant.size,
+                ProductVariant.color,
+                ProductVariant.stock_quantity,
+                ProductVariant.low_stock_threshold,
+                units_sold,
+            )
+            .join(Product, Product.id == ProductVariant.product_id)
+            .filter(and_(variant_is_low_stock, Product.is_active == True))
+            .subquery()
+        )
+        days_of_cover = case(
+            (low_stock.c.units_sold > 0, low_stock.c.stock_quantity * days / cast(low_stock.c.units_sold, Float)),
+            else_=None,
+        ).label("days_of_cover")
+        rows = (
+            self.db.query(low_stock, days_of_cover)
+            .order_by(asc(days_of_cover).nulls_last(), asc(low_stock.c.stock_quantity), low_stock.c.sku)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return [
+            {
+                **row._asdict(),
+                "daily_velocity": row.units_sold / days,
+            }
+            for row in rows
+        ]
@@ -1,28 +1,52 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc
 from fastapi import HTTPException, status
 from typing import List, Optional
-from decimal import Decimal
+from collections import Counter, defaultdict
 from datetime import datetime
-import uuid
+import asyncio
+from app.core.loader import load_relationship
+from app.core.order_numbers import order_numbers
+from app.core.trending import trending
+from app.database import reads, writes
 from app.models.order import Order, OrderItem, OrderStatus
-from app.models.product import ProductVariant
-from app.schemas import OrderCreate
+from app.models.user import User
+from app.schemas import OrderCreate, OrderResponse, OrderTransition
+from app.schemas.order import OrderStatusEnum
+from app.services.idempotency_service import IdempotencyService
+from app.services.inventory_service import InventoryService
+from app.services.order_state import OrderStateMachine
+from app.services.order_stats_service import OrderStatsService
+from app.services.pricing_service import PricingService
 
 class OrderService:
     def __init__(self, db: Session):
         self.db = db
 
     def generate_order_number(self) -> str:
-        return f"ORD-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+        # Allocated from memory; touches the database once per sequence block
+        return order_numbers.next()
 
+    @reads
     async def get_user_orders(
         self,
         user_id: str,
         skip: int = 0,
         limit: int = 20,
         status_filter: Optional[str] = None
-    ) -> List[Order]:
-        query = self.db.query(Order).filter(Order.user_id == user_id)
+    ) -> List[dict]:
+        """A page of the user's order history, newest first, with a line summary per order"""
+        # Summary columns only: no address or payment JSON
+        query = self.db.query(
+            Order.id,
+            Order.order_number,
+            Order.status,
+            Order.payment_status,
+            Order.tracking_number,
+            Order.item_count,
+            Order.total_amount,
+            Order.created_at,
+        ).filter(Order.user_id == user_id)
 
         if status_filter:
             try:
@@ -31,152 +55,156 @@ class OrderService:
             except ValueError:
                 pass  # Invalid status, ignore filter
 
-        return query.order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
+        orders = query.order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
+        if not orders:
+            return []
+
+        # Items for this page only, in one query bounded to the page's partitions
+        items = defaultdict(list)
+        for item in (
+            self.db.query(
+                OrderItem.order_id,
+                OrderItem.product_id,
+                OrderItem.product_variant_id,
+                OrderItem.product_name,
+                OrderItem.product_image,
+                OrderItem.size,
+                OrderItem.color,
+                OrderItem.quantity,
+                OrderItem.total_price,
+            )
+            .filter(
+                OrderItem.order_id.in_([order.id for order in orders]),
+                OrderItem.order_created_at.between(orders[-1].created_at, orders[0].created_at),
+            )
+            .order_by(OrderItem.order_id, OrderItem.id)
+        ):
+            items[item.order_id].append(item)
+        return [{**order._asdict(), "items": items[order.id]} for order in orders]
 
+    @reads
     async def get_order(self, order_id: str, user_id: str) -> Optional[Order]:
-        return (
+        order = (
             self.db.query(Order)
             .filter(and_(Order.id == order_id, Order.user_id == user_id))
             .first()
         )
-
-    async def create_order(self, order_data: OrderCreate, user_id: str) -> Order:
-        # Validate stock and calculate totals
-        subtotal = Decimal('0')
-        order_items = []
-
-        for item in order_data.items:
-            # Get product variant
-            variant = (
-                self.db.query(ProductVariant)
-                .filter(ProductVariant.id == item.product_variant_id)
-                .first()
+        if order:
+            await load_relationship(self.db, Order.items, [order])
+        return order
+
+    @writes
+    async def create_order(self, order_data: OrderCreate, user_id: str, idempotency_key: Optional[str] = None):
+        # Numbered before the transaction opens; a block refill never runs inside it
+        order_number = self.generate_order_number()
+
+        # The key is claimed first, so a retry of an in-flight request waits on
+        # it here instead of validating stock and creating a second order.
+        idempotency = IdempotencyService(self.db)
+        if idempotency_key:
+            replay = idempotency.reserve(
+                user_id, idempotency_key, "orders.create", order_data.model_dump(mode="json")
             )
-
-            if not variant:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Product variant {item.product_variant_id} not found"
-                )
-
-            if variant.stock_quantity < item.quantity:
+            if replay:
+                return replay.response_body
+
+        # Price all lines in one pass, then lock the variants and validate stock
+        # against their current counts, so concurrent orders cannot both take the last units
+        quote = await PricingService(self.db).quote_items(order_data.items, order_data.shipping_address.dict())
+        inventory = InventoryService(self.db)
+        variant_units = Counter()
+        for line in quote.lines:
+            variant_units[line.variant.id] += line.quantity
+        for variant in inventory.lock(variant_units):
+            if variant.stock_quantity < variant_units[variant.id]:
+                self.db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Insufficient stock for {variant.size}"
                 )
 
-            # Calculate price
-            unit_price = variant.price or variant.product.base_price
-            if variant.product.sale_price:
-                unit_price = variant.product.sale_price
-
-            item_total = unit_price * item.quantity
-            subtotal += item_total
-
-            order_items.append({
-                "product_variant": variant,
-                "quantity": item.quantity,
-                "unit_price": unit_price,
-                "total_price": item_total
-            })
-
-        # Calculate totals
-        tax_amount = subtotal * Decimal('0.08')  # 8% tax
-        shipping_amount = Decimal('9.99')
-        if subtotal >= Decimal('100'):
-            shipping_amount = Decimal('0')  # Free shipping over $100
-
-        total_amount = subtotal + tax_amount + shipping_amount
+        customer = self.db.query(User.first_name, User.last_name, User.email).filter(User.id == user_id).first()
 
         # Create order
         db_order = Order(
             user_id=user_id,
-            order_number=self.generate_order_number(),
-            subtotal=subtotal,
-            tax_amount=tax_amount,
-            shipping_amount=shipping_amount,
-            total_amount=total_amount,
+            order_number=order_number,
+            subtotal=quote.subtotal,
+            tax_amount=quote.tax_amount,
+            shipping_amount=quote.shipping_amount,
+            total_amount=quote.total_amount,
             shipping_address=order_data.shipping_address.dict(),
             billing_address=order_data.billing_address.dict() if order_data.billing_address else None,
             payment_method=order_data.payment_method,
             notes=order_data.notes,
+            item_count=sum(line.quantity for line in quote.lines),
+            customer_name=f"{customer.first_name} {customer.last_name}" if customer else None,
+            customer_email=customer.email.lower() if customer else None,
         )
 
         self.db.add(db_order)
-        self.db.commit()
-        self.db.refresh(db_order)
 
         # Create order items and update stock
-        for item_data in order_items:
+        units_sold = Counter()
+        for line in quote.lines:
             # Create order item
             order_item = OrderItem(
-                order_id=db_order.id,
-                product_id=item_data["product_variant"].product_id,
-                product_variant_id=item_data["product_variant"].id,
-                product_name=item_data["product_variant"].product.name,
-                product_image=item_data["product_variant"].image_urls[0] if item_data["product_variant"].image_urls else None,
-                size=item_data["product_variant"].size,
-                color=item_data["product_variant"].color,
-                quantity=item_data["quantity"],
-                unit_price=item_data["unit_price"],
-                total_price=item_data["total_price"],
+                product_id=line.variant.product_id,
+                product_variant_id=line.variant.id,
+                product_name=line.variant.product.name,
+                product_image=line.variant.image_urls[0] if line.variant.image_urls else None,
+                size=line.variant.size,
+                color=line.variant.color,
+                quantity=line.quantity,
+                unit_price=line.unit_price,
+                total_price=line.total_price,
             )
-            self.db.add(order_item)
+            db_order.items.append(order_item)
 
             # Update stock
-            item_data["product_variant"].stock_quantity -= item_data["quantity"]
-
+            inventory.adjust(line.variant, -line.quantity)
+            units_sold[line.variant.product_id] += line.quantity
+        inventory.record_sales(variant_units, datetime.utcnow().date())
+
+        # Order, items, stock, customer totals and the stored response commit together
+        self.db.flush()
+        OrderStatsService(self.db).order_placed(db_order)
+        if idempotency_key:
+            idempotency.complete(
+                user_id, idempotency_key,
+                OrderResponse.model_validate(db_order).model_dump(mode="json"),
+                status_code=200, order_id=db_order.id,
+            )
         self.db.commit()
         self.db.refresh(db_order)
+        await asyncio.to_thread(trending.record_sale, units_sold)
         return db_order
 
-    async def cancel_order(self, order_id: str, user_id: str) -> bool:
-        order = (
-            self.db.query(Order)
-            .filter(and_(Order.id == order_id, Order.user_id == user_id))
-            .first()
-        )
-
-        if not order:
-            return False
+    @writes
+    async def cancel_order(self, order_id: str, user_id: str, idempotency_key: Optional[str] = None) -> bool:
+        idempotency = IdempotencyService(self.db)
+        if idempotency_key:
+            replay = idempotency.reserve(user_id, idempotency_key, "orders.cancel", {"order_id": str(order_id)})
+            if replay:
+                return True
 
-        if order.status not in [OrderStatus.PENDING, OrderStatus.PROCESSING]:
+        result = OrderStateMachine(self.db).apply(
+            [OrderTransition(order_id=order_id, status=OrderStatusEnum.CANCELLED)], user_id=user_id
+        )
+        if not result["updated"]:
+            # An order already cancelled comes back unchanged: only a replayed key repeats a cancellation
+            self.db.rollback()
+            if result["rejected"] and result["rejected"][0]["reason"] == "not_found":
+                return False
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Order cannot be cancelled at this stage"
             )
 
-        # Restore stock
-        for item in order.items:
-            variant = (
-                self.db.query(ProductVariant)
-                .filter(ProductVariant.id == item.product_variant_id)
-                .first()
+        if idempotency_key:
+            idempotency.complete(
+                user_id, idempotency_key, {"message": "Order cancelled successfully"}, order_id=order_id
             )
-            if variant:
-                variant.stock_quantity += item.quantity
-
-        # Update order status
-        order.status = OrderStatus.CANCELLED
         self.db.commit()
         return True
 
-    async def update_order_status(self, order_id: str, status: str, tracking_number: Optional[str] = None) -> Optional[Order]:
-        order = self.db.query(Order).filter(Order.id == order_id).first()
-        if not order:
-            return None
-
-        try:
-            order.status = OrderStatus(status)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid order status"
-            )
-
-        if tracking_number:
-            order.tracking_number = tracking_number
-
-        self.db.commit()
-        self.db.refresh(order)
-        return order
\ No newline at end of file
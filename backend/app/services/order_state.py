@@ -0,0 +1,182 @@
+"""Order status state machine.
+
+Every status change goes through OrderStateMachine, whether one order from
+the admin page, a customer's cancellation or a fulfilment batch. Allowed moves:
+
+    pending -> processing -> shipped -> delivered
+    pending, processing -> cancelled
+
+Setting an order's current status again is accepted, so a retried batch is
+harmless: it is reported as unchanged and leaves the order alone unless it
+sets a new tracking number. orders.version is bumped by every actual change,
+and a transition that names the version it was based on is rejected if the
+order has changed since.
+
+A batch is applied with one locking read of all its orders and one UPDATE per
+target status. Cancellation returns stock and corrects the customer's totals
+in the same transaction, set-based as well. OrderStatusChanged events are
+delivered to subscribers after the commit (see app.core.events).
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import and_, column, func, select, values, DateTime, String
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Session
+from app.core.events import bus
+from app.core.metrics import registry
+from app.models.order import Order, OrderStatus
+from app.schemas import OrderTransition
+from app.services.inventory_service import InventoryService
+from app.services.order_stats_service import OrderStatsService
+
+TRANSITIONS: Dict[OrderStatus, frozenset] = {
+    OrderStatus.PENDING: frozenset({OrderStatus.PROCESSING, OrderStatus.CANCELLED}),
+    OrderStatus.PROCESSING: frozenset({OrderStatus.SHIPPED, OrderStatus.CANCELLED}),
+    OrderStatus.SHIPPED: frozenset({OrderStatus.DELIVERED}),
+    OrderStatus.DELIVERED: frozenset(),
+    OrderStatus.CANCELLED: frozenset(),
+}
+
+ORDER_TRANSITIONS = registry.counter(
+    "order_status_transitions_total",
+    "Committed order status changes",
+    ["from_status", "to_status"],
+)
+
+
+def can_transition(current: OrderStatus, target: OrderStatus) -> bool:
+    return target == current or target in TRANSITIONS[current]
+
+
+@dataclass(frozen=True)
+class OrderStatusChanged:
+    order_id: UUID
+    order_number: str
+    user_id: Optional[UUID]
+    previous: OrderStatus
+    status: OrderStatus
+    tracking_number: Optional[str]
+    changed_at: datetime
+
+
+@bus.subscribe(OrderStatusChanged)
+def count_transition(event: OrderStatusChanged):
+    ORDER_TRANSITIONS.inc(event.previous.value, event.status.value)
+
+
+class OrderStateMachine:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _lock(self, order_ids: List[UUID], user_id=None) -> Dict[UUID, tuple]:
+        query = (
+            select(
+                Order.id,
+                Order.order_number,
+                Order.user_id,
+                Order.status,
+                Order.version,
+                Order.total_amount,
+                Order.tracking_number,
+                Order.created_at,
+            )
+            .where(Order.id.in_(order_ids))
+            # Same lock order in every batch, so two overlapping batches cannot deadlock
+            .order_by(Order.id)
+            .with_for_update()
+        )
+        if user_id is not None:
+            query = query.where(Order.user_id == user_id)
+        return {row.id: row for row in self.db.execute(query)}
+
+    def _update(self, target: OrderStatus, changes: List[tuple], now: datetime):
+        """One UPDATE for every order moving to target; changes are (order row, new tracking number)"""
+        table = Order.__table__
+        rows = values(
+            column("id", PGUUID(as_uuid=True)),
+            column("created_at", DateTime),
+            column("tracking_number", String(100)),
+            name="changes",
+        ).data([(order.id, order.created_at, tracking_number) for order, tracking_number in changes])
+        self.db.execute(
+            table.update()
+            # The full primary key, so each order is found in its own partition
+            .where(and_(table.c.id == rows.c.id, table.c.created_at == rows.c.created_at))
+            .values(
+                status=target,
+                version=table.c.version + 1,
+                tracking_number=func.coalesce(rows.c.tracking_number, table.c.tracking_number),
+                updated_at=now,
+            )
+        )
+
+    def apply(self, transitions: List[OrderTransition], user_id=None) -> dict:
+        """Apply what can be applied within the caller's transaction; returns updated, unchanged and rejected orders.
+
+        With user_id, only that user's orders are found.
+        """
+        orders = self._lock(list({transition.order_id for transition in transitions}), user_id)
+        updated, unchanged, rejected = [], [], []
+        by_target = defaultdict(list)
+        seen = set()
+        for transition in transitions:
+            order = orders.get(transition.order_id)
+            target = OrderStatus(transition.status.value)
+            if order is None:
+                rejected.append({"order_id": transition.order_id, "reason": "not_found"})
+                continue
+            current = {"order_id": order.id, "status": order.status.value, "version": order.version}
+            if order.id in seen:
+                rejected.append({**current, "reason": "duplicate"})
+            elif transition.version is not None and transition.version != order.version:
+                rejected.append({**current, "reason": "version_conflict"})
+            elif not can_transition(order.status, target):
+                rejected.append({**current, "reason": "invalid_transition"})
+            elif target == order.status and transition.tracking_number in (None, order.tracking_number):
+                unchanged.append(current)
+            else:
+                by_target[target].append((order, transition.tracking_number))
+                updated.append({"order_id": order.id, "status": target.value, "version": order.version + 1})
+            seen.add(order.id)
+
+        now = datetime.utcnow()
+        for target, changes in by_target.items():
+            self._update(target, changes, now)
+            moved = [order for order, _ in changes if order.status != target]
+            if target == OrderStatus.CANCELLED and moved:
+                InventoryService(self.db).restock_orders([(order.id, order.created_at) for order in moved])
+                OrderStatsService(self.db).orders_cancelled(moved)
+            for order, tracking_number in changes:
+                if order.status != target:
+                    bus.emit(self.db, OrderStatusChanged(
+                        order_id=order.id,
+                        order_number=order.order_number,
+                        user_id=order.user_id,
+                        previous=order.status,
+                        status=target,
+                        tracking_number=tracking_number or order.tracking_number,
+                        changed_at=now,
+                    ))
+        return {"updated": updated, "unchanged": unchanged, "rejected": rejected}
+
+    def transition(self, transition: OrderTransition, user_id=None) -> dict:
+        """Apply a single transition, raising 404, 409 (stale version) or 400 (not allowed)"""
+        result = self.apply([transition], user_id)
+        if result["updated"] or result["unchanged"]:
+            return (result["updated"] or result["unchanged"])[0]
+        rejection = result["rejected"][0]
+        if rejection["reason"] == "not_found":
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+        if rejection["reason"] == "version_conflict":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Order has changed since version {transition.version}; it is now at version {rejection['version']}"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot change a {rejection['status']} order to {transition.status.value}"
+        )
@@ -0,0 +1,93 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import column, func, text, values, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID as PGUUID, insert
+from collections import defaultdict
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, Iterable
+from app.database import reads
+from app.models.order import Order, UserOrderStats
+
+# Transaction-scoped advisory locks, one per user, taken in key order so callers cannot deadlock
+_LOCK_USERS = text(
+    "SELECT pg_advisory_xact_lock(key) FROM ("
+    "SELECT DISTINCT hashtext(CAST(user_id AS text)) AS key FROM unnest(CAST(:ids AS uuid[])) AS user_id "
+    "ORDER BY key) AS keys"
+)
+
+
+def lock_users(connection, user_ids: Iterable):
+    """Hold off other changes to these users' totals until the transaction ends.
+
+    Row locks cannot cover a user with no user_order_stats row yet, so the
+    order writes and app.jobs.order_stats serialize on these instead.
+    """
+    connection.execute(_LOCK_USERS, {"ids": list(user_ids)})
+
+
+class OrderStatsService:
+    """Per-customer order totals, updated within the caller's transaction.
+
+    Callers report each order placed and each order cancelled; a cancelled
+    order never leaves CANCELLED (see app.services.order_state). Both lock
+    the customers first (lock_users), as does app.jobs.order_stats.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def order_placed(self, order: Order):
+        if order.user_id is None:
+            return
+        lock_users(self.db, [order.user_id])
+        table = UserOrderStats.__table__
+        statement = insert(table).values(
+            user_id=order.user_id,
+            order_count=1,
+            lifetime_spend=order.total_amount,
+            last_order_at=order.created_at,
+            updated_at=datetime.utcnow(),
+        )
+        self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table.c.user_id],
+                set_={
+                    "order_count": table.c.order_count + statement.excluded.order_count,
+                    "lifetime_spend": table.c.lifetime_spend + statement.excluded.lifetime_spend,
+                    "last_order_at": func.greatest(table.c.last_order_at, statement.excluded.last_order_at),
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+        )
+
+    def orders_cancelled(self, orders: Iterable):
+        """Take cancelled orders (anything with user_id and total_amount) out of their customers' totals"""
+        totals: Dict = defaultdict(lambda: [0, Decimal("0")])
+        for order in orders:
+            if order.user_id is not None:
+                totals[order.user_id][0] += 1
+                totals[order.user_id][1] += order.total_amount
+        if not totals:
+            return
+        lock_users(self.db, totals)
+        table = UserOrderStats.__table__
+        changes = values(
+            column("user_id", PGUUID(as_uuid=True)),
+            column("orders", Integer),
+            column("spend", Numeric(12, 2)),
+            name="changes",
+        ).data([(user_id, count, spend) for user_id, (count, spend) in sorted(totals.items())])
+        self.db.execute(
+            table.update()
+            .where(table.c.user_id == changes.c.user_id)
+            .values(
+                order_count=table.c.order_count - changes.c.orders,
+                lifetime_spend=table.c.lifetime_spend - changes.c.spend,
+                updated_at=datetime.utcnow(),
+            )
+        )
+
+    @reads
+    async def get_stats(self, user_id) -> UserOrderStats:
+        stats = self.db.query(UserOrderStats).filter(UserOrderStats.user_id == user_id).first()
+        return stats or UserOrderStats(user_id=user_id, order_count=0, lifetime_spend=Decimal("0"))
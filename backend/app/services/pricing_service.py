@@ -0,0 +1,164 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+import threading
+import time
+import uuid
+from app.config import settings
+from app.core.loader import prime_relationship
+from app.database import reads
+from app.models.pricing import TaxRule, ShippingRule
+from app.models.product import ProductVariant
+
+CENTS = Decimal("0.01")
+
+def to_cents(amount: Decimal) -> Decimal:
+    return amount.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+@dataclass(frozen=True)
+class TaxRate:
+    country: Optional[str]
+    state: Optional[str]
+    rate: Decimal
+
+    def specificity(self, country: Optional[str], state: Optional[str]) -> int:
+        """-1 if the rule does not apply, otherwise higher for narrower rules"""
+        if self.country is not None and self.country != country:
+            return -1
+        if self.state is not None and self.state != state:
+            return -1
+        return (self.country is not None) + (self.state is not None)
+
+@dataclass(frozen=True)
+class ShippingRate:
+    country: Optional[str]
+    min_subtotal: Decimal
+    max_subtotal: Optional[Decimal]
+    amount: Decimal
+
+    def applies(self, country: Optional[str], subtotal: Decimal) -> bool:
+        return (
+            (self.country is None or self.country == country)
+            and subtotal >= self.min_subtotal
+            and (self.max_subtotal is None or subtotal < self.max_subtotal)
+        )
+
+class PricingRules:
+    """Active tax and shipping rules, held in memory and reloaded after ttl seconds"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._tax: List[TaxRate] = []
+        self._shipping: List[ShippingRate] = []
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _load(self, db: Session):
+        self._tax = [
+            TaxRate(row.country, row.state, row.rate)
+            for row in db.query(TaxRule.country, TaxRule.state, TaxRule.rate).filter(TaxRule.is_active == True)
+        ]
+        self._shipping = [
+            ShippingRate(row.country, row.min_subtotal, row.max_subtotal, row.amount)
+            for row in db.query(
+                ShippingRule.country, ShippingRule.min_subtotal, ShippingRule.max_subtotal, ShippingRule.amount
+            ).filter(ShippingRule.is_active == True)
+        ]
+        self._loaded_at = time.monotonic()
+
+    def get(self, db: Session) -> Tuple[List[TaxRate], List[ShippingRate]]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            with self._lock:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+                    self._load(db)
+        return self._tax, self._shipping
+
+    def tax_rate(self, db: Session, country: Optional[str], state: Optional[str]) -> Decimal:
+        tax, _ = self.get(db)
+        matches = [(rule.specificity(country, state), rule.rate) for rule in tax]
+        matches = [match for match in matches if match[0] >= 0]
+        return max(matches)[1] if matches else Decimal("0")
+
+    def shipping_amount(self, db: Session, country: Optional[str], subtotal: Decimal) -> Decimal:
+        _, shipping = self.get(db)
+        matches = [rule for rule in shipping if rule.applies(country, subtotal)]
+        if not matches:
+            return Decimal("0")
+        # A country-specific rule beats the global one
+        return max(matches, key=lambda rule: (rule.country is not None, rule.min_subtotal)).amount
+
+pricing_rules = PricingRules(settings.PRICING_RULES_CACHE_SECONDS)
+
+@dataclass
+class QuoteLine:
+    variant: ProductVariant
+    quantity: int
+    unit_price: Decimal
+    total_price: Decimal
+
+    @property
+    def product_id(self) -> uuid.UUID:
+        return self.variant.product_id
+
+    @property
+    def product_variant_id(self) -> uuid.UUID:
+        return self.variant.id
+
+@dataclass
+class Quote:
+    lines: List[QuoteLine]
+    subtotal: Decimal
+    tax_amount: Decimal
+    shipping_amount: Decimal
+    total_amount: Decimal
+
+class PricingService:
+    """Single source of prices and totals for the cart, checkout and listings"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_variants(self, variant_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, ProductVariant]:
+        """Fetch all requested variants in one query, and their products in one more"""
+        variants = self.db.query(ProductVariant).filter(ProductVariant.id.in_(set(variant_ids))).all()
+        prime_relationship(self.db, ProductVariant.product, variants)
+        found = {variant.id: variant for variant in variants}
+        for variant_id in variant_ids:
+            if variant_id not in found:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Product variant {variant_id} not found"
+                )
+        return found
+
+    def quote(self, lines: Sequence[Tuple[ProductVariant, int]], address: Optional[dict] = None) -> Quote:
+        """Price every line from the stored effective price and apply tax and shipping rules"""
+        priced = [
+            QuoteLine(variant, quantity, variant.effective_price, variant.effective_price * quantity)
+            for variant, quantity in lines
+        ]
+        subtotal = sum((line.total_price for line in priced), Decimal("0"))
+
+        address = address or {}
+        country, state = address.get("country"), address.get("state")
+        tax_amount = to_cents(subtotal * pricing_rules.tax_rate(self.db, country, state))
+        shipping_amount = pricing_rules.shipping_amount(self.db, country, subtotal) if priced else Decimal("0")
+
+        return Quote(
+            lines=priced,
+            subtotal=subtotal,
+            tax_amount=tax_amount,
+            shipping_amount=shipping_amount,
+            total_amount=subtotal + tax_amount + shipping_amount,
+        )
+
+    @reads
+    async def quote_items(self, items: Sequence, address: Optional[dict] = None) -> Quote:
+        """Quote request items carrying product_variant_id and quantity"""
+        variants = self.load_variants([item.product_variant_id for item in items])
+        return self.quote([(variants[item.product_variant_id], item.quantity) for item in items], address)
@@ -1,15 +1,59 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, desc, asc
+from sqlalchemy.exc import OperationalError
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import Any, Callable, List, Optional
 from decimal import Decimal
+import redis
+from app.config import settings
+from app.core.cache import catalog_cache
+from app.core.loader import load_relationship, prime_relationship
+from app.core.health import health_monitor
+from app.core.trending import trending
+from app.database import read_session, reads, writes
 from app.models.product import Product, ProductVariant
-from app.schemas import ProductCreate, ProductUpdate
+from app.models.recommendation import ProductRecommendation
+from app.schemas import ProductCreate, ProductUpdate, ProductResponse
 
 class ProductService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _serialize(self, products: List[Product]) -> List[dict]:
+        # Cache loaders run synchronously, so variants are primed rather than awaited
+        prime_relationship(self.db, Product.variants, products)
+        return [ProductResponse.model_validate(product).model_dump(mode="json") for product in products]
+
+    async def _cached_read(self, key: str, loader: Callable[["ProductService"], Any]) -> Any:
+        """Serve a catalog read through the cache.
+
+        loader gets a ProductService on its own short-lived session: the load
+        may be shared with other requests and outlive this one, whose session
+        is closed when it ends. While the database is unhealthy, cached entries
+        are served regardless of age and the database is not queried.
+        """
+        def load():
+            with read_session(self.db) as db:
+                try:
+                    return loader(ProductService(db))
+                except OperationalError:
+                    health_monitor.mark_database_unhealthy()
+                    raise
+
+        try:
+            return await catalog_cache.get_or_load(
+                key,
+                load,
+                serve_stale=lambda: not health_monitor.database_available(),
+                stale_on=(OperationalError,),
+            )
+        except OperationalError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Catalog temporarily unavailable"
+            )
+
+    @reads
     async def get_products(
         self,
         skip: int = 0,
@@ -19,6 +63,24 @@ class ProductService:
         min_price: Optional[float] = None,
         max_price: Optional[float] = None,
         sort_by: Optional[str] = "created_at"
+    ) -> List[dict]:
+        key = f"products:{skip}:{limit}:{sport}:{team}:{min_price}:{max_price}:{sort_by}"
+        return await self._cached_read(
+            key,
+            lambda service: service._serialize(
+                service._query_products(skip, limit, sport, team, min_price, max_price, sort_by)
+            ),
+        )
+
+    def _query_products(
+        self,
+        skip: int,
+        limit: int,
+        sport: Optional[str],
+        team: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        sort_by: Optional[str]
     ) -> List[Product]:
         query = self.db.query(Product).filter(Product.is_active == True)
 
@@ -28,44 +90,88 @@ class ProductService:
         if team:
             query = query.filter(Product.team.ilike(f"%{team}%"))
         if min_price is not None:
-            query = query.filter(Product.base_price >= Decimal(min_price))
+            query = query.filter(Product.effective_price >= Decimal(str(min_price)))
         if max_price is not None:
-            query = query.filter(Product.base_price <= Decimal(max_price))
+            query = query.filter(Product.effective_price <= Decimal(str(max_price)))
 
         # Apply sorting
         if sort_by == "price_asc":
-            query = query.order_by(asc(Product.base_price))
+            query = query.order_by(asc(Product.effective_price))
         elif sort_by == "price_desc":
-            query = query.order_by(desc(Product.base_price))
+            query = query.order_by(desc(Product.effective_price))
         elif sort_by == "newest":
             query = query.order_by(desc(Product.created_at))
         elif sort_by == "rating":
-            query = query.order_by(desc(Product.average_rating))
+            query = query.order_by(desc(Product.bayesian_rating))
+        elif sort_by == "trending":
+            query = query.order_by(desc(Product.trending_score), desc(Product.created_at))
         else:
             query = query.order_by(desc(Product.created_at))
 
         return query.offset(skip).limit(limit).all()
 
-    async def get_featured_products(self, limit: int = 8) -> List[Product]:
-        return (
-            self.db.query(Product)
-            .filter(Product.is_active == True)
-            .order_by(desc(Product.average_rating))
-            .limit(limit)
-            .all()
+    @reads
+    async def get_featured_products(self, limit: int = 8) -> List[dict]:
+        return await self._cached_read(
+            f"featured:{limit}",
+            lambda service: service._serialize(
+                service.db.query(Product)
+                .filter(Product.is_active == True)
+                .order_by(desc(Product.bayesian_rating))
+                .limit(limit)
+                .all()
+            ),
         )
 
-    async def get_new_arrivals(self, limit: int = 8) -> List[Product]:
-        return (
-            self.db.query(Product)
-            .filter(Product.is_active == True)
-            .order_by(desc(Product.created_at))
-            .limit(limit)
-            .all()
+    @reads
+    async def get_new_arrivals(self, limit: int = 8) -> List[dict]:
+        return await self._cached_read(
+            f"new-arrivals:{limit}",
+            lambda service: service._serialize(
+                service.db.query(Product)
+                .filter(Product.is_active == True)
+                .order_by(desc(Product.created_at))
+                .limit(limit)
+                .all()
+            ),
         )
 
+    @reads
+    async def get_trending_products(self, limit: int = 8) -> List[dict]:
+        """Top products by decayed sales and views, as ranked by app.jobs.trending"""
+        def load(service):
+            try:
+                product_ids = trending.top(limit)
+            except redis.RedisError:
+                product_ids = []
+            if not product_ids:
+                # No ranking yet (or Redis is down): fall back to the database copy
+                return service._serialize(service._query_products(0, limit, None, None, None, None, "trending"))
+            products = {
+                str(product.id): product
+                for product in service.db.query(Product).filter(
+                    and_(Product.id.in_(product_ids), Product.is_active == True)
+                )
+            }
+            return service._serialize([products[product_id] for product_id in product_ids if product_id in products])
+
+        return await self._cached_read(f"trending:{limit}", load)
+
+    async def warm_cache(self, names: List[str]):
+        """Load the named catalog reads (see CACHE_WARMUP) into the cache with their default arguments"""
+        loaders = {
+            "featured": self.get_featured_products,
+            "new-arrivals": self.get_new_arrivals,
+            "trending": self.get_trending_products,
+            "categories": self.get_categories,
+            "teams": self.get_teams,
+        }
+        for name in names:
+            await loaders[name]()
+
+    @reads
     async def search_products(self, query: str, limit: int = 20) -> List[Product]:
-        return (
+        products = (
             self.db.query(Product)
             .filter(
                 and_(
@@ -79,18 +185,55 @@ class ProductService:
                     )
                 )
             )
-            .order_by(desc(Product.average_rating))
+            .order_by(desc(Product.bayesian_rating))
             .limit(limit)
             .all()
         )
+        await load_relationship(self.db, Product.variants, products)
+        return products
 
-    async def get_product_by_slug(self, slug: str) -> Optional[Product]:
-        return (
-            self.db.query(Product)
-            .filter(and_(Product.slug == slug, Product.is_active == True))
-            .first()
-        )
+    @reads
+    async def get_product_by_slug(self, slug: str) -> Optional[dict]:
+        def load(service):
+            product = (
+                service.db.query(Product)
+                .filter(and_(Product.slug == slug, Product.is_active == True))
+                .first()
+            )
+            return service._serialize([product])[0] if product else None
 
+        product = await self._cached_read(f"product:{slug}", load)
+        if product:
+            trending.record_view(product["id"])
+        return product
+
+    @reads
+    async def get_related_products(self, slug: str, limit: int = 8) -> Optional[List[dict]]:
+        """Products most often bought together with slug, from app.jobs.recommendations"""
+        def load(service):
+            row = (
+                service.db.query(Product.id, ProductRecommendation.related_product_ids)
+                .outerjoin(ProductRecommendation, ProductRecommendation.product_id == Product.id)
+                .filter(and_(Product.slug == slug, Product.is_active == True))
+                .first()
+            )
+            if not row:
+                return None
+            related_ids = (row.related_product_ids or [])[:limit]
+            if not related_ids:
+                return []
+            products = {
+                product.id: product
+                for product in service.db.query(Product).filter(
+                    and_(Product.id.in_(related_ids), Product.is_active == True)
+                )
+            }
+            # Keep the precomputed ranking; inactive neighbours drop out
+            return service._serialize([products[product_id] for product_id in related_ids if product_id in products])
+
+        return await self._cached_read(f"related:{slug}:{limit}", load)
+
+    @writes
     async def create_product(self, product_data: ProductCreate) -> Product:
         # Check if slug already exists
         existing_product = self.db.query(Product).filter(Product.slug == product_data.slug).first()
@@ -127,6 +270,11 @@ class ProductService:
                 color=variant_data.color,
                 sku=variant_data.sku,
                 stock_quantity=variant_data.stock_quantity,
+                low_stock_threshold=(
+                    variant_data.low_stock_threshold
+                    if variant_data.low_stock_threshold is not None
+                    else settings.LOW_STOCK_THRESHOLD
+                ),
                 price=variant_data.price,
                 image_urls=variant_data.image_urls,
             )
@@ -134,8 +282,10 @@ class ProductService:
 
         self.db.commit()
         self.db.refresh(db_product)
+        catalog_cache.invalidate()
         return db_product
 
+    @writes
     async def update_product(self, product_id: str, product_data: ProductUpdate) -> Optional[Product]:
         product = self.db.query(Product).filter(Product.id == product_id).first()
         if not product:
@@ -147,8 +297,10 @@ class ProductService:
 
         self.db.commit()
         self.db.refresh(product)
+        catalog_cache.invalidate()
         return product
 
+    @writes
     async def delete_product(self, product_id: str) -> bool:
         product = self.db.query(Product).filter(Product.id == product_id).first()
         if not product:
@@ -157,23 +309,30 @@ class ProductService:
         # Soft delete
         product.is_active = False
         self.db.commit()
+        catalog_cache.invalidate()
         return True
 
+    @reads
     async def get_categories(self) -> List[str]:
-        from sqlalchemy import func
-        result = (
-            self.db.query(Product.sport)
-            .filter(Product.is_active == True)
-            .distinct()
-            .all()
-        )
-        return [row[0] for row in result]
+        def load(service):
+            result = (
+                service.db.query(Product.sport)
+                .filter(Product.is_active == True)
+                .distinct()
+                .all()
+            )
+            return [row[0] for row in result]
+
+        return await self._cached_read("categories", load)
 
+    @reads
     async def get_teams(self, sport: Optional[str] = None) -> List[str]:
-        from sqlalchemy import func
-        query = self.db.query(Product.team).filter(Product.is_active == True)
-        if sport:
-            query = query.filter(Product.sport == sport)
+        def load(service):
+            query = service.db.query(Product.team).filter(Product.is_active == True)
+            if sport:
+                query = query.filter(Product.sport == sport)
+
+            result = query.distinct().all()
+            return [row[0] for row in result]
 
-        result = query.distinct().all()
-        return [row[0] for row in result]
\ No newline at end of file
+        return await self._cached_read(f"teams:{sport}", load)
\ No newline at end of file
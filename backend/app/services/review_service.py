@@ -0,0 +1,163 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, cast, desc, Float
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
+from typing import List, Optional, Tuple
+from app.config import settings
+from app.core.cache import catalog_cache
+from app.core.loader import load_relationship
+from app.database import reads, writes
+from app.models.product import Product
+from app.models.review import Review
+from app.schemas import ReviewCreate, ReviewUpdate
+
+
+def bayesian_rating(rating_sum, review_count):
+    """Mean rating shrunk towards the prior; works on numbers and SQL expressions"""
+    prior = settings.RATING_PRIOR_MEAN * settings.RATING_PRIOR_WEIGHT
+    return (prior + rating_sum) / (settings.RATING_PRIOR_WEIGHT + review_count)
+
+
+def _contribution(review: Review) -> Tuple[int, int]:
+    """(rating sum, count) this review adds to its product's aggregates"""
+    return (review.rating, 1) if review.is_approved else (0, 0)
+
+
+class ReviewService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _apply_delta(self, product_id, before: Tuple[int, int], after: Tuple[int, int]):
+        """Adjust the product's running totals in place.
+
+        The new values are computed by the UPDATE from the row it locks, so
+        concurrent reviews of the same product serialize on that row instead
+        of overwriting each other's totals.
+        """
+        sum_delta, count_delta = after[0] - before[0], after[1] - before[1]
+        if not (sum_delta or count_delta):
+            return
+        rating_sum = Product.rating_sum + sum_delta
+        review_count = Product.review_count + count_delta
+        self.db.query(Product).filter(Product.id == product_id).update(
+            {
+                Product.rating_sum: rating_sum,
+                Product.review_count: review_count,
+                Product.average_rating: case(
+                    (review_count > 0, cast(rating_sum, Float) / review_count), else_=0.0
+                ),
+                Product.bayesian_rating: bayesian_rating(cast(rating_sum, Float), review_count),
+                # A new review is not an edit of the product
+                Product.updated_at: Product.updated_at,
+            },
+            synchronize_session=False,
+        )
+
+    def _invalidate(self, product_id):
+        # Listings pick up the new ratings when their cache entries expire
+        slug = self.db.query(Product.slug).filter(Product.id == product_id).scalar()
+        if slug:
+            catalog_cache.delete(f"product:{slug}")
+
+    def _get_for_update(self, review_id: str) -> Optional[Review]:
+        return self.db.query(Review).filter(Review.id == review_id).with_for_update().first()
+
+    @reads
+    async def get_product_reviews(self, product_id: str, skip: int = 0, limit: int = 20) -> List[Review]:
+        reviews = (
+            self.db.query(Review)
+            .filter(and_(Review.product_id == product_id, Review.is_approved == True))
+            .order_by(desc(Review.created_at))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        await load_relationship(self.db, Review.user, reviews)
+        return reviews
+
+    @reads
+    async def get_reviews(self, skip: int = 0, limit: int = 50, is_approved: Optional[bool] = None) -> List[Review]:
+        query = self.db.query(Review)
+        if is_approved is not None:
+            query = query.filter(Review.is_approved == is_approved)
+        reviews = query.order_by(desc(Review.created_at)).offset(skip).limit(limit).all()
+        await load_relationship(self.db, Review.user, reviews)
+        return reviews
+
+    @writes
+    async def create_review(self, review_data: ReviewCreate, user_id) -> Review:
+        product = self.db.query(Product).filter(
+            and_(Product.id == review_data.product_id, Product.is_active == True)
+        ).first()
+        if not product:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Product not found"
+            )
+
+        review = Review(
+            product_id=product.id,
+            user_id=user_id,
+            rating=review_data.rating,
+            title=review_data.title,
+            body=review_data.body,
+            is_approved=not settings.REVIEWS_REQUIRE_APPROVAL,
+        )
+        self.db.add(review)
+        try:
+            self.db.flush()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="You have already reviewed this product"
+            )
+        self._apply_delta(product.id, (0, 0), _contribution(review))
+        self.db.commit()
+        self._invalidate(review.product_id)
+        self.db.refresh(review)
+        return review
+
+    @writes
+    async def update_review(self, review_id: str, review_data: ReviewUpdate, user_id) -> Optional[Review]:
+        review = self._get_for_update(review_id)
+        if not review or review.user_id != user_id:
+            return None
+
+        before = _contribution(review)
+        for field, value in review_data.dict(exclude_unset=True).items():
+            setattr(review, field, value)
+        # Edited text goes back through moderation
+        if settings.REVIEWS_REQUIRE_APPROVAL:
+            review.is_approved = False
+        self._apply_delta(review.product_id, before, _contribution(review))
+        self.db.commit()
+        self._invalidate(review.product_id)
+        self.db.refresh(review)
+        return review
+
+    @writes
+    async def delete_review(self, review_id: str, user_id, is_admin: bool = False) -> bool:
+        review = self._get_for_update(review_id)
+        if not review or (review.user_id != user_id and not is_admin):
+            return False
+
+        self._apply_delta(review.product_id, _contribution(review), (0, 0))
+        self.db.delete(review)
+        self.db.commit()
+        self._invalidate(review.product_id)
+        return True
+
+    @writes
+    async def moderate_review(self, review_id: str, is_approved: bool) -> Optional[Review]:
+        review = self._get_for_update(review_id)
+        if not review:
+            return None
+
+        before = _contribution(review)
+        review.is_approved = is_approved
+        self._apply_delta(review.product_id, before, _contribution(review))
+        self.db.commit()
+        self._invalidate(review.product_id)
+        self.db.refresh(review)
+        return review
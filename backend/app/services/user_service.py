@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from typing import List, Optional
+from app.models.order import Order
 from app.models.user import User
 from app.schemas import AddressSchema
 
@@ -16,11 +17,22 @@ class UserService:
                 detail="User not found"
             )
 
+        customer = (user.first_name, user.last_name, user.email)
+
         # Update fields
         for field, value in profile_data.items():
             if value is not None:
                 setattr(user, field, value)
 
+        # Keep the customer columns denormalized onto orders in step
+        if (user.first_name, user.last_name, user.email) != customer:
+            self.db.query(Order).filter(Order.user_id == user.id).update(
+                {
+                    "customer_name": f"{user.first_name} {user.last_name}",
+                    "customer_email": user.email.lower(),
+                },
+                synchronize_session=False,
+            )
         self.db.commit()
         self.db.refresh(user)
         return user
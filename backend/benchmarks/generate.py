@@ -0,0 +1,263 @@
+"""Synthetic catalog and order history at production scale.
+
+Rows are streamed straight into Postgres with COPY, never materialized in
+memory, and every row is derived deterministically from its index and the
+seed, so orders and their items can be generated in separate passes.
+
+    python -m benchmarks.generate                      # 100k products, 1M variants, 10M orders
+    python -m benchmarks.generate --scale 0.01         # 1% of that, for a laptop
+
+Run against an empty, migrated database (alembic upgrade head).
+"""
+import argparse
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Iterator
+from sqlalchemy import text
+from app.database import engine
+from app.jobs.order_stats import recompute_order_stats
+from app.jobs.partitions import add_months
+from app.services.review_service import bayesian_rating
+
+SPORTS = {
+    "Football": ["Chiefs", "Eagles", "Bills", "Cowboys", "49ers", "Packers", "Ravens", "Lions"],
+    "Basketball": ["Lakers", "Celtics", "Warriors", "Nuggets", "Bucks", "Knicks", "Heat", "Suns"],
+    "Baseball": ["Yankees", "Dodgers", "Braves", "Astros", "Mets", "Cubs", "Giants", "Red Sox"],
+    "Soccer": ["Arsenal", "Barcelona", "Real Madrid", "Bayern", "Inter Miami", "PSG", "Liverpool", "Juventus"],
+    "Hockey": ["Oilers", "Rangers", "Bruins", "Panthers", "Avalanche", "Stars", "Kings", "Jets"],
+}
+BRANDS = ["Nike", "Adidas", "Puma", "Fanatics", "Majestic", "New Era"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL", "XXXL", "YS", "YM", "YL"]
+COLORS = ["Home", "Away", "Alternate", "Throwback"]
+STATUSES = ["PENDING", "PROCESSING", "SHIPPED", "DELIVERED", "DELIVERED", "DELIVERED", "CANCELLED"]
+ADDRESS = (
+    '{"first_name": "Sam", "last_name": "Fan", "email": "sam@example.com", "phone": "555-0100", '
+    '"address": "1 Stadium Way", "city": "Springfield", "state": "IL", "zip_code": "62701", "country": "US"}'
+)
+TEAMS = [(sport, team) for sport, teams in SPORTS.items() for team in teams]
+
+
+def deterministic_uuid(namespace: int, index: int) -> str:
+    return str(uuid.UUID(int=(namespace << 96) | index))
+
+
+class RowStream(io.RawIOBase):
+    """File-like object that renders rows lazily for copy_expert"""
+
+    def __init__(self, rows: Iterator[str]):
+        self._rows = rows
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while len(self._buffer) < len(target):
+            chunk = "".join(row for _, row in zip(range(1000), self._rows))
+            if not chunk:
+                break
+            self._buffer += chunk.encode()
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _copy_line(*values) -> str:
+    return "\t".join("\\N" if value is None else str(value) for value in values) + "\n"
+
+
+class SyntheticCatalog:
+    def __init__(self, products: int, variants_per_product: int, users: int, orders: int, months: int, seed: int):
+        self.products = products
+        self.variants_per_product = variants_per_product
+        self.users = users
+        self.orders = orders
+        self.months = months
+        self.seed = seed
+        self.now = datetime.utcnow().replace(microsecond=0)
+
+    def product_id(self, index: int) -> str:
+        return deterministic_uuid(1, index)
+
+    def variant_id(self, index: int) -> str:
+        return deterministic_uuid(2, index)
+
+    def user_id(self, index: int) -> str:
+        return deterministic_uuid(3, index)
+
+    def product_price(self, index: int) -> Decimal:
+        return Decimal(random.Random(self.seed * 7 + index).randrange(4999, 29999)) / 100
+
+    def product_rows(self) -> Iterator[str]:
+        for index in range(self.products):
+            rng = random.Random(self.seed * 7 + index)
+            base_price = Decimal(rng.randrange(4999, 29999)) / 100
+            sale_price = (base_price * Decimal("0.8")).quantize(Decimal("0.01")) if rng.random() < 0.2 else None
+            sport, team = TEAMS[index % len(TEAMS)]
+            created_at = self.now - timedelta(seconds=rng.randrange(self.months * 30 * 86400))
+            review_count = rng.randrange(0, 500)
+            rating_sum = round(rng.uniform(2.5, 5.0) * review_count)
+            yield _copy_line(
+                self.product_id(index), f"{team} Jersey #{index}", f"{team.lower().replace(' ', '-')}-jersey-{index}",
+                f"Synthetic {sport} jersey", team, f"Player {index % 5000}", sport, BRANDS[index % len(BRANDS)],
+                base_price, sale_price, "Polyester", "Machine wash cold",
+                rating_sum, rating_sum / review_count if review_count else 0.0, review_count,
+                bayesian_rating(rating_sum, review_count), True, created_at, created_at,
+            )
+
+    def variant_rows(self) -> Iterator[str]:
+        for product in range(self.products):
+            price = self.product_price(product)
+            for offset in range(self.variants_per_product):
+                index = product * self.variants_per_product + offset
+                rng = random.Random(self.seed * 11 + index)
+                yield _copy_line(
+                    self.variant_id(index), self.product_id(product), SIZES[offset % len(SIZES)],
+                    COLORS[(offset // len(SIZES)) % len(COLORS)], f"SYN-{index:09d}",
+                    rng.randrange(0, 200), price, "[]",
+                )
+
+    def user_rows(self) -> Iterator[str]:
+        # Placeholder hash: synthetic users exist for query volume, not for logging in
+        password_hash = "$2b$12$KIXQJ5m7Y5t0HkD0o6Hq3eJ8b7mM3x8bQnYV7t0c1QdQ2eE2Gm9aW"
+        for index in range(self.users):
+            created_at = self.now - timedelta(minutes=index % (self.months * 30 * 1440))
+            yield _copy_line(
+                self.user_id(index), f"user{index}@example.com", password_hash, f"First{index}", f"Last{index}",
+                f"555{index:07d}", True, False, True, created_at, created_at,
+            )
+
+    def _order(self, index: int):
+        rng = random.Random(self.seed * 13 + index)
+        created_at = self.now - timedelta(seconds=rng.randrange(self.months * 30 * 86400))
+        lines = []
+        for line in range(rng.choice((1, 1, 1, 2, 2, 3))):
+            variant = rng.randrange(self.products * self.variants_per_product)
+            quantity = rng.randrange(1, 3)
+            lines.append((line, variant, quantity, self.product_price(variant // self.variants_per_product)))
+        return rng, created_at, lines
+
+    def order_rows(self) -> Iterator[str]:
+        for index in range(self.orders):
+            rng, created_at, lines = self._order(index)
+            subtotal = sum(price * quantity for _, _, quantity, price in lines)
+            user = rng.randrange(self.users)
+            tax = (subtotal * Decimal("0.08")).quantize(Decimal("0.01"))
+            shipping = Decimal("0") if subtotal >= 100 else Decimal("9.99")
+            yield _copy_line(
+                deterministic_uuid(4, index), self.user_id(user),
+                f"SYN-{index:016d}", rng.choice(STATUSES), subtotal, tax, shipping, subtotal + tax + shipping,
+                ADDRESS, None, "card", "paid", None, None,
+                sum(quantity for _, _, quantity, _ in lines), f"First{user} Last{user}", f"user{user}@example.com",
+                created_at, created_at,
+            )
+
+    def order_item_rows(self) -> Iterator[str]:
+        for index in range(self.orders):
+            _, created_at, lines = self._order(index)
+            for line, variant, quantity, price in lines:
+                product = variant // self.variants_per_product
+                yield _copy_line(
+                    deterministic_uuid(5, index * 8 + line), deterministic_uuid(4, index), created_at,
+                    self.product_id(product), self.variant_id(variant), f"Jersey #{product}", None,
+                    SIZES[(variant % self.variants_per_product) % len(SIZES)], None, quantity, price, price * quantity,
+                )
+
+
+COPY_TARGETS = [
+    (
+        "products",
+        "id, name, slug, description, team, player, sport, brand, base_price, sale_price, material, "
+        "care_instructions, rating_sum, average_rating, review_count, bayesian_rating, is_active, created_at, updated_at",
+        SyntheticCatalog.product_rows,
+    ),
+    (
+        "product_variants",
+        "id, product_id, size, color, sku, stock_quantity, price, image_urls",
+        SyntheticCatalog.variant_rows,
+    ),
+    (
+        "users",
+        "id, email, password_hash, first_name, last_name, phone, is_active, is_admin, email_verified, "
+        "created_at, updated_at",
+        SyntheticCatalog.user_rows,
+    ),
+    (
+        "orders",
+        "id, user_id, order_number, status, subtotal, tax_amount, shipping_amount, total_amount, "
+        "shipping_address, billing_address, payment_method, payment_status, tracking_number, notes, "
+        "item_count, customer_name, customer_email, created_at, updated_at",
+        SyntheticCatalog.order_rows,
+    ),
+    (
+        "order_items",
+        "id, order_id, order_created_at, product_id, product_variant_id, product_name, product_image, size, "
+        "color, quantity, unit_price, total_price",
+        SyntheticCatalog.order_item_rows,
+    ),
+]
+
+
+def copy_rows(table: str, columns: str, rows: Callable[[], Iterator[str]]):
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", RowStream(rows()), size=1 << 20)
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def ensure_partitions(months: int):
+    current_month = datetime.utcnow().date().replace(day=1)
+    with engine.begin() as connection:
+        for offset in range(-months - 1, 2):
+            for parent in ("orders", "order_items"):
+                connection.execute(
+                    text("SELECT ensure_monthly_partition(:parent, :month)"),
+                    {"parent": parent, "month": add_months(current_month, offset)},
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a synthetic catalog and order history")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier applied to all row counts")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--variants-per-product", type=int, default=10)
+    parser.add_argument("--users", type=int, default=500_000)
+    parser.add_argument("--orders", type=int, default=10_000_000)
+    parser.add_argument("--months", type=int, default=24, help="spread orders over this many months")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = SyntheticCatalog(
+        products=max(1, int(args.products * args.scale)),
+        variants_per_product=args.variants_per_product,
+        users=max(1, int(args.users * args.scale)),
+        orders=int(args.orders * args.scale),
+        months=args.months,
+        seed=args.seed,
+    )
+    ensure_partitions(args.months)
+
+    for table, columns, rows in COPY_TARGETS:
+        start = time.perf_counter()
+        copy_rows(table, columns, lambda: rows(catalog))
+        print(f"Loaded {table} in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    recompute_order_stats()
+    print(f"Computed user_order_stats in {time.perf_counter() - start:.1f}s")
+
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+    print("Analyzed all tables")
+
+
+if __name__ == "__main__":
+    main()
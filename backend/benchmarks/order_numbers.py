@@ -0,0 +1,64 @@
+"""Order number generation throughput, per worker.
+
+    python -m benchmarks.order_numbers --count 200000
+    python -m benchmarks.order_numbers --threads 4
+    python -m benchmarks.order_numbers --offline     # no database: in-memory blocks of 1000
+
+Reports IDs per second and how many sequence round trips were needed.
+"""
+import argparse
+import itertools
+import threading
+import time
+from app.core.order_numbers import OrderNumberGenerator, SequenceBlockAllocator
+from app.database import engine
+
+
+class OfflineAllocator(SequenceBlockAllocator):
+    """Block allocator with an in-process counter standing in for the sequence"""
+
+    def __init__(self, block_size: int = 1000):
+        super().__init__(engine)
+        self._blocks = itertools.count(1, block_size)
+        self._block_size = block_size
+
+    def _fetch_block(self):
+        start = next(self._blocks)
+        self._next, self._end = start, start + self._block_size
+        self.blocks_fetched += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure order number generation throughput")
+    parser.add_argument("--count", type=int, default=100_000, help="numbers per thread")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--offline", action="store_true", help="do not touch the database")
+    args = parser.parse_args()
+
+    allocator = OfflineAllocator() if args.offline else SequenceBlockAllocator(engine)
+    generator = OrderNumberGenerator(allocator)
+    generator.next()  # first block fetch and connection setup are not part of the steady state
+
+    seen = [set() for _ in range(args.threads)]
+
+    def work(index: int):
+        numbers = seen[index]
+        for _ in range(args.count):
+            numbers.add(generator.next())
+
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = args.count * args.threads
+    unique = len(set().union(*seen))
+    print(f"{total} numbers in {elapsed:.3f}s: {total / elapsed:,.0f}/s ({args.threads} thread(s))")
+    print(f"{allocator.blocks_fetched} sequence round trips, {total - unique} duplicates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Scripted load scenarios against the ASGI app, in-process.
+
+Requests go through httpx's ASGI transport, so the full middleware, routing
+and serialization stack is measured without a network hop. Queries per
+request are read from the Server-Timing header, which is enabled here.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --scenario browse --requests 2000 --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("DEBUG", "true")
+
+import httpx
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine
+
+_QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank percentile
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Fixtures:
+    """Identifiers sampled from the database so scenarios hit real rows"""
+
+    def __init__(self, sample_size: int = 1000):
+        with engine.connect() as connection:
+            self.variants = [
+                (str(row.product_id), str(row.id)) for row in connection.execute(
+                    text("SELECT id, product_id FROM product_variants WHERE stock_quantity > 10 LIMIT :limit"),
+                    {"limit": sample_size},
+                )
+            ]
+            self.teams = [row[0] for row in connection.execute(text("SELECT DISTINCT team FROM products LIMIT 50"))]
+            self.sports = [row[0] for row in connection.execute(text("SELECT DISTINCT sport FROM products LIMIT 20"))]
+
+
+def browse(fixtures: Fixtures, rng: random.Random) -> httpx.Request:
+    params = {
+        "skip": rng.randrange(0, 200),
+        "limit": 20,
+        "sort_by": rng.choice(["created_at", "price_asc", "price_desc", "rating", "trending"]),
+    }
+    if fixtures.sports and rng.random() < 0.5:
+        params["sport"] = rng.choice(fixtures.sports)
+    return httpx.Request("GET", "/api/products/", params=params)
+
+
+def search(fixtures: Fixtures, rng: random.Random) -> httpx.Request:
+    term = rng.choice(fixtures.teams) if fixtures.teams else "jersey"
+    return httpx.Request("GET", "/api/products/search", params={"q": term, "limit": 20})
+
+
+def checkout(fixtures: Fixtures, rng: random.Random) -> httpx.Request:
+    items = [
+        {"product_id": product_id, "product_variant_id": variant_id, "quantity": 1}
+        for product_id, variant_id in rng.sample(fixtures.variants, k=min(len(fixtures.variants), rng.randrange(1, 4)))
+    ]
+    address = {
+        "first_name": "Bench", "last_name": "Mark", "email": "bench@example.com", "phone": "555-0100",
+        "address": "1 Stadium Way", "city": "Springfield", "state": "IL", "zip_code": "62701", "country": "US",
+    }
+    return httpx.Request(
+        "POST", "/api/orders/",
+        json={"items": items, "shipping_address": address, "payment_method": "card"},
+    )
+
+
+def admin_analytics(fixtures: Fixtures, rng: random.Random) -> httpx.Request:
+    return httpx.Request("GET", "/api/admin/analytics", params={"days": rng.choice([7, 30, 90])})
+
+
+def admin_orders(fixtures: Fixtures, rng: random.Random) -> httpx.Request:
+    params = {"skip": rng.randrange(0, 200), "limit": 50}
+    if rng.random() < 0.5:
+        params["status"] = rng.choice(["pending", "processing", "shipped", "delivered"])
+    return httpx.Request("GET", "/api/admin/orders", params=params)
+
+
+SCENARIOS: Dict[str, Callable[[Fixtures, random.Random], httpx.Request]] = {
+    "browse": browse,
+    "search": search,
+    "checkout": checkout,
+    "admin_analytics": admin_analytics,
+    "admin_orders": admin_orders,
+}
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, fixtures: Fixtures, requests: int, concurrency: int, seed: int) -> dict:
+    build = SCENARIOS[name]
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    query_counts: List[int] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            request = build(fixtures, rng)
+            start = time.perf_counter()
+            response = await client.send(request)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+            match = _QUERY_COUNT.search(response.headers.get("server-timing", ""))
+            if match:
+                query_counts.append(int(match.group(1)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+        },
+        "queries_per_request": {
+            "mean": round(sum(query_counts) / len(query_counts), 2) if query_counts else None,
+            "max": max(query_counts) if query_counts else None,
+        },
+    }
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _delta(now, before) -> str:
+    if not before or now is None:
+        return "n/a"
+    return f"{(now - before) / before:+.1%}"
+
+
+def compare(results: dict, baseline: dict):
+    """Print p95 latency, throughput and query count changes against a previous run"""
+    print(f"\nChange vs {baseline.get('commit') or 'baseline'}:")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        print(
+            f"  {name:16} p95 {_delta(current['latency_ms']['p95'], previous['latency_ms']['p95']):>8}"
+            f"  rps {_delta(current['throughput_rps'], previous['throughput_rps']):>8}"
+            f"  queries {_delta(current['queries_per_request']['mean'], previous['queries_per_request']['mean']):>8}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run load scenarios against the app in-process")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="defaults to all")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true", help="bypass the catalog cache")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        settings.CACHE_ENABLED = False
+
+    from app.main import app
+
+    fixtures = Fixtures()
+    results = {
+        "commit": current_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "cache": not args.no_cache},
+        "scenarios": {},
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name in args.scenario or list(SCENARIOS):
+            results["scenarios"][name] = await run_scenario(
+                client, name, fixtures, args.requests, args.concurrency, args.seed
+            )
+            summary = results["scenarios"][name]
+            print(
+                f"{name:16} {summary['throughput_rps']:>9.1f} rps  p50 {summary['latency_ms']['p50']:>8.2f} ms  "
+                f"p95 {summary['latency_ms']['p95']:>8.2f} ms  p99 {summary['latency_ms']['p99']:>8.2f} ms  "
+                f"errors {summary['errors']}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(results, json.load(handle))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Where a worker's startup time goes.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --top 30 --no-lifespan
+
+Imports app.main in a fresh interpreter under ``python -X importtime`` and
+reports import time per top-level package and the slowest app modules, then
+(unless --no-lifespan) times the app's startup hooks: mapper configuration,
+connection pool warm-up and the CACHE_WARMUP reads.
+"""
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+_STARTUP = """
+import asyncio, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+asyncio.run(app.main.app.router.startup())
+finished = time.perf_counter()
+print(f"{(imported - started) * 1000:.0f} {(finished - imported) * 1000:.0f}")
+"""
+
+
+def import_times(module: str) -> List[Tuple[int, int, int, str]]:
+    """(self us, cumulative us, depth, module) for every module imported"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import and startup time of the app")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    parser.add_argument("--no-lifespan", action="store_true", help="only report imports")
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    by_package: Dict[str, int] = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+
+    print(f"import {args.module}: {total / 1000:.0f} ms, {len(rows)} modules\n")
+    print("Top-level packages (own import time of all their modules):")
+    for package, micros in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {micros / 1000:>8.1f} ms  {micros / total:>6.1%}  {package}")
+
+    print("\nApp modules (including everything they import first):")
+    app_rows = sorted((row for row in rows if row[3].startswith("app.")), key=lambda row: -row[1])
+    for self_us, cumulative_us, _, name in app_rows[:args.top]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  (self {self_us / 1000:>6.1f} ms)  {name}")
+
+    if args.no_lifespan:
+        return
+    result = subprocess.run([sys.executable, "-c", _STARTUP], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"\nStartup hooks failed:\n{result.stderr}")
+        return
+    imported_ms, startup_ms = result.stdout.split()[-2:]
+    print(f"\nWall clock: import {imported_ms} ms, startup hooks {startup_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
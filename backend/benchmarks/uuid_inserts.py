@@ -0,0 +1,133 @@
+"""Insert throughput of random (v4) vs time-ordered (v7) UUID primary keys.
+
+Loads the same order_items-shaped rows into two scratch tables that differ
+only in how ids are generated, batch by batch, and reports throughput as
+each table grows together with the size and cache behaviour of its primary
+key index. Random keys slow down once the index outgrows shared_buffers;
+time-ordered keys keep appending to the right edge.
+
+    python -m benchmarks.uuid_inserts                       # 10M rows per table
+    python -m benchmarks.uuid_inserts --rows 1000000 --batch-size 50000
+"""
+import argparse
+import random
+import time
+import uuid
+from typing import Callable, Iterator
+from sqlalchemy import text
+from app.core.ids import uuid7
+from app.database import engine
+from benchmarks.generate import RowStream, _copy_line
+
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+def table_name(kind: str) -> str:
+    return f"bench_order_items_{kind}"
+
+
+def create_table(kind: str):
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table_name(kind)}"))
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE {table_name(kind)} (
+                    id uuid PRIMARY KEY,
+                    order_id uuid NOT NULL,
+                    product_variant_id uuid NOT NULL,
+                    quantity integer NOT NULL,
+                    unit_price numeric(10, 2) NOT NULL,
+                    total_price numeric(10, 2) NOT NULL
+                )
+                """
+            )
+        )
+
+
+def batch_rows(new_id: Callable[[], uuid.UUID], count: int, rng: random.Random) -> Iterator[str]:
+    for _ in range(count):
+        quantity = rng.randrange(1, 4)
+        price = rng.randrange(4999, 29999) / 100
+        yield _copy_line(new_id(), uuid.uuid4(), uuid.uuid4(), quantity, price, round(price * quantity, 2))
+
+
+def copy_batch(kind: str, rows: Iterator[str]):
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table_name(kind)} (id, order_id, product_variant_id, quantity, unit_price, total_price) "
+                f"FROM STDIN",
+                RowStream(rows),
+                size=1 << 20,
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def index_stats(kind: str) -> dict:
+    with engine.connect() as connection:
+        row = connection.execute(
+            text(
+                """
+                SELECT pg_relation_size(indexrelid) AS size, idx_blks_hit AS hit, idx_blks_read AS read
+                FROM pg_statio_user_indexes WHERE relname = :table
+                """
+            ),
+            {"table": table_name(kind)},
+        ).one()
+    total = row.hit + row.read
+    return {"size_mb": row.size / (1 << 20), "hit_ratio": row.hit / total if total else 1.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare v4 and v7 UUID primary key inserts")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="rows per table")
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--report-every", type=int, default=1_000_000, help="rows between progress lines")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch tables")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for kind in GENERATORS:
+        create_table(kind)
+
+    totals = {kind: 0.0 for kind in GENERATORS}
+    window = {kind: 0.0 for kind in GENERATORS}
+    loaded = window_rows = 0
+    print(f"{'rows':>12}  {'v4 rows/s':>12}  {'v7 rows/s':>12}  {'v4 pk MB':>9}  {'v7 pk MB':>9}  {'v4 hit':>7}  {'v7 hit':>7}")
+    while loaded < args.rows:
+        count = min(args.batch_size, args.rows - loaded)
+        # Alternate batches so both tables see the same server conditions
+        for kind, new_id in GENERATORS.items():
+            rng = random.Random(args.seed + loaded)
+            start = time.perf_counter()
+            copy_batch(kind, batch_rows(new_id, count, rng))
+            elapsed = time.perf_counter() - start
+            totals[kind] += elapsed
+            window[kind] += elapsed
+        loaded += count
+        window_rows += count
+
+        if window_rows >= args.report_every or loaded == args.rows:
+            stats = {kind: index_stats(kind) for kind in GENERATORS}
+            print(
+                f"{loaded:>12,}  {window_rows / window['v4']:>12,.0f}  {window_rows / window['v7']:>12,.0f}  "
+                f"{stats['v4']['size_mb']:>9.1f}  {stats['v7']['size_mb']:>9.1f}  "
+                f"{stats['v4']['hit_ratio']:>7.1%}  {stats['v7']['hit_ratio']:>7.1%}"
+            )
+            window = {kind: 0.0 for kind in GENERATORS}
+            window_rows = 0
+
+    for kind in GENERATORS:
+        print(f"{kind}: {args.rows / totals[kind]:,.0f} rows/s overall")
+    if not args.keep:
+        with engine.begin() as connection:
+            for kind in GENERATORS:
+                connection.execute(text(f"DROP TABLE {table_name(kind)}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Throughput of the production server with one worker against several.
+
+Unlike benchmarks.run, requests go over sockets to gunicorn started from
+gunicorn.conf.py, so worker processes, preloading and connection pools are
+all part of the measurement. Load comes from --clients separate processes
+so a single client event loop does not become the bottleneck; on a shared
+machine they compete with the server for CPU, so keep them few.
+
+    python -m benchmarks.workers
+    python -m benchmarks.workers --workers 1 2 4 8 --concurrency 128 --duration 30
+    python -m benchmarks.workers --path /api/products/featured --path "/api/products/?sort_by=rating"
+
+--workers 0 stands for the gunicorn.conf.py default (WEB_CONCURRENCY, else
+2 x CPUs + 1). Worker recycling is disabled during the run.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import runpy
+import signal
+import socket
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+import httpx
+from benchmarks.run import percentile
+
+DEFAULT_PATHS = ["/api/products/?limit=20", "/api/products/featured"]
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            "gunicorn", "-c", "gunicorn.conf.py", "app.main:app",
+            "--workers", str(workers),
+            "--bind", f"127.0.0.1:{port}",
+            "--max-requests", "0",
+            "--access-logfile", os.devnull,
+        ],
+        cwd=BACKEND_DIR,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            # Every worker warms up before accepting, so one answer means the arbiter is serving
+            if httpx.get(f"http://127.0.0.1:{port}/health/live", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("gunicorn did not start within 60s")
+
+
+def stop_server(process: subprocess.Popen):
+    # The same graceful drain a deployment gets
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def _drive(base_url: str, paths: List[str], concurrency: int, duration: float) -> Tuple[List[float], int]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def worker(offset: int):
+            nonlocal errors
+            for path in itertools.islice(itertools.cycle(paths), offset, None):
+                if time.perf_counter() >= deadline:
+                    return
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += failed
+
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies, errors
+
+
+def _client(base_url: str, paths: List[str], concurrency: int, duration: float) -> Tuple[List[float], int]:
+    return asyncio.run(_drive(base_url, paths, concurrency, duration))
+
+
+def measure(base_url: str, paths: List[str], concurrency: int, clients: int, duration: float) -> dict:
+    per_client = max(1, concurrency // clients)
+    with ProcessPoolExecutor(clients) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(
+            _client, [base_url] * clients, [paths] * clients, [per_client] * clients, [duration] * clients
+        ))
+        elapsed = time.perf_counter() - start
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare server throughput across worker counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 0], help="worker counts to run (0: config default)")
+    parser.add_argument("--path", action="append", help=f"paths to request in turn (default: {' '.join(DEFAULT_PATHS)})")
+    parser.add_argument("--concurrency", type=int, default=64, help="open connections in total")
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds measured per worker count")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of unmeasured load first")
+    args = parser.parse_args()
+
+    default_workers = runpy.run_path(os.path.join(BACKEND_DIR, "gunicorn.conf.py"))["workers"]
+    paths = args.path or DEFAULT_PATHS
+    baseline = None
+    for workers in args.workers:
+        workers = workers or default_workers
+        port = _free_port()
+        process = start_server(workers, port)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            measure(base_url, paths, args.concurrency, args.clients, args.warmup)
+            summary = measure(base_url, paths, args.concurrency, args.clients, args.duration)
+        finally:
+            stop_server(process)
+
+        baseline = baseline or summary["throughput_rps"]
+        speedup = summary["throughput_rps"] / baseline if baseline else 0.0
+        print(
+            f"{workers:>3} worker(s) {summary['throughput_rps']:>9.1f} rps  x{speedup:<5.2f} "
+            f"p50 {summary['p50']:>8.2f} ms  p99 {summary['p99']:>8.2f} ms  "
+            f"errors {summary['errors']}/{summary['requests']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Production server: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master (preload_app) and forked, so workers
+start fast and share the imported code's memory. Anything a worker opens -
+DB connections, the Redis client, the image process pool - is opened after
+the fork by the app's startup hook, never inherited from the master.
+
+SIGTERM (or SIGQUIT) stops the master accepting connections and gives
+in-flight requests GRACEFUL_TIMEOUT_SECONDS to finish before workers are
+killed; keep the orchestrator's termination grace period longer than that.
+"""
+import os
+from app.config import settings
+
+
+def _cpus() -> int:
+    try:
+        # CPUs this process may run on, which honours container cpusets
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Request handlers block their event loop on synchronous DB calls, so run more
+# workers than cores to keep the CPUs busy while some wait on Postgres
+workers = settings.WEB_CONCURRENCY or _cpus() * 2 + 1
+preload_app = True
+
+# Restart each worker after a bounded number of requests to cap slow memory growth
+max_requests = settings.WORKER_MAX_REQUESTS
+max_requests_jitter = settings.WORKER_MAX_REQUESTS_JITTER
+timeout = settings.WORKER_TIMEOUT_SECONDS
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+keepalive = settings.KEEPALIVE_SECONDS
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded import, so workers fork with
+    # mappers already configured and share that memory
+    from app.core.lifecycle import prepare_app
+    prepare_app()
+
+
+def post_fork(server, worker):
+    # Each worker builds its own pools. Any connection the master opened while
+    # importing the app is dropped here without being closed, since closing it
+    # would also close the master's socket. redis-py resets its pool by pid itself.
+    from app.database import dispose_engines
+    dispose_engines(close=False)
@@ -1,16 +1,5 @@
--- Initialize database extensions
+-- Initialize database extensions.
+-- Tables and indexes are owned by the Alembic migrations (alembic upgrade head);
+-- this script runs before any table exists, so it must not create indexes.
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
-
--- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_products_sport ON products(sport);
-CREATE INDEX IF NOT EXISTS idx_products_team ON products(team);
-CREATE INDEX IF NOT EXISTS idx_products_name ON products(name);
-CREATE INDEX IF NOT EXISTS idx_products_slug ON products(slug);
-CREATE INDEX IF NOT EXISTS idx_product_variants_sku ON product_variants(sku);
-CREATE INDEX IF NOT EXISTS idx_product_variants_product_id ON product_variants(product_id);
-CREATE INDEX IF NOT EXISTS idx_orders_user_id ON orders(user_id);
-CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
-CREATE INDEX IF NOT EXISTS idx_orders_order_number ON orders(order_number);
-CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-CREATE INDEX IF NOT EXISTS idx_order_items_order_id ON order_items(order_id);
-CREATE INDEX IF NOT EXISTS idx_order_items_product_id ON order_items(product_id);
\ No newline at end of file
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
@@ -0,0 +1,159 @@
+"""initial schema
+
+Mirrors the tables previously created by Base.metadata.create_all. Databases
+that were created that way should be stamped rather than upgraded:
+
+    alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("first_name", sa.String(50), nullable=False),
+        sa.Column("last_name", sa.String(50), nullable=False),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_admin", sa.Boolean()),
+        sa.Column("email_verified", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "products",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("slug", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("team", sa.String(100), nullable=False),
+        sa.Column("player", sa.String(100)),
+        sa.Column("sport", sa.String(50), nullable=False),
+        sa.Column("brand", sa.String(50)),
+        sa.Column("base_price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("sale_price", sa.Numeric(10, 2)),
+        sa.Column("material", sa.String(100)),
+        sa.Column("care_instructions", sa.Text()),
+        sa.Column("average_rating", sa.Float()),
+        sa.Column("review_count", sa.Integer()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_products_name", "products", ["name"])
+    op.create_index("ix_products_slug", "products", ["slug"], unique=True)
+    op.create_index("ix_products_team", "products", ["team"])
+    op.create_index("ix_products_sport", "products", ["sport"])
+
+    op.create_table(
+        "product_variants",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("size", sa.String(10), nullable=False),
+        sa.Column("color", sa.String(50)),
+        sa.Column("sku", sa.String(50), nullable=False),
+        sa.Column("stock_quantity", sa.Integer()),
+        sa.Column("price", sa.Numeric(10, 2)),
+        sa.Column("image_urls", sa.JSON()),
+    )
+    op.create_index("ix_product_variants_sku", "product_variants", ["sku"], unique=True)
+
+    op.create_table(
+        "orders",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("order_number", sa.String(20), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "PROCESSING", "SHIPPED", "DELIVERED", "CANCELLED", name="orderstatus"),
+        ),
+        sa.Column("subtotal", sa.Numeric(10, 2), nullable=False),
+        sa.Column("tax_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("shipping_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("total_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("shipping_address", sa.JSON(), nullable=False),
+        sa.Column("billing_address", sa.JSON()),
+        sa.Column("payment_method", sa.String(50)),
+        sa.Column("payment_status", sa.String(20)),
+        sa.Column("tracking_number", sa.String(100)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_orders_order_number", "orders", ["order_number"], unique=True)
+
+    op.create_table(
+        "order_items",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("order_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("orders.id"), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column(
+            "product_variant_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("product_variants.id"),
+            nullable=False,
+        ),
+        sa.Column("product_name", sa.String(200), nullable=False),
+        sa.Column("product_image", sa.String(500)),
+        sa.Column("size", sa.String(10), nullable=False),
+        sa.Column("color", sa.String(50)),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("unit_price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("total_price", sa.Numeric(10, 2), nullable=False),
+    )
+
+    op.create_table(
+        "carts",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "cart_items",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("cart_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("carts.id"), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column(
+            "product_variant_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("product_variants.id"),
+            nullable=False,
+        ),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("added_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cart_items")
+    op.drop_table("carts")
+    op.drop_table("order_items")
+    op.drop_table("orders")
+    op.drop_table("product_variants")
+    op.drop_table("products")
+    op.drop_table("users")
+    sa.Enum(name="orderstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,197 @@
+"""partition orders and order_items by month
+
+Rebuilds orders and order_items as tables range-partitioned on created_at,
+one partition per calendar month plus a default partition. order_items gets
+an order_created_at column so its partitions line up with the orders
+partitions, and old months can be detached together (app.jobs.partitions).
+
+Postgres requires unique constraints on a partitioned table to include the
+partition key, so the primary keys become (id, created_at) and order_number
+is indexed but no longer unique at the database level.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ORDER_COLUMNS = (
+    "id, user_id, order_number, status, subtotal, tax_amount, shipping_amount, total_amount, "
+    "shipping_address, billing_address, payment_method, payment_status, tracking_number, notes, "
+    "created_at, updated_at"
+)
+ORDER_ITEM_COLUMNS = (
+    "id, order_id, product_id, product_variant_id, product_name, product_image, size, color, "
+    "quantity, unit_price, total_price"
+)
+
+ENSURE_MONTHLY_PARTITION = """
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent text, month_start date)
+RETURNS text AS $$
+DECLARE
+    partition_name text := parent || '_' || to_char(month_start, 'YYYY_MM');
+    month_end date := (date_trunc('month', month_start) + interval '1 month')::date;
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name, parent, date_trunc('month', month_start)::date, month_end
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _order_columns():
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("order_number", sa.String(20), nullable=False),
+        sa.Column("status", postgresql.ENUM(name="orderstatus", create_type=False)),
+        sa.Column("subtotal", sa.Numeric(10, 2), nullable=False),
+        sa.Column("tax_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("shipping_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("total_amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("shipping_address", sa.JSON(), nullable=False),
+        sa.Column("billing_address", sa.JSON()),
+        sa.Column("payment_method", sa.String(50)),
+        sa.Column("payment_status", sa.String(20)),
+        sa.Column("tracking_number", sa.String(100)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    ]
+
+
+def _order_item_columns():
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("order_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column(
+            "product_variant_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("product_variants.id"),
+            nullable=False,
+        ),
+        sa.Column("product_name", sa.String(200), nullable=False),
+        sa.Column("product_image", sa.String(500)),
+        sa.Column("size", sa.String(10), nullable=False),
+        sa.Column("color", sa.String(50)),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("unit_price", sa.Numeric(10, 2), nullable=False),
+        sa.Column("total_price", sa.Numeric(10, 2), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    op.execute(ENSURE_MONTHLY_PARTITION)
+
+    # Move the existing tables out of the way, freeing their index names
+    op.rename_table("order_items", "order_items_legacy")
+    op.execute("ALTER TABLE order_items_legacy RENAME CONSTRAINT order_items_pkey TO order_items_legacy_pkey")
+    op.rename_table("orders", "orders_legacy")
+    op.execute("ALTER TABLE orders_legacy RENAME CONSTRAINT orders_pkey TO orders_legacy_pkey")
+    op.execute("ALTER INDEX ix_orders_order_number RENAME TO ix_orders_legacy_order_number")
+
+    op.create_table(
+        "orders",
+        *_order_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at", name="orders_pkey"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_table(
+        "order_items",
+        *_order_item_columns(),
+        sa.Column("order_created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", "order_created_at", name="order_items_pkey"),
+        sa.ForeignKeyConstraint(
+            ["order_id", "order_created_at"],
+            ["orders.id", "orders.created_at"],
+            name="order_items_order_fkey",
+        ),
+        postgresql_partition_by="RANGE (order_created_at)",
+    )
+
+    op.execute("CREATE TABLE orders_default PARTITION OF orders DEFAULT")
+    op.execute("CREATE TABLE order_items_default PARTITION OF order_items DEFAULT")
+
+    # One partition per month from the oldest order through three months ahead
+    for parent in ("orders", "order_items"):
+        op.execute(
+            f"""
+            SELECT ensure_monthly_partition('{parent}', month::date)
+            FROM generate_series(
+                date_trunc('month', COALESCE((SELECT min(created_at) FROM orders_legacy), now())),
+                date_trunc('month', now()) + interval '3 months',
+                interval '1 month'
+            ) AS month
+            """
+        )
+
+    op.execute(
+        f"""
+        INSERT INTO orders ({ORDER_COLUMNS})
+        SELECT {ORDER_COLUMNS.replace("created_at, updated_at", "COALESCE(created_at, now()), updated_at")}
+        FROM orders_legacy
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO order_items ({ORDER_ITEM_COLUMNS}, order_created_at)
+        SELECT {", ".join("i." + c.strip() for c in ORDER_ITEM_COLUMNS.split(","))}, o.created_at
+        FROM order_items_legacy i
+        JOIN orders o ON o.id = i.order_id
+        """
+    )
+
+    op.drop_table("order_items_legacy")
+    op.drop_table("orders_legacy")
+
+    # Indexes on the parent are created on every partition, present and future
+    op.create_index("ix_orders_order_number", "orders", ["order_number"])
+    op.create_index("ix_orders_created_at", "orders", ["created_at"])
+    op.create_index("ix_orders_user_id_created_at", "orders", ["user_id", "created_at"])
+    op.create_index("ix_orders_status_created_at", "orders", ["status", "created_at"])
+    op.create_index("ix_order_items_order_id", "order_items", ["order_id"])
+    op.create_index("ix_order_items_product_id_order_created_at", "order_items", ["product_id", "order_created_at"])
+
+
+def downgrade() -> None:
+    op.rename_table("order_items", "order_items_partitioned")
+    op.execute("ALTER TABLE order_items_partitioned RENAME CONSTRAINT order_items_pkey TO order_items_partitioned_pkey")
+    op.rename_table("orders", "orders_partitioned")
+    op.execute("ALTER TABLE orders_partitioned RENAME CONSTRAINT orders_pkey TO orders_partitioned_pkey")
+    op.execute("ALTER INDEX ix_orders_order_number RENAME TO ix_orders_partitioned_order_number")
+
+    op.create_table("orders", *_order_columns(), sa.PrimaryKeyConstraint("id", name="orders_pkey"))
+    op.create_index("ix_orders_order_number", "orders", ["order_number"], unique=True)
+    op.create_table(
+        "order_items",
+        *_order_item_columns(),
+        sa.PrimaryKeyConstraint("id", name="order_items_pkey"),
+        sa.ForeignKeyConstraint(["order_id"], ["orders.id"]),
+    )
+
+    op.execute(f"INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_partitioned")
+    op.execute(
+        f"INSERT INTO order_items ({ORDER_ITEM_COLUMNS}) SELECT {ORDER_ITEM_COLUMNS} FROM order_items_partitioned"
+    )
+
+    op.execute("DROP TABLE order_items_partitioned CASCADE")
+    op.execute("DROP TABLE orders_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_monthly_partition(text, date)")
@@ -0,0 +1,72 @@
+"""indexes for catalog, order and cart query shapes
+
+Partial indexes cover the is_active listings in ProductService (newest,
+price, rating, categories/teams); trigram GIN indexes serve the ILIKE
+'%term%' filters used by listing and search. Foreign keys that are looked up
+by the ORM (variants by product, cart and order items by product/variant)
+get plain indexes. Each index is checked by tests/test_query_plans.py.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text("is_active")
+TRIGRAM_COLUMNS = ("name", "team", "player", "sport", "brand")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Product listing: ProductService.get_products / get_featured_products / get_new_arrivals.
+    # B-tree indexes are scanned backwards for the DESC sorts.
+    op.create_index("ix_products_active_created_at", "products", ["created_at"], postgresql_where=ACTIVE)
+    op.create_index("ix_products_active_base_price", "products", ["base_price"], postgresql_where=ACTIVE)
+    op.create_index("ix_products_active_average_rating", "products", ["average_rating"], postgresql_where=ACTIVE)
+    # get_categories / get_teams: index-only scans over active products
+    op.create_index("ix_products_active_sport_team", "products", ["sport", "team"], postgresql_where=ACTIVE)
+
+    # ILIKE '%term%' filters in get_products and search_products
+    for column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_products_{column}_trgm",
+            "products",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+            postgresql_where=ACTIVE,
+        )
+
+    op.create_index("ix_product_variants_product_id", "product_variants", ["product_id"])
+    op.create_index("ix_order_items_product_variant_id", "order_items", ["product_variant_id"])
+    op.create_index("ix_carts_user_id", "carts", ["user_id"])
+    op.create_index("ix_cart_items_cart_id", "cart_items", ["cart_id"])
+    op.create_index("ix_cart_items_product_id", "cart_items", ["product_id"])
+    op.create_index("ix_cart_items_product_variant_id", "cart_items", ["product_variant_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cart_items_product_variant_id", table_name="cart_items")
+    op.drop_index("ix_cart_items_product_id", table_name="cart_items")
+    op.drop_index("ix_cart_items_cart_id", table_name="cart_items")
+    op.drop_index("ix_carts_user_id", table_name="carts")
+    op.drop_index("ix_order_items_product_variant_id", table_name="order_items")
+    op.drop_index("ix_product_variants_product_id", table_name="product_variants")
+    for column in TRIGRAM_COLUMNS:
+        op.drop_index(f"ix_products_{column}_trgm", table_name="products")
+    op.drop_index("ix_products_active_sport_team", table_name="products")
+    op.drop_index("ix_products_active_average_rating", table_name="products")
+    op.drop_index("ix_products_active_base_price", table_name="products")
+    op.drop_index("ix_products_active_created_at", table_name="products")
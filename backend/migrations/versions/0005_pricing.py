@@ -0,0 +1,114 @@
+"""effective variant prices and tax/shipping rules
+
+product_variants.effective_price is kept current by two triggers: one on
+variant writes, and one that reprices a product's variants when its base or
+sale price changes. The rules seeded here reproduce the previous hard-coded
+8% tax and $9.99 shipping, free from $100.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# A zero sale or variant price means "not set", as it did in OrderService
+EFFECTIVE_PRICE = "COALESCE(NULLIF({sale}, 0), NULLIF({price}, 0), {base})"
+
+
+def upgrade() -> None:
+    op.add_column("product_variants", sa.Column("effective_price", sa.Numeric(10, 2)))
+    op.execute(
+        "UPDATE product_variants v SET effective_price = "
+        + EFFECTIVE_PRICE.format(sale="p.sale_price", price="v.price", base="p.base_price")
+        + " FROM products p WHERE p.id = v.product_id"
+    )
+    op.alter_column("product_variants", "effective_price", nullable=False)
+
+    op.execute(
+        f"""
+        CREATE FUNCTION set_variant_effective_price() RETURNS trigger AS $$
+        BEGIN
+            SELECT {EFFECTIVE_PRICE.format(sale="p.sale_price", price="NEW.price", base="p.base_price")}
+              INTO NEW.effective_price
+              FROM products p
+             WHERE p.id = NEW.product_id;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_variants_effective_price
+        BEFORE INSERT OR UPDATE OF price, product_id ON product_variants
+        FOR EACH ROW EXECUTE FUNCTION set_variant_effective_price()
+        """
+    )
+    op.execute(
+        f"""
+        CREATE FUNCTION reprice_product_variants() RETURNS trigger AS $$
+        BEGIN
+            UPDATE product_variants
+               SET effective_price = {EFFECTIVE_PRICE.format(sale="NEW.sale_price", price="price", base="NEW.base_price")}
+             WHERE product_id = NEW.id;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER products_reprice_variants
+        AFTER UPDATE OF base_price, sale_price ON products
+        FOR EACH ROW
+        WHEN (OLD.base_price IS DISTINCT FROM NEW.base_price OR OLD.sale_price IS DISTINCT FROM NEW.sale_price)
+        EXECUTE FUNCTION reprice_product_variants()
+        """
+    )
+
+    tax_rules = op.create_table(
+        "tax_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("country", sa.String(100)),
+        sa.Column("state", sa.String(100)),
+        sa.Column("rate", sa.Numeric(6, 4), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    shipping_rules = op.create_table(
+        "shipping_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("country", sa.String(100)),
+        sa.Column("min_subtotal", sa.Numeric(10, 2), nullable=False),
+        sa.Column("max_subtotal", sa.Numeric(10, 2)),
+        sa.Column("amount", sa.Numeric(10, 2), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.bulk_insert(tax_rules, [{"country": None, "state": None, "rate": 0.08, "is_active": True}])
+    op.bulk_insert(
+        shipping_rules,
+        [
+            {"country": None, "min_subtotal": 0, "max_subtotal": 100, "amount": 9.99, "is_active": True},
+            {"country": None, "min_subtotal": 100, "max_subtotal": None, "amount": 0, "is_active": True},
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("shipping_rules")
+    op.drop_table("tax_rules")
+    op.execute("DROP TRIGGER products_reprice_variants ON products")
+    op.execute("DROP FUNCTION reprice_product_variants()")
+    op.execute("DROP TRIGGER product_variants_effective_price ON product_variants")
+    op.execute("DROP FUNCTION set_variant_effective_price()")
+    op.drop_column("product_variants", "effective_price")
@@ -0,0 +1,132 @@
+"""product-level effective price for listing filters and sorts
+
+products.effective_price is the lowest effective price among the product's
+variants, falling back to the sale/base price for products without
+variants. A BEFORE trigger on products computes it from the new prices;
+statement-level triggers on product_variants recompute it for the products
+whose variant prices were inserted, changed or deleted, once per statement
+so bulk loads do not update a product row per variant.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRODUCT_PRICE = """COALESCE(
+    (SELECT min(v.effective_price) FROM product_variants v WHERE v.product_id = p.id),
+    NULLIF(p.sale_price, 0),
+    p.base_price
+)"""
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("effective_price", sa.Numeric(10, 2)))
+    op.execute(f"UPDATE products p SET effective_price = {PRODUCT_PRICE}")
+    op.alter_column("products", "effective_price", nullable=False)
+
+    op.drop_index("ix_products_active_base_price", table_name="products")
+    op.create_index("ix_products_is_active_effective_price", "products", ["is_active", "effective_price"])
+
+    # Variants are repriced AFTER a product's prices change, so compute from
+    # the new product prices here rather than the variants' stored values.
+    op.execute(
+        """
+        CREATE FUNCTION set_product_effective_price() RETURNS trigger AS $$
+        BEGIN
+            NEW.effective_price := COALESCE(
+                (SELECT min(COALESCE(NULLIF(NEW.sale_price, 0), NULLIF(v.price, 0), NEW.base_price))
+                   FROM product_variants v
+                  WHERE v.product_id = NEW.id),
+                NULLIF(NEW.sale_price, 0),
+                NEW.base_price
+            );
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER products_effective_price
+        BEFORE INSERT OR UPDATE OF base_price, sale_price ON products
+        FOR EACH ROW EXECUTE FUNCTION set_product_effective_price()
+        """
+    )
+
+    op.execute(
+        f"""
+        CREATE FUNCTION refresh_product_effective_prices() RETURNS trigger AS $$
+        DECLARE
+            changed uuid[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(DISTINCT product_id) INTO changed FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(DISTINCT product_id) INTO changed FROM old_rows;
+            ELSE
+                -- Stock updates fire this too; only price or product moves matter
+                SELECT array_agg(DISTINCT moved.product_id) INTO changed
+                  FROM new_rows n
+                  JOIN old_rows o ON o.id = n.id
+                 CROSS JOIN LATERAL (VALUES (n.product_id), (o.product_id)) AS moved(product_id)
+                 WHERE n.effective_price IS DISTINCT FROM o.effective_price OR n.product_id <> o.product_id;
+            END IF;
+
+            IF changed IS NOT NULL THEN
+                UPDATE products p SET effective_price = {PRODUCT_PRICE}
+                 WHERE p.id = ANY(changed)
+                   AND p.effective_price IS DISTINCT FROM {PRODUCT_PRICE};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_variants_refresh_product_price_insert
+        AFTER INSERT ON product_variants
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_product_effective_prices()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_variants_refresh_product_price_update
+        AFTER UPDATE ON product_variants
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_product_effective_prices()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER product_variants_refresh_product_price_delete
+        AFTER DELETE ON product_variants
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION refresh_product_effective_prices()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER product_variants_refresh_product_price_delete ON product_variants")
+    op.execute("DROP TRIGGER product_variants_refresh_product_price_update ON product_variants")
+    op.execute("DROP TRIGGER product_variants_refresh_product_price_insert ON product_variants")
+    op.execute("DROP FUNCTION refresh_product_effective_prices()")
+    op.execute("DROP TRIGGER products_effective_price ON products")
+    op.execute("DROP FUNCTION set_product_effective_price()")
+    op.drop_index("ix_products_is_active_effective_price", table_name="products")
+    op.create_index("ix_products_active_base_price", "products", ["base_price"], postgresql_where=sa.text("is_active"))
+    op.drop_column("products", "effective_price")
@@ -0,0 +1,62 @@
+"""denormalized order summary columns for admin listings
+
+item_count, customer_name and customer_email are written with the order
+(and customer columns again on profile changes), so the admin order list is
+served from orders alone. Existing rows are backfilled here.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("orders", sa.Column("item_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("orders", sa.Column("customer_name", sa.String(101)))
+    op.add_column("orders", sa.Column("customer_email", sa.String(255)))
+
+    op.execute(
+        """
+        UPDATE orders o
+           SET customer_name = u.first_name || ' ' || u.last_name,
+               customer_email = lower(u.email)
+          FROM users u
+         WHERE u.id = o.user_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE orders o
+           SET item_count = counts.item_count
+          FROM (
+                SELECT order_id, order_created_at, sum(quantity) AS item_count
+                  FROM order_items
+                 GROUP BY order_id, order_created_at
+               ) counts
+         WHERE o.id = counts.order_id AND o.created_at = counts.order_created_at
+        """
+    )
+
+    # Admin filters; created_at ranges use ix_orders_created_at
+    op.create_index("ix_orders_customer_email_created_at", "orders", ["customer_email", "created_at"])
+    op.create_index("ix_orders_payment_status_created_at", "orders", ["payment_status", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_payment_status_created_at", table_name="orders")
+    op.drop_index("ix_orders_customer_email_created_at", table_name="orders")
+    op.drop_column("orders", "customer_email")
+    op.drop_column("orders", "customer_name")
+    op.drop_column("orders", "item_count")
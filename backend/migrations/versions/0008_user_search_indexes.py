@@ -0,0 +1,38 @@
+"""indexes for admin user search
+
+A trigram GIN index over the lowered "first last email" text serves
+substring search and similarity ranking; expression b-tree indexes serve
+exact (and prefix) email lookups and exact phone lookups on digits only.
+The expressions must match app.models.user exactly.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_users_search_text_trgm ON users "
+        "USING gin (lower(first_name || ' ' || last_name || ' ' || email) gin_trgm_ops)"
+    )
+    op.execute("CREATE INDEX ix_users_email_lower ON users (lower(email) text_pattern_ops)")
+    op.execute("CREATE INDEX ix_users_phone_digits ON users (regexp_replace(phone, '[^0-9]', '', 'g'))")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_phone_digits", table_name="users")
+    op.drop_index("ix_users_email_lower", table_name="users")
+    op.drop_index("ix_users_search_text_trgm", table_name="users")
@@ -0,0 +1,28 @@
+"""sequence for block-allocated order numbers
+
+Each nextval() reserves INCREMENT BY numbers for one worker (see
+app.core.order_numbers); change the block size with ALTER SEQUENCE.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE order_number_seq INCREMENT BY 1000 MINVALUE 1 START WITH 1")
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE order_number_seq")
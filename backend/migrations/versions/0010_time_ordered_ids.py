@@ -0,0 +1,82 @@
+"""support for re-keying existing rows with time-ordered UUIDs
+
+New rows get UUIDv7 keys from the application once USE_TIME_ORDERED_IDS is
+on; existing v4 keys stay valid as they are. To also make old rows
+time-ordered, app.jobs.rekey_ids rewrites their ids with uuid7_at(). Foreign
+keys between the re-keyed tables become ON UPDATE CASCADE so every reference
+follows its row.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFERENCED_TABLES = "'users', 'products', 'product_variants', 'carts', 'orders'"
+
+
+def _recreate_foreign_keys(on_update: str) -> None:
+    # Partition-level copies (conparentid <> 0) follow their parent constraint
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            fk record;
+        BEGIN
+            FOR fk IN
+                SELECT c.conrelid::regclass AS tbl, c.conname,
+                       regexp_replace(pg_get_constraintdef(c.oid), ' ON UPDATE CASCADE', '') AS definition
+                  FROM pg_constraint c
+                 WHERE c.contype = 'f'
+                   AND c.conparentid = 0
+                   AND c.connamespace = current_schema()::regnamespace
+                   AND c.confrelid::regclass::text IN ({REFERENCED_TABLES})
+            LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.tbl, fk.conname);
+                EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I %s {on_update}', fk.tbl, fk.conname, fk.definition);
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+
+def upgrade() -> None:
+    # Version 7 UUID carrying ts in its first 48 bits and the remaining random
+    # bits of source, so re-keying is deterministic and keeps ids unique.
+    op.execute(
+        """
+        CREATE FUNCTION uuid7_at(ts timestamp, source uuid) RETURNS uuid AS $$
+            SELECT encode(
+                set_byte(
+                    set_byte(
+                        overlay(
+                            uuid_send(source)
+                            PLACING substring(int8send((extract(epoch FROM ts) * 1000)::bigint) FROM 3)
+                            FROM 1 FOR 6
+                        ),
+                        6, (get_byte(uuid_send(source), 6) & 15) | 112
+                    ),
+                    8, (get_byte(uuid_send(source), 8) & 63) | 128
+                ),
+                'hex'
+            )::uuid
+        $$ LANGUAGE sql IMMUTABLE STRICT
+        """
+    )
+    _recreate_foreign_keys("ON UPDATE CASCADE")
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys("")
+    op.execute("DROP FUNCTION uuid7_at(timestamp, uuid)")
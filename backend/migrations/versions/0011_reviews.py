@@ -0,0 +1,86 @@
+"""product reviews and incrementally maintained rating aggregates
+
+products.rating_sum and review_count are running totals over approved
+reviews; average_rating and bayesian_rating are derived from them on every
+change. Existing aggregates are carried over; the Bayesian prior here
+(mean 3.5, weight 10) matches the RATING_PRIOR_* setting defaults, and
+app.jobs.ratings recomputes everything if those settings change.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reviews",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("rating", sa.SmallInteger(), nullable=False),
+        sa.Column("title", sa.String(200)),
+        sa.Column("body", sa.Text()),
+        sa.Column("is_approved", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], name="reviews_product_id_fkey", onupdate="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="reviews_user_id_fkey", onupdate="CASCADE"),
+        sa.UniqueConstraint("product_id", "user_id", name="uq_reviews_product_user"),
+        sa.CheckConstraint("rating BETWEEN 1 AND 5", name="ck_reviews_rating"),
+    )
+    op.create_index("ix_reviews_user_id", "reviews", ["user_id"])
+    op.create_index(
+        "ix_reviews_product_approved_created_at",
+        "reviews",
+        ["product_id", "created_at"],
+        postgresql_where=sa.text("is_approved"),
+    )
+    op.create_index(
+        "ix_reviews_pending_created_at", "reviews", ["created_at"], postgresql_where=sa.text("NOT is_approved")
+    )
+
+    op.add_column("products", sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("products", sa.Column("bayesian_rating", sa.Float(), nullable=False, server_default="3.5"))
+    op.execute(
+        """
+        UPDATE products
+           SET rating_sum = round(coalesce(average_rating, 0) * coalesce(review_count, 0)),
+               review_count = coalesce(review_count, 0)
+        """
+    )
+    op.execute("UPDATE products SET bayesian_rating = (3.5 * 10 + rating_sum)::float / (10 + review_count)")
+
+    op.drop_index("ix_products_active_average_rating", table_name="products")
+    op.create_index(
+        "ix_products_active_bayesian_rating",
+        "products",
+        ["bayesian_rating"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_active_bayesian_rating", table_name="products")
+    op.create_index(
+        "ix_products_active_average_rating",
+        "products",
+        ["average_rating"],
+        postgresql_where=sa.text("is_active"),
+    )
+    op.drop_column("products", "bayesian_rating")
+    op.drop_column("products", "rating_sum")
+    op.drop_table("reviews")
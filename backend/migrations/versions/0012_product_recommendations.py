@@ -0,0 +1,54 @@
+"""co-purchase counts and precomputed product recommendations
+
+app.jobs.recommendations counts how often products are ordered together
+into product_co_purchases and keeps the top neighbours of each product in
+product_recommendations, one row per product, so the related products
+endpoint is a primary-key lookup. job_watermarks records how far
+incremental jobs have read.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012"
+down_revision: Union[str, None] = "0011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_watermarks",
+        sa.Column("job", sa.String(100), primary_key=True),
+        sa.Column("processed_until", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_table(
+        "product_co_purchases",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("related_product_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("product_id", "related_product_id"),
+    )
+    op.create_table(
+        "product_recommendations",
+        sa.Column("product_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("related_product_ids", postgresql.ARRAY(postgresql.UUID(as_uuid=True)), nullable=False),
+        sa.Column("scores", postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("product_recommendations")
+    op.drop_table("product_co_purchases")
+    op.drop_table("job_watermarks")
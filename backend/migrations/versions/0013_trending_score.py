@@ -0,0 +1,37 @@
+"""products.trending_score for sort_by=trending
+
+Trending counters live in Redis (app.core.trending); app.jobs.trending copies
+the scores of the top products here so the trending sort can be combined
+with the catalog filters and served from an index.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013"
+down_revision: Union[str, None] = "0012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("trending_score", sa.Float(), nullable=False, server_default="0"))
+    op.create_index(
+        "ix_products_active_trending_score",
+        "products",
+        ["trending_score"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_active_trending_score", table_name="products")
+    op.drop_column("products", "trending_score")
@@ -0,0 +1,76 @@
+"""per-variant low-stock thresholds, daily sales rollup and stock snapshots
+
+product_variants.low_stock_threshold replaces the dashboard's hard-coded 5,
+and a partial index covers only the variants at or below it.
+variant_daily_sales is kept current by order creation and cancellation; the
+last 28 days are backfilled here from order_items so sales velocity is
+meaningful straight away. inventory_snapshots is filled by app.jobs.inventory.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0014"
+down_revision: Union[str, None] = "0013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_DAYS = 28
+
+
+def upgrade() -> None:
+    op.add_column(
+        "product_variants", sa.Column("low_stock_threshold", sa.Integer(), nullable=False, server_default="5")
+    )
+    op.create_index(
+        "ix_product_variants_low_stock",
+        "product_variants",
+        ["product_id"],
+        postgresql_where=sa.text("stock_quantity <= low_stock_threshold"),
+    )
+
+    op.create_table(
+        "variant_daily_sales",
+        sa.Column("variant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("units_sold", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("variant_id", "day"),
+    )
+    op.create_table(
+        "inventory_snapshots",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("variant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("stock_quantity", sa.Integer(), nullable=False),
+        sa.Column("low_stock_threshold", sa.Integer(), nullable=False),
+        sa.Column("units_sold", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "variant_id"),
+    )
+
+    op.execute(
+        f"""
+        INSERT INTO variant_daily_sales (variant_id, day, units_sold)
+        SELECT oi.product_variant_id, oi.order_created_at::date, sum(oi.quantity)
+          FROM order_items oi
+          JOIN orders o ON o.id = oi.order_id AND o.created_at = oi.order_created_at
+         WHERE oi.order_created_at >= current_date - {BACKFILL_DAYS - 1}
+           AND oi.product_variant_id IS NOT NULL
+           AND o.status <> 'CANCELLED'
+         GROUP BY oi.product_variant_id, oi.order_created_at::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_snapshots")
+    op.drop_table("variant_daily_sales")
+    op.drop_index("ix_product_variants_low_stock", table_name="product_variants")
+    op.drop_column("product_variants", "low_stock_threshold")
@@ -0,0 +1,53 @@
+"""per-user order totals for the account page
+
+user_order_stats holds each customer's order count and lifetime spend
+(cancelled orders excluded) and their last order date. Order placement and
+status changes keep it current; it is backfilled here from orders.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0015"
+down_revision: Union[str, None] = "0014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_order_stats",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("lifetime_spend", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("last_order_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], onupdate="CASCADE", ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO user_order_stats (user_id, order_count, lifetime_spend, last_order_at, updated_at)
+        SELECT user_id,
+               count(*) FILTER (WHERE status <> 'CANCELLED'),
+               coalesce(sum(total_amount) FILTER (WHERE status <> 'CANCELLED'), 0),
+               max(created_at),
+               now() AT TIME ZONE 'utc'
+          FROM orders
+         WHERE user_id IS NOT NULL
+         GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_order_stats")
@@ -0,0 +1,31 @@
+"""order row versions for optimistic concurrency
+
+Every status change increments orders.version, and a transition sent with
+the version it read fails if another writer got there first. Adding the
+column with a constant default is a catalog-only change, so existing
+partitions are not rewritten.
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0016"
+down_revision: Union[str, None] = "0015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("orders", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("orders", "version")
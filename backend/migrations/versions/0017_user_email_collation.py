@@ -0,0 +1,33 @@
+"""sortable email index for short admin searches
+
+Searches too short for trigrams match an email prefix and page through the
+matches in email order. The text_pattern_ops index from 0008 serves the
+prefix match but cannot return rows sorted, so every match was sorted. It is
+replaced by an index on lower(email) COLLATE "C", whose byte order serves
+equality, prefix matches and the ordering alike.
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0017"
+down_revision: Union[str, None] = "0016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
+    op.execute('CREATE INDEX ix_users_email_lower ON users ((lower(email) COLLATE "C"))')
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
+    op.execute("CREATE INDEX ix_users_email_lower ON users (lower(email) text_pattern_ops)")
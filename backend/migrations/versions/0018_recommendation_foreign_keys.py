@@ -0,0 +1,42 @@
+"""foreign keys from the recommendation tables to products
+
+product_co_purchases and product_recommendations reference products without
+constraints, so app.jobs.rekey_ids, which relies on ON UPDATE CASCADE, left
+them pointing at the old keys. Rows for products that no longer exist are
+dropped first. related_product_ids is an array no foreign key can follow;
+run `python -m app.jobs.recommendations --rebuild` after re-keying products.
+
+Revision ID: 0018
+Revises: 0017
+Create Date: 2026-10-19 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0018"
+down_revision: Union[str, None] = "0017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOREIGN_KEYS = [
+    ("product_co_purchases", "product_id"),
+    ("product_co_purchases", "related_product_id"),
+    ("product_recommendations", "product_id"),
+]
+
+
+def upgrade() -> None:
+    for table, column in FOREIGN_KEYS:
+        op.execute(f"DELETE FROM {table} t WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.id = t.{column})")
+        op.create_foreign_key(
+            f"{table}_{column}_fkey", table, "products", [column], ["id"], onupdate="CASCADE", ondelete="CASCADE"
+        )
+
+
+def downgrade() -> None:
+    for table, column in reversed(FOREIGN_KEYS):
+        op.drop_constraint(f"{table}_{column}_fkey", table, type_="foreignkey")
@@ -0,0 +1,40 @@
+"""foreign keys from the inventory rollups to product variants
+
+variant_daily_sales and inventory_snapshots reference product_variants
+without constraints, so app.jobs.rekey_ids, which relies on ON UPDATE
+CASCADE, left them keyed by the old ids and sales velocity dropped to zero.
+Rows for variants that no longer exist are dropped first.
+
+Revision ID: 0019
+Revises: 0018
+Create Date: 2026-10-19 23:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0019"
+down_revision: Union[str, None] = "0018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["variant_daily_sales", "inventory_snapshots"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(
+            f"DELETE FROM {table} t WHERE NOT EXISTS (SELECT 1 FROM product_variants v WHERE v.id = t.variant_id)"
+        )
+        op.create_foreign_key(
+            f"{table}_variant_id_fkey", table, "product_variants", ["variant_id"], ["id"],
+            onupdate="CASCADE", ondelete="CASCADE",
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_constraint(f"{table}_variant_id_fkey", table, type_="foreignkey")
@@ -8,8 +8,11 @@ from uuid import uuid4
 # Add the app directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '.'))
 
-from app.database import SessionLocal, engine
-from app.models import Base, Product, ProductVariant, User
+from alembic import command
+from alembic.config import Config
+from app.database import SessionLocal
+from app.models import Product, ProductVariant, User
+from app.schemas import UserCreate
 from app.services.auth_service import AuthService
 
 # Sample jersey data
@@ -299,13 +302,17 @@ SAMPLE_JERSEYS = [
     }
 ]
 
-def create_sample_data():
+def run_migrations():
+    """Bring the schema up to date; Alembic owns all tables and indexes"""
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    command.upgrade(config, "head")
+
+async def create_sample_data():
     """Create sample products and admin user"""
+    run_migrations()
     db = SessionLocal()
 
     try:
-        # Create tables
-        Base.metadata.create_all(bind=engine)
 
         # Check if data already exists
         existing_products = db.query(Product).count()
@@ -330,8 +337,6 @@ def create_sample_data():
                 sale_price=jersey_data.get("sale_price"),
                 material=jersey_data["material"],
                 care_instructions=jersey_data["care_instructions"],
-                average_rating=4.5,  # Sample rating
-                review_count=25,     # Sample review count
                 is_active=True
             )
 
@@ -365,8 +370,8 @@ def create_sample_data():
         }
 
         try:
-            admin_user = await auth_service.register(admin_data)
-            admin_user.is_admin = True
+            admin_user = await auth_service.register(UserCreate(**admin_data))
+            db.query(User).filter(User.id == admin_user.id).update({"is_admin": True})
             db.commit()
             print(f"Created admin user: {admin_user.email}")
         except Exception as e:
@@ -381,7 +386,7 @@ def create_sample_data():
         }
 
         try:
-            test_user = await auth_service.register(user_data)
+            test_user = await auth_service.register(UserCreate(**user_data))
             db.commit()
             print(f"Created test user: {test_user.email}")
         except Exception as e:
@@ -397,4 +402,4 @@ def create_sample_data():
         db.close()
 
 if __name__ == "__main__":
-    create_sample_data()
\ No newline at end of file
+    asyncio.run(create_sample_data())
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""Shared fixtures.
+
+Tests that need Postgres use the database named by DATABASE_URL, migrated to
+head (`alembic upgrade head`), and are skipped when it cannot be reached.
+Each test runs inside a transaction that is rolled back afterwards; commits
+made by the code under test only release a savepoint. Redis is not used.
+"""
+from decimal import Decimal
+from typing import Optional, Sequence
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import Product, ProductVariant, User
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    """Read through to the database and skip the trending counters"""
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "TRENDING_ENABLED", False)
+
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT version_num FROM alembic_version"))
+    except (OperationalError, ProgrammingError) as exc:
+        pytest.skip(f"No migrated database at DATABASE_URL: {exc.orig}")
+    return engine
+
+
+@pytest.fixture
+def db(database):
+    connection = database.connect()
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+ADDRESS = {
+    "first_name": "Test",
+    "last_name": "Buyer",
+    "email": "buyer@example.com",
+    "phone": "555-0100",
+    "address": "1 Main St",
+    "city": "Springfield",
+    "state": "IL",
+    "zip_code": "62701",
+    "country": "US",
+}
+
+
+@pytest.fixture
+def address() -> dict:
+    return dict(ADDRESS)
+
+
+@pytest.fixture
+def make_user(db):
+    def make(**fields) -> User:
+        suffix = uuid4().hex[:12]
+        user = User(
+            email=f"test-{suffix}@example.com",
+            password_hash="not-a-real-hash",
+            first_name="Test",
+            last_name=suffix,
+            **fields,
+        )
+        db.add(user)
+        db.flush()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_product(db):
+    def make(
+        base_price: str = "100.00",
+        sale_price: Optional[str] = None,
+        variant_prices: Sequence[Optional[str]] = (None,),
+        stock: int = 10,
+    ) -> Product:
+        suffix = uuid4().hex[:12]
+        product = Product(
+            name=f"Test Jersey {suffix}",
+            slug=f"test-jersey-{suffix}",
+            team="Test Team",
+            sport="Football",
+            base_price=Decimal(base_price),
+            sale_price=Decimal(sale_price) if sale_price is not None else None,
+        )
+        db.add(product)
+        for index, price in enumerate(variant_prices):
+            product.variants.append(ProductVariant(
+                size=f"S{index}",
+                sku=f"TEST-{suffix}-{index}",
+                stock_quantity=stock,
+                price=Decimal(price) if price is not None else None,
+            ))
+        db.flush()
+        return product
+    return make
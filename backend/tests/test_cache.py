@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from app.config import Settings, settings
+from app.core import cache as cache_module
+from app.core.cache import JSONCache
+from app.database import SessionLocal, read_session
+
+
+@pytest.fixture
+def cache():
+    return JSONCache("test", ttl=60, stale_ttl=600)
+
+
+async def test_concurrent_misses_share_one_load(cache):
+    calls = []
+    release = threading.Event()
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 1}
+
+    waiters = [asyncio.ensure_future(cache.get_or_load("key", load)) for _ in range(20)]
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [{"value": 1}] * 20
+    assert len(calls) == 1
+
+
+async def test_cancelling_the_first_caller_does_not_fail_the_others(cache):
+    release = threading.Event()
+
+    def load():
+        release.wait(5)
+        return "loaded"
+
+    first = asyncio.ensure_future(cache.get_or_load("key", load))
+    await asyncio.sleep(0.01)
+    second = asyncio.ensure_future(cache.get_or_load("key", load))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    release.set()
+
+    assert await second == "loaded"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+class KeyStore:
+    """The two Redis calls invalidate() makes, over a set of keys"""
+
+    def __init__(self, *keys: str):
+        self.keys = {key.encode() for key in keys}
+
+    def scan_iter(self, match: str, count: int):
+        return [key for key in sorted(self.keys) if key.startswith(match.rstrip("*").encode())]
+
+    def delete(self, *keys):
+        self.keys -= set(keys)
+
+
+def test_invalidate_keeps_load_locks(cache, monkeypatch):
+    store = KeyStore("test:featured", "test:trending:12", "test:lock:featured", "other:featured")
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    monkeypatch.setattr(cache_module, "get_redis", lambda: store)
+
+    cache.invalidate()
+
+    assert store.keys == {b"test:lock:featured", b"other:featured"}
+
+
+def test_read_session_is_independent_of_the_caller():
+    replica = create_engine("sqlite://")
+    caller = SessionLocal()
+    caller.info["replica"] = replica
+    try:
+        with read_session(caller) as session:
+            assert session is not caller
+            assert session.info["replica"] is replica and session.info["reading"] == 1
+
+        caller.info["wrote"] = True
+        with read_session(caller) as session:
+            # After a write the caller reads from the primary, and so do its loads
+            assert "replica" not in session.info
+    finally:
+        caller.close()
+
+
+def test_unknown_warmup_read_is_rejected():
+    assert Settings(CACHE_WARMUP=["teams", "trending"]).CACHE_WARMUP == ["teams", "trending"]
+    with pytest.raises(ValidationError):
+        Settings(CACHE_WARMUP=["featured", "new_arrivals"])
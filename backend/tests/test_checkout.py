@@ -0,0 +1,55 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from app.models import ProductVariant
+from app.schemas import OrderCreate
+from app.schemas.order import OrderItemCreate
+from app.services.order_service import OrderService
+
+
+@pytest.fixture
+def checkout(db, make_user, address):
+    user = make_user()
+
+    async def place(variant: ProductVariant, *quantities: int):
+        return await OrderService(db).create_order(
+            OrderCreate(
+                items=[
+                    OrderItemCreate(product_id=variant.product_id, product_variant_id=variant.id, quantity=quantity)
+                    for quantity in quantities
+                ],
+                shipping_address=address,
+                payment_method="card",
+            ),
+            user.id,
+        )
+    return place
+
+
+def stock(db, variant):
+    return db.execute(select(ProductVariant.stock_quantity).where(ProductVariant.id == variant.id)).scalar_one()
+
+
+async def test_stock_is_checked_against_the_committed_count(db, make_product, checkout):
+    variant = make_product(stock=2).variants[0]
+    db.commit()
+    # Another checkout took a unit; the session still holds the variant with 2
+    db.execute(ProductVariant.__table__.update().where(ProductVariant.id == variant.id).values(stock_quantity=1))
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        await checkout(variant, 2)
+    assert exc.value.status_code == 400
+
+    await checkout(variant, 1)
+    assert stock(db, variant) == 0
+
+
+async def test_lines_for_the_same_variant_are_checked_together(db, make_product, checkout):
+    variant = make_product(stock=3).variants[0]
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc:
+        await checkout(variant, 2, 2)
+    assert exc.value.status_code == 400
+    assert stock(db, variant) == 3
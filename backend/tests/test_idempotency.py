@@ -0,0 +1,137 @@
+import threading
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.models import IdempotencyKey
+from app.services.idempotency_service import IdempotencyService
+
+SCOPE = "orders.create"
+PAYLOAD = {"items": [{"variant_id": "v1", "quantity": 2}]}
+
+
+def test_first_request_proceeds(db):
+    assert IdempotencyService(db).reserve(uuid4(), "key-1", SCOPE, PAYLOAD) is None
+
+
+def test_retry_replays_the_stored_response(db):
+    user_id = uuid4()
+    service = IdempotencyService(db)
+    service.reserve(user_id, "key-1", SCOPE, PAYLOAD)
+    service.complete(user_id, "key-1", {"id": "order-1"}, status_code=201)
+    db.commit()
+
+    record = service.reserve(user_id, "key-1", SCOPE, {"items": [{"quantity": 2, "variant_id": "v1"}]})
+
+    assert record.status_code == 201
+    assert record.response_body == {"id": "order-1"}
+
+
+def test_keys_are_scoped_to_the_user(db):
+    service = IdempotencyService(db)
+    service.reserve(uuid4(), "key-1", SCOPE, PAYLOAD)
+
+    assert service.reserve(uuid4(), "key-1", SCOPE, PAYLOAD) is None
+
+
+@pytest.mark.parametrize("scope, payload", [
+    (SCOPE, {"items": [{"variant_id": "v1", "quantity": 3}]}),
+    ("orders.cancel", PAYLOAD),
+])
+def test_reusing_a_key_for_a_different_request_is_rejected(db, scope, payload):
+    user_id = uuid4()
+    service = IdempotencyService(db)
+    service.reserve(user_id, "key-1", SCOPE, PAYLOAD)
+    service.complete(user_id, "key-1", {"id": "order-1"})
+    db.commit()
+
+    with pytest.raises(HTTPException) as raised:
+        service.reserve(user_id, "key-1", scope, payload)
+    assert raised.value.status_code == 422
+
+
+def test_request_without_a_stored_response_is_in_progress(db):
+    user_id = uuid4()
+    service = IdempotencyService(db)
+    service.reserve(user_id, "key-1", SCOPE, PAYLOAD)
+    db.commit()
+
+    with pytest.raises(HTTPException) as raised:
+        service.reserve(user_id, "key-1", SCOPE, PAYLOAD)
+    assert raised.value.status_code == 409
+
+
+def test_expired_key_is_reused(db):
+    user_id = uuid4()
+    service = IdempotencyService(db)
+    service.reserve(user_id, "key-1", SCOPE, PAYLOAD)
+    service.complete(user_id, "key-1", {"id": "order-1"})
+    db.execute(
+        text("UPDATE idempotency_keys SET expires_at = now() AT TIME ZONE 'utc' - interval '1 hour' WHERE user_id = :user_id"),
+        {"user_id": user_id},
+    )
+    db.commit()
+
+    assert service.reserve(user_id, "key-1", SCOPE, {"items": []}) is None
+
+
+class TestConcurrentDuplicates:
+    """Two requests with the same key on separate connections, as in production"""
+
+    @pytest.fixture
+    def user_id(self, database):
+        user_id = uuid4()
+        yield user_id
+        with database.begin() as connection:
+            connection.execute(IdempotencyKey.__table__.delete().where(IdempotencyKey.user_id == user_id))
+
+    def _reserve_in_thread(self, user_id, outcome: dict) -> threading.Thread:
+        def run():
+            db = SessionLocal()
+            try:
+                db.execute(text("SET lock_timeout = '10s'"))
+                outcome["record"] = IdempotencyService(db).reserve(user_id, "key-1", SCOPE, PAYLOAD)
+                if outcome["record"] is not None:
+                    outcome["record"] = outcome["record"].response_body
+            except HTTPException as exc:
+                outcome["status_code"] = exc.status_code
+            finally:
+                db.rollback()
+                db.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_duplicate_waits_for_the_first_and_replays_it(self, user_id):
+        first = SessionLocal()
+        try:
+            IdempotencyService(first).reserve(user_id, "key-1", SCOPE, PAYLOAD)
+            outcome = {}
+            thread = self._reserve_in_thread(user_id, outcome)
+            thread.join(0.5)
+            assert thread.is_alive(), "duplicate should block on the uncommitted key"
+
+            IdempotencyService(first).complete(user_id, "key-1", {"id": "order-1"})
+            first.commit()
+            thread.join(10)
+        finally:
+            first.close()
+
+        assert outcome == {"record": {"id": "order-1"}}
+
+    def test_duplicate_proceeds_when_the_first_rolls_back(self, user_id):
+        first = SessionLocal()
+        try:
+            IdempotencyService(first).reserve(user_id, "key-1", SCOPE, PAYLOAD)
+            outcome = {}
+            thread = self._reserve_in_thread(user_id, outcome)
+            thread.join(0.5)
+            first.rollback()
+            thread.join(10)
+        finally:
+            first.close()
+
+        assert outcome == {"record": None}
@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event
+from sqlalchemy.orm import Session, declarative_base, relationship
+from app.core.loader import get_loader, load_relationship, prime_relationship
+
+Base = declarative_base()
+
+
+class Team(Base):
+    __tablename__ = "teams"
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    players = relationship("Player", back_populates="team")
+
+
+class Player(Base):
+    __tablename__ = "players"
+    id = Column(Integer, primary_key=True)
+    team_id = Column(Integer, ForeignKey("teams.id"))
+    name = Column(String)
+    team = relationship("Team", back_populates="players")
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all([Team(id=1, name="A"), Team(id=2, name="B"), Team(id=3, name="C")])
+        db.add_all([
+            Player(id=1, team_id=1, name="a1"),
+            Player(id=2, team_id=1, name="a2"),
+            Player(id=3, team_id=2, name="b1"),
+            Player(id=4, team_id=None, name="free agent"),
+        ])
+        db.commit()
+    return engine
+
+
+@pytest.fixture
+def queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+def teams(db):
+    return db.query(Team).order_by(Team.id).all()
+
+
+def names(players):
+    return sorted(player.name for player in players)
+
+
+async def test_loads_in_one_tick_share_a_query(db, queries):
+    a, b, c = teams(db)
+    queries.clear()
+
+    loaded = await asyncio.gather(
+        load_relationship(db, Team.players, [a]),
+        load_relationship(db, Team.players, [b, c]),
+    )
+
+    assert len(queries) == 1
+    assert [names(players) for players in loaded[0] + loaded[1]] == [["a1", "a2"], ["b1"], []]
+    # Set as committed values: reading the attribute does not query again
+    assert names(a.players) == ["a1", "a2"] and c.players == []
+    assert len(queries) == 1
+
+
+async def test_loads_in_later_ticks_use_the_cache(db, queries):
+    a, b, _ = teams(db)
+    await load_relationship(db, Team.players, [a])
+    queries.clear()
+
+    await load_relationship(db, Team.players, [a])
+    assert queries == []
+    await load_relationship(db, Team.players, [b])
+    assert len(queries) == 1
+
+
+async def test_many_to_one_without_a_key_does_not_query(db, queries):
+    players = db.query(Player).order_by(Player.id).all()
+    queries.clear()
+
+    loaded = await load_relationship(db, Player.team, players)
+
+    assert len(queries) == 1
+    assert [team.name if team else None for team in loaded] == ["A", "A", "B", None]
+
+
+def test_prime_loads_synchronously_in_one_query(db, queries):
+    a, b, c = teams(db)
+    prime_relationship(db, Team.players, [a])
+    queries.clear()
+
+    prime_relationship(db, Team.players, [a, b, c, None])
+
+    assert len(queries) == 1
+    assert (names(a.players), names(b.players), c.players) == (["a1", "a2"], ["b1"], [])
+    assert len(queries) == 1
+
+
+def test_prime_skips_parents_already_loaded(db, queries):
+    a, *_ = teams(db)
+    a.players  # plain lazy load
+    queries.clear()
+
+    prime_relationship(db, Team.players, [a])
+
+    assert queries == []
+
+
+@pytest.mark.parametrize("end", ["commit", "rollback"])
+async def test_cache_is_cleared_when_the_transaction_ends(db, queries, end):
+    a, *_ = teams(db)
+    await load_relationship(db, Team.players, [a])
+    db.add(Player(id=5, team_id=1, name="a3"))
+    db.flush()
+    getattr(db, end)()
+    assert "relationship_loaders" not in db.info
+
+    (players,) = await load_relationship(db, Team.players, teams(db)[:1])
+
+    expected = ["a1", "a2", "a3"] if end == "commit" else ["a1", "a2"]
+    assert names(players) == expected
+
+
+async def test_failed_batch_fails_every_waiter(db, monkeypatch):
+    a, b, _ = teams(db)
+    loader = get_loader(db, Team.players)
+
+    def fail(keys):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(loader, "_fetch", fail)
+    results = await asyncio.gather(
+        loader.load(a), loader.load(b), return_exceptions=True
+    )
+
+    assert [str(result) for result in results] == ["database went away"] * 2
@@ -0,0 +1,174 @@
+from itertools import product as pairs
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from app.models import Order, ProductVariant
+from app.models.order import OrderStatus
+from app.schemas import OrderCreate, OrderTransition
+from app.schemas.order import OrderItemCreate
+from app.services.order_service import OrderService
+from app.services.order_state import OrderStateMachine, can_transition
+
+S = OrderStatus
+ALLOWED = {
+    (S.PENDING, S.PROCESSING), (S.PENDING, S.CANCELLED),
+    (S.PROCESSING, S.SHIPPED), (S.PROCESSING, S.CANCELLED),
+    (S.SHIPPED, S.DELIVERED),
+}
+
+
+@pytest.mark.parametrize("current, target", list(pairs(OrderStatus, repeat=2)))
+def test_transition_table(current, target):
+    assert can_transition(current, target) == (current == target or (current, target) in ALLOWED)
+
+
+# Transitions that take a new order to each status
+ROUTES = {
+    S.PENDING: [],
+    S.PROCESSING: [S.PROCESSING],
+    S.SHIPPED: [S.PROCESSING, S.SHIPPED],
+    S.DELIVERED: [S.PROCESSING, S.SHIPPED, S.DELIVERED],
+    S.CANCELLED: [S.CANCELLED],
+}
+
+
+@pytest.fixture
+def place_order(db, make_product, make_user, address):
+    user = make_user()
+
+    async def place(quantity: int = 2, status: OrderStatus = OrderStatus.PENDING) -> Order:
+        product = make_product(variant_prices=["40.00"], stock=10)
+        variant = product.variants[0]
+        order = await OrderService(db).create_order(
+            OrderCreate(
+                items=[OrderItemCreate(product_id=product.id, product_variant_id=variant.id, quantity=quantity)],
+                shipping_address=address,
+                payment_method="card",
+            ),
+            user.id,
+        )
+        for step in ROUTES[status]:
+            OrderStateMachine(db).transition(OrderTransition(order_id=order.id, status=step.value))
+        db.commit()
+        return order
+    return place
+
+
+def state(db, order):
+    return db.execute(select(Order.status, Order.version, Order.tracking_number).where(Order.id == order.id)).one()
+
+
+def stock(db, order):
+    return db.execute(
+        select(ProductVariant.stock_quantity).where(ProductVariant.id == order.items[0].product_variant_id)
+    ).scalar()
+
+
+async def test_bulk_transition_reports_every_outcome(db, place_order):
+    moved, stale, same = [await place_order() for _ in range(3)]
+    delivered = await place_order(status=OrderStatus.DELIVERED)
+    missing = uuid4()
+
+    result = OrderStateMachine(db).apply([
+        OrderTransition(order_id=moved.id, status="processing", version=1),
+        OrderTransition(order_id=moved.id, status="shipped"),
+        OrderTransition(order_id=stale.id, status="processing", version=7),
+        OrderTransition(order_id=delivered.id, status="pending"),
+        OrderTransition(order_id=same.id, status="pending"),
+        OrderTransition(order_id=missing, status="processing"),
+    ])
+    db.commit()
+
+    assert result["updated"] == [{"order_id": moved.id, "status": "processing", "version": 2}]
+    assert result["unchanged"] == [{"order_id": same.id, "status": "pending", "version": 1}]
+    assert [(rejection["order_id"], rejection["reason"]) for rejection in result["rejected"]] == [
+        (moved.id, "duplicate"),
+        (stale.id, "version_conflict"),
+        (delivered.id, "invalid_transition"),
+        (missing, "not_found"),
+    ]
+    assert state(db, moved)[:2] == (OrderStatus.PROCESSING, 2)
+    assert state(db, stale)[:2] == (OrderStatus.PENDING, 1)
+    assert state(db, delivered)[:2] == (OrderStatus.DELIVERED, 4)
+    assert state(db, same)[:2] == (OrderStatus.PENDING, 1)
+
+
+async def test_resending_the_current_status_keeps_the_version(db, place_order):
+    order = await place_order(status=OrderStatus.SHIPPED)
+    machine = OrderStateMachine(db)
+
+    for _ in range(2):
+        assert machine.transition(OrderTransition(order_id=order.id, status="shipped"))["version"] == 3
+    assert state(db, order)[:2] == (OrderStatus.SHIPPED, 3)
+
+    # The version the admin read is still current, so their next change goes through
+    machine.transition(OrderTransition(order_id=order.id, status="delivered", version=3))
+    assert state(db, order)[:2] == (OrderStatus.DELIVERED, 4)
+
+
+async def test_new_tracking_number_on_the_same_status_is_a_change(db, place_order):
+    order = await place_order(status=OrderStatus.SHIPPED)
+    machine = OrderStateMachine(db)
+
+    result = machine.apply([OrderTransition(order_id=order.id, status="shipped", tracking_number="1Z999")])
+    assert result["updated"] == [{"order_id": order.id, "status": "shipped", "version": 4}]
+    result = machine.apply([OrderTransition(order_id=order.id, status="shipped", tracking_number="1Z999")])
+    assert result["unchanged"] == [{"order_id": order.id, "status": "shipped", "version": 4}]
+    assert state(db, order) == (OrderStatus.SHIPPED, 4, "1Z999")
+
+
+@pytest.mark.parametrize("transition, status_code", [
+    ({"status": "processing", "version": 5}, 409),
+    ({"status": "delivered"}, 400),
+])
+async def test_single_transition_errors(db, place_order, transition, status_code):
+    order = await place_order()
+
+    with pytest.raises(HTTPException) as raised:
+        OrderStateMachine(db).transition(OrderTransition(order_id=order.id, **transition))
+    assert raised.value.status_code == status_code
+    assert state(db, order)[:2] == (OrderStatus.PENDING, 1)
+
+
+async def test_cancellation_returns_stock(db, place_order):
+    order = await place_order(quantity=3)
+    assert stock(db, order) == 7
+
+    OrderStateMachine(db).transition(OrderTransition(order_id=order.id, status="cancelled"))
+
+    assert stock(db, order) == 10
+    assert state(db, order)[:2] == (OrderStatus.CANCELLED, 2)
+
+
+class TestCustomerCancellation:
+    async def test_cancels_a_pending_order(self, db, place_order):
+        order = await place_order()
+
+        assert await OrderService(db).cancel_order(order.id, order.user_id) is True
+        assert state(db, order)[:2] == (OrderStatus.CANCELLED, 2)
+
+    async def test_order_of_another_user_is_not_found(self, db, place_order):
+        order = await place_order()
+
+        assert await OrderService(db).cancel_order(order.id, uuid4()) is False
+
+    @pytest.mark.parametrize("status", [OrderStatus.CANCELLED, OrderStatus.SHIPPED])
+    async def test_rejects_orders_past_cancellation(self, db, place_order, status):
+        order = await place_order(status=status)
+        before = state(db, order)
+
+        with pytest.raises(HTTPException) as raised:
+            await OrderService(db).cancel_order(order.id, order.user_id)
+        assert raised.value.status_code == 400
+        assert state(db, order) == before
+
+    async def test_retry_with_the_same_key_replays_success(self, db, place_order):
+        order = await place_order(quantity=1)
+        service = OrderService(db)
+
+        assert await service.cancel_order(order.id, order.user_id, idempotency_key="cancel-1") is True
+        assert await service.cancel_order(order.id, order.user_id, idempotency_key="cancel-1") is True
+        assert state(db, order)[:2] == (OrderStatus.CANCELLED, 2)
+        assert stock(db, order) == 10
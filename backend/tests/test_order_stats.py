@@ -0,0 +1,44 @@
+import threading
+from uuid import uuid4
+
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.services.order_stats_service import lock_users
+
+
+def _lock_in_thread(user_id, locked: threading.Event) -> threading.Thread:
+    def run():
+        db = SessionLocal()
+        try:
+            db.execute(text("SET lock_timeout = '10s'"))
+            lock_users(db, [user_id])
+            locked.set()
+        finally:
+            db.rollback()
+            db.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_user_lock_holds_off_other_writers_until_commit(database):
+    user_id, other_user_id = uuid4(), uuid4()
+    first = SessionLocal()
+    try:
+        lock_users(first, [other_user_id, user_id])
+
+        unrelated = threading.Event()
+        _lock_in_thread(uuid4(), unrelated).join(10)
+        assert unrelated.is_set(), "other users are not held up"
+
+        locked = threading.Event()
+        thread = _lock_in_thread(user_id, locked)
+        thread.join(0.5)
+        assert not locked.is_set(), "a second writer should wait for the first"
+
+        first.commit()
+        thread.join(10)
+        assert locked.is_set()
+    finally:
+        first.close()
@@ -0,0 +1,96 @@
+"""Trigger-maintained prices (migrations 0005/0006) against PricingService"""
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+from app.schemas import OrderCreate
+from app.schemas.order import OrderItemCreate
+from app.services.order_service import OrderService
+from app.services.pricing_service import PricingService
+
+
+def expected_price(product, variant) -> Decimal:
+    """The charged price as defined in migration 0005; zero means not set"""
+    return product.sale_price or variant.price or product.base_price
+
+
+def reload(db, product):
+    db.flush()
+    db.expire(product)
+    for variant in product.variants:
+        db.expire(variant)
+
+
+def assert_prices_match(product):
+    for variant in product.variants:
+        assert variant.effective_price == expected_price(product, variant), variant.sku
+    assert product.effective_price == min(variant.effective_price for variant in product.variants)
+
+
+@pytest.mark.parametrize("sale_price", [None, "0.00", "59.99"])
+def test_new_variants_are_priced(make_product, sale_price):
+    product = make_product(base_price="100.00", sale_price=sale_price, variant_prices=[None, "0.00", "80.00"])
+
+    assert_prices_match(product)
+
+
+@pytest.mark.parametrize("change", [
+    {"base_price": Decimal("120.00")},
+    {"sale_price": Decimal("49.99")},
+    {"sale_price": Decimal("0.00")},
+])
+def test_product_price_changes_reprice_variants(db, make_product, change):
+    product = make_product(base_price="100.00", sale_price="70.00", variant_prices=[None, "80.00"])
+    for field, value in change.items():
+        setattr(product, field, value)
+    reload(db, product)
+
+    assert_prices_match(product)
+
+
+@pytest.mark.parametrize("price", ["90.00", "0.00", None])
+def test_variant_price_changes_reprice_the_variant_and_product(db, make_product, price: Optional[str]):
+    product = make_product(base_price="100.00", variant_prices=["80.00", "85.00"])
+    product.variants[0].price = Decimal(price) if price is not None else None
+    reload(db, product)
+
+    assert_prices_match(product)
+
+
+async def test_quote_uses_the_current_effective_price(db, make_product, address):
+    product = make_product(base_price="100.00", variant_prices=["80.00"])
+    product.sale_price = Decimal("64.50")
+    reload(db, product)
+    variant = product.variants[0]
+
+    quote = await PricingService(db).quote_items(
+        [OrderItemCreate(product_id=product.id, product_variant_id=variant.id, quantity=3)], address
+    )
+
+    assert quote.lines[0].unit_price == expected_price(product, variant) == Decimal("64.50")
+    assert quote.subtotal == Decimal("193.50")
+    assert quote.total_amount == quote.subtotal + quote.tax_amount + quote.shipping_amount
+
+
+@pytest.mark.parametrize("quantity", [1, 4])
+async def test_quote_equals_the_committed_order(db, make_product, make_user, address, quantity):
+    # One quantity below and one above the free-shipping threshold of the default rules
+    cheap = make_product(base_price="25.00", variant_prices=[None])
+    sale = make_product(base_price="60.00", sale_price="45.55", variant_prices=["50.00"])
+    items = [
+        OrderItemCreate(product_id=cheap.id, product_variant_id=cheap.variants[0].id, quantity=quantity),
+        OrderItemCreate(product_id=sale.id, product_variant_id=sale.variants[0].id, quantity=1),
+    ]
+    user = make_user()
+
+    quote = await PricingService(db).quote_items(items, address)
+    order = await OrderService(db).create_order(
+        OrderCreate(items=items, shipping_address=address, payment_method="card"), user.id
+    )
+
+    assert (order.subtotal, order.tax_amount, order.shipping_amount, order.total_amount) == (
+        quote.subtotal, quote.tax_amount, quote.shipping_amount, quote.total_amount
+    )
+    assert sorted((item.product_variant_id, item.unit_price, item.total_price) for item in order.items) == sorted(
+        (line.product_variant_id, line.unit_price, line.total_price) for line in quote.lines
+    )
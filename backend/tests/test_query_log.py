@@ -0,0 +1,30 @@
+from sqlalchemy import text
+from app.core.query_log import _explain
+
+
+def test_explain_runs_on_the_statement_connection(db):
+    connection = db.connection()
+    cursor = connection.connection.cursor()
+    cursor.execute("SELECT 1")
+    checked_out = connection.engine.pool.checkedout()
+
+    plan = _explain(connection, cursor, "SELECT %(value)s::int", {"value": 1})
+
+    assert "Result" in plan
+    assert connection.engine.pool.checkedout() == checked_out
+
+
+def test_failed_explain_leaves_the_transaction_usable(db):
+    connection = db.connection()
+    cursor = connection.connection.cursor()
+
+    plan = _explain(connection, cursor, "SELECT * FROM no_such_table", {})
+
+    assert plan.startswith("<explain failed")
+    assert connection.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_only_reads_are_explained(db):
+    connection = db.connection()
+
+    assert _explain(connection, connection.connection.cursor(), "DELETE FROM users", {}) is None
@@ -0,0 +1,134 @@
+"""Every checked service query must be answerable from an index.
+
+Each query is run against the seeded database (`python seed_data.py`), the
+SQL it issues is captured and EXPLAINed with sequential scans disabled. With
+enable_seqscan off the planner still falls back to a Seq Scan when no usable
+index exists, so any remaining Seq Scan on a checked table means an index is
+missing, even on a small seed data set.
+"""
+import json
+import re
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import event, text
+from app.models import Order, Product, User
+from app.services.admin_service import AdminService
+from app.services.inventory_service import InventoryService
+from app.services.order_service import OrderService
+from app.services.order_stats_service import OrderStatsService
+from app.services.product_service import ProductService
+from app.services.review_service import ReviewService
+
+# Small, bounded tables where a sequential scan is acceptable
+SEQ_SCAN_ALLOWED = {"alembic_version"}
+
+_PARTITION_SUFFIX = re.compile(r"_(\d{4}_\d{2}|default)$")
+
+SERVICE_QUERIES = {
+    "ProductService.get_products (newest)": lambda s: ProductService(s.db).get_products(),
+    "ProductService.get_products (price filter)": lambda s: ProductService(s.db).get_products(
+        min_price=50, max_price=200, sort_by="price_asc"
+    ),
+    "ProductService.get_products (sport/team)": lambda s: ProductService(s.db).get_products(sport="foot", team="chiefs"),
+    "ProductService.get_products (rating)": lambda s: ProductService(s.db).get_products(sort_by="rating"),
+    "ProductService.get_products (trending)": lambda s: ProductService(s.db).get_products(sort_by="trending"),
+    "ProductService.get_featured_products": lambda s: ProductService(s.db).get_featured_products(),
+    "ProductService.get_new_arrivals": lambda s: ProductService(s.db).get_new_arrivals(),
+    "ProductService.search_products": lambda s: ProductService(s.db).search_products("james"),
+    "ProductService.get_product_by_slug": lambda s: ProductService(s.db).get_product_by_slug(s.product.slug),
+    "ProductService.get_related_products": lambda s: ProductService(s.db).get_related_products(s.product.slug),
+    "ProductService.get_categories": lambda s: ProductService(s.db).get_categories(),
+    "ProductService.get_teams": lambda s: ProductService(s.db).get_teams("Football"),
+    "OrderService.get_user_orders": lambda s: OrderService(s.db).get_user_orders(s.user_id),
+    "OrderService.get_user_orders (status)": lambda s: OrderService(s.db).get_user_orders(
+        s.user_id, status_filter="pending"
+    ),
+    "OrderService.get_order": lambda s: OrderService(s.db).get_order(s.order_id, s.user_id),
+    "OrderStatsService.get_stats": lambda s: OrderStatsService(s.db).get_stats(s.user_id),
+    "AdminService.get_users (email)": lambda s: AdminService(s.db).get_users(search=s.email),
+    "AdminService.get_users (phone)": lambda s: AdminService(s.db).get_users(search="555-010-0000"),
+    "AdminService.get_users (name)": lambda s: AdminService(s.db).get_users(search="admin"),
+    "AdminService.get_users (prefix)": lambda s: AdminService(s.db).get_users(search="ad"),
+    "InventoryService.get_low_stock": lambda s: InventoryService(s.db).get_low_stock(),
+    "ReviewService.get_product_reviews": lambda s: ReviewService(s.db).get_product_reviews(s.product.id),
+    "ReviewService.get_reviews (pending)": lambda s: ReviewService(s.db).get_reviews(is_approved=False),
+}
+
+
+@contextmanager
+def capture_statements(engine):
+    statements: List[Tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seq_scans(plan: dict) -> List[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(_PARTITION_SUFFIX.sub("", plan["Relation Name"]))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def explain(engine, statement: str, parameters) -> dict:
+    with engine.connect() as connection:
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        raw = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return plan[0]["Plan"]
+
+
+@pytest.fixture
+def seeded(db):
+    product = db.query(Product).filter(Product.is_active == True).first()
+    if product is None:
+        pytest.skip("Database is not seeded; run python seed_data.py")
+    user = db.query(User).first()
+    order = db.query(Order).first()
+    return SimpleNamespace(
+        db=db,
+        product=product,
+        user_id=user.id if user else None,
+        email=user.email if user else "missing@example.com",
+        order_id=order.id if order else None,
+    )
+
+
+@pytest.mark.parametrize("name", list(SERVICE_QUERIES))
+async def test_query_uses_indexes(database, seeded, name):
+    with capture_statements(database) as statements:
+        await SERVICE_QUERIES[name](seeded)
+    seeded.db.rollback()
+
+    if not statements:
+        pytest.skip("issued no queries")
+    for statement, parameters in statements:
+        scanned = set(seq_scans(explain(database, statement, parameters))) - SEQ_SCAN_ALLOWED
+        assert not scanned, f"sequential scan on {', '.join(sorted(scanned))}: {' '.join(statement.split())}"
+
+
+def sorts(plan: dict) -> List[str]:
+    found = [plan["Node Type"]] if plan.get("Node Type") in ("Sort", "Incremental Sort") else []
+    for child in plan.get("Plans", []):
+        found.extend(sorts(child))
+    return found
+
+
+async def test_short_user_search_reads_in_index_order(database, seeded):
+    with capture_statements(database) as statements:
+        await AdminService(seeded.db).get_users(search="ad")
+
+    (statement, parameters), = statements
+    assert sorts(explain(database, statement, parameters)) == []
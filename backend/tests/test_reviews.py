@@ -0,0 +1,142 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from app.config import settings
+from app.jobs.ratings import recompute_batch
+from app.models import Product
+from app.schemas import ReviewCreate, ReviewUpdate
+from app.services.review_service import ReviewService
+
+
+def test_update_keeps_omitted_fields():
+    assert ReviewUpdate(title="Great fit").model_dump(exclude_unset=True) == {"title": "Great fit"}
+
+
+def test_update_may_clear_title_and_body():
+    update = ReviewUpdate.model_validate({"title": None, "body": None})
+    assert update.model_dump(exclude_unset=True) == {"title": None, "body": None}
+
+
+@pytest.mark.parametrize("rating", [None, 0, 6])
+def test_update_rejects_invalid_ratings(rating):
+    with pytest.raises(ValidationError):
+        ReviewUpdate.model_validate({"rating": rating})
+
+
+# ReviewService keeps product rating aggregates current (database)
+
+
+def expected(ratings):
+    prior = settings.RATING_PRIOR_MEAN * settings.RATING_PRIOR_WEIGHT
+    count = len(ratings)
+    return (
+        sum(ratings),
+        count,
+        pytest.approx(sum(ratings) / count if count else 0.0),
+        pytest.approx((prior + sum(ratings)) / (settings.RATING_PRIOR_WEIGHT + count)),
+    )
+
+
+def totals(db, product):
+    return tuple(db.execute(
+        select(Product.rating_sum, Product.review_count, Product.average_rating, Product.bayesian_rating)
+        .where(Product.id == product.id)
+    ).one())
+
+
+@pytest.fixture
+def product(db, make_product):
+    product = make_product()
+    # Committed, so a rolled-back duplicate review does not take the product with it
+    db.commit()
+    return product
+
+
+@pytest.fixture
+def review(db, make_user, product):
+    async def review(rating: int):
+        user = make_user()
+        return await ReviewService(db).create_review(ReviewCreate(product_id=product.id, rating=rating), user.id)
+    return review
+
+
+async def test_approved_reviews_count_towards_the_rating(db, product, review):
+    await review(5)
+    await review(2)
+
+    assert totals(db, product) == expected([5, 2])
+
+
+async def test_editing_a_rating_moves_the_totals(db, product, review):
+    first = await review(5)
+    await review(3)
+
+    await ReviewService(db).update_review(first.id, ReviewUpdate(rating=1), first.user_id)
+
+    assert totals(db, product) == expected([1, 3])
+
+
+async def test_moderation_adds_and_removes_a_review(db, product, review):
+    first = await review(4)
+    await review(2)
+    service = ReviewService(db)
+
+    await service.moderate_review(first.id, is_approved=False)
+    assert totals(db, product) == expected([2])
+    await service.moderate_review(first.id, is_approved=False)
+    assert totals(db, product) == expected([2])
+    await service.moderate_review(first.id, is_approved=True)
+    assert totals(db, product) == expected([4, 2])
+
+
+async def test_deleting_reviews_returns_to_the_prior(db, product, review):
+    first = await review(4)
+    hidden = await review(1)
+    service = ReviewService(db)
+    await service.moderate_review(hidden.id, is_approved=False)
+
+    assert await service.delete_review(hidden.id, hidden.user_id) is True
+    assert totals(db, product) == expected([4])
+    assert await service.delete_review(first.id, first.user_id) is True
+    assert totals(db, product) == expected([])
+
+
+async def test_reviews_awaiting_approval_do_not_count(db, product, review, monkeypatch):
+    approved = await review(5)
+    monkeypatch.setattr(settings, "REVIEWS_REQUIRE_APPROVAL", True)
+
+    pending = await review(1)
+    assert pending.is_approved is False
+    assert totals(db, product) == expected([5])
+
+    # An edit sends an approved review back through moderation
+    await ReviewService(db).update_review(approved.id, ReviewUpdate(body="Still great"), approved.user_id)
+    assert totals(db, product) == expected([])
+
+
+async def test_second_review_of_a_product_is_rejected(db, make_user, product):
+    user = make_user()
+    db.commit()
+    service = ReviewService(db)
+    await service.create_review(ReviewCreate(product_id=product.id, rating=4), user.id)
+
+    with pytest.raises(HTTPException) as raised:
+        await service.create_review(ReviewCreate(product_id=product.id, rating=1), user.id)
+    assert raised.value.status_code == 409
+    assert totals(db, product) == expected([4])
+
+
+async def test_recompute_repairs_drift(db, product, review):
+    await review(5)
+    await review(3)
+    db.execute(update(Product).where(Product.id == product.id).values(rating_sum=40, review_count=1, bayesian_rating=9.0))
+
+    # Start just below the product's id, so the batch is this product alone
+    ids, changed = recompute_batch(db.connection(), uuid.UUID(int=product.id.int - 1), batch_size=1)
+
+    assert (ids, changed) == ([product.id], 1)
+    assert totals(db, product) == expected([5, 3])
+    assert recompute_batch(db.connection(), uuid.UUID(int=product.id.int - 1), batch_size=1)[1] == 0
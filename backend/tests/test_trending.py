@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from app.config import settings
+from app.core.trending import VIEWS_KEY, TrendingCounters
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    monkeypatch.setattr(settings, "TRENDING_ENABLED", True)
+    counters = TrendingCounters(half_life_hours=6, view_weight=0.05, flush_seconds=0.01)
+    sent = []
+    monkeypatch.setattr(counters, "_increment", lambda key, amounts: sent.append((key, dict(amounts))))
+    counters.sent = sent
+    return counters
+
+
+def test_views_are_buffered_without_touching_redis(counters):
+    for product_id in ["p1", "p2", "p1"]:
+        counters.record_view(product_id)
+
+    assert counters.sent == []
+
+
+async def test_background_task_flushes_buffered_views(counters):
+    counters.start()
+    try:
+        counters.record_view("p1")
+        counters.record_view("p1")
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if any(amounts for _, amounts in counters.sent):
+                break
+    finally:
+        counters.stop()
+
+    assert (VIEWS_KEY, {"p1": 2}) in counters.sent
+
+
+async def test_stop_sends_what_is_left(counters):
+    counters.start()
+    counters.record_view("p2")
+    counters.stop()
+
+    assert counters.sent[-1] == (VIEWS_KEY, {"p2": 1})